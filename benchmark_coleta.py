@@ -0,0 +1,61 @@
+"""
+Micro-benchmark do custo por tick da coleta de métricas do SO
+
+Compara a leitura dos mesmos contadores (CPU por núcleo, memória, swap e
+disco por dispositivo) via psutil com os coletores do caminho rápido por
+descritores persistentes do /proc (leitura e cálculo), e mede o custo de uma chamada a coletar_metricas_so
+depois que o amostrador em segundo plano já está rodando.
+
+Uso:
+    python benchmark_coleta.py [iteracoes]
+"""
+import sys
+import timeit
+
+import psutil
+
+from src.cpu_metricas import ColetorCPU
+from src.disco_metricas import ColetorDisco
+from src.memoria_metricas import ColetorMemoria
+from src.proc_rapido import proc_rapido_disponivel
+from src.so_metricas import coletar_metricas_so
+
+
+def _tick_psutil():
+    psutil.cpu_times()
+    psutil.cpu_times(percpu=True)
+    psutil.virtual_memory()
+    psutil.swap_memory()
+    psutil.disk_io_counters(perdisk=True)
+
+
+def _medir(funcao, iteracoes: int) -> float:
+    """Retorna o custo médio por chamada em microssegundos (melhor de 5 rodadas)"""
+    return min(timeit.repeat(funcao, number=iteracoes, repeat=5)) / iteracoes * 1_000_000
+
+
+def main():
+    iteracoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print(f"Iterações por rodada: {iteracoes}")
+    print(f"Tick via psutil:               {_medir(_tick_psutil, iteracoes):10.1f} µs")
+
+    if proc_rapido_disponivel():
+        cpu, memoria, disco = ColetorCPU(), ColetorMemoria(), ColetorDisco()
+
+        def _tick_rapido():
+            cpu.coletar()
+            memoria.coletar()
+            disco.coletar()
+
+        print(f"Tick via /proc persistente:    {_medir(_tick_rapido, iteracoes):10.1f} µs")
+    else:
+        print("Tick via /proc persistente:    indisponível neste sistema")
+
+    # A versão original bloqueava ~1,1 s por chamada (cpu_percent(interval=1) + sleep de 100 ms)
+    coletar_metricas_so()
+    print(f"coletar_metricas_so() (cache): {_medir(coletar_metricas_so, iteracoes):10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
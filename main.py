@@ -3,8 +3,10 @@ from tkinter import messagebox, ttk
 from datetime import datetime
 import threading
 
-from src.so_metricas import coletar_metricas_so
-from src.db_metricas import coletar_metricas_db, conectar_banco
+from src.so_metricas import coletar_metricas_so, obter_amostrador
+from src.db_metricas import coletar_metricas_db, metricas_desconectado
+from src.db_pool import criar_pool
+from src.db_servidores import MonitorServidores
 from src.analisar import analisar_dados
 from src.relatorio import formatar_relatorio, gerar_relatorio_arquivo, gerar_relatorio_html_arquivo
 
@@ -33,7 +35,10 @@ class MonitoramentoApp:
         self.master.config(bg=self.CORES['fundo'])
 
         self.ultima_analise = None
-        self.conexao_db = None  # Armazenar conexão ativa com banco de dados
+        self.servidores_db = MonitorServidores()  # Um pool por servidor, coletados em paralelo
+
+        # Iniciar amostragem do SO em segundo plano para leituras instantâneas
+        obter_amostrador()
 
         self._criar_header()
 
@@ -392,43 +397,39 @@ class MonitoramentoApp:
             self.status_conexao_label.config(text="⏳ Conectando...", fg=self.CORES['aviso'])
             self.master.update_idletasks()
 
-            # Tentar conectar
-            self.conexao_db = conectar_banco(host, usuario, senha, banco)
+            # Tentar conectar (valida as credenciais com a primeira conexão do pool)
+            # Cada conexão bem-sucedida adiciona um servidor (primário, réplicas...)
+            nome = f"{host}/{banco}"
+            self.servidores_db.adicionar(nome, criar_pool(host, usuario, senha, banco))
 
             # Se conectou com sucesso, coletar métricas iniciais
-            metricas = coletar_metricas_db(self.conexao_db)
-            self._atualizar_metricas_db(metricas)
+            metricas = self.servidores_db.coletar()['servidores']
+            self._atualizar_metricas_db(metricas[nome])
 
-            self.status_conexao_label.config(text="🟢 Conectado", fg=self.CORES['sucesso'])
-            self.btn_conectar.config(state="disabled")
+            self._atualizar_status_servidores(metricas)
+            self.btn_conectar.config(text="➕ Adicionar Servidor")
             self.btn_desconectar.config(state="normal")
             self.btn_monitorar_db.config(state="normal")
-            self.entry_host.config(state="readonly")
-            self.entry_usuario.config(state="readonly")
-            self.entry_banco.config(state="readonly")
 
-            messagebox.showinfo("✅ Sucesso", f"Conectado com sucesso ao banco de dados '{banco}'!")
+            messagebox.showinfo("✅ Sucesso", f"Conectado com sucesso ao banco de dados '{banco}' em {host}!")
 
         except Exception as e:
             messagebox.showerror("❌ Erro de Conexão", f"Não foi possível conectar:\n\n{str(e)}")
-            self.status_conexao_label.config(text="🔴 Desconectado", fg=self.CORES['erro'])
-            self.conexao_db = None
+            if len(self.servidores_db):
+                self.status_conexao_label.config(text=f"🟢 Conectado ({len(self.servidores_db)} servidor(es))", fg=self.CORES['sucesso'])
+            else:
+                self.status_conexao_label.config(text="🔴 Desconectado", fg=self.CORES['erro'])
 
     def desconectar_banco_dados(self):
         """Desconecta do banco de dados"""
         try:
-            if self.conexao_db and self.conexao_db.is_connected():
-                self.conexao_db.close()
-                self.conexao_db = None
+            self.servidores_db.fechar()
 
             # Resetar interface
             self.status_conexao_label.config(text="🔴 Desconectado", fg=self.CORES['erro'])
-            self.btn_conectar.config(state="normal")
+            self.btn_conectar.config(text="🔗 Conectar ao Banco")
             self.btn_desconectar.config(state="disabled")
             self.btn_monitorar_db.config(state="disabled")
-            self.entry_host.config(state="normal")
-            self.entry_usuario.config(state="normal")
-            self.entry_banco.config(state="normal")
 
             # Limpar rótulos de métricas
             self.db_status_label.config(text="--", fg=self.CORES['erro'])
@@ -444,6 +445,17 @@ class MonitoramentoApp:
         except Exception as e:
             messagebox.showerror("❌ Erro", f"Erro ao desconectar:\n\n{str(e)}")
 
+    def _atualizar_status_servidores(self, metricas: dict):
+        """Mostra quantos dos servidores cadastrados responderam"""
+        conectados = sum(1 for dados in metricas.values() if dados.get('status') == 'Conectado')
+        if conectados == len(metricas):
+            texto, cor = f"🟢 Conectado ({conectados} servidor(es))", self.CORES['sucesso']
+        elif conectados:
+            texto, cor = f"🟡 {conectados} de {len(metricas)} servidores conectados", self.CORES['aviso']
+        else:
+            texto, cor = "🔴 Desconectado", self.CORES['erro']
+        self.status_conexao_label.config(text=texto, fg=cor)
+
     def _atualizar_metricas_db(self, metricas: dict):
         """Atualiza os rótulos com as métricas do banco de dados"""
         self.db_status_label.config(
@@ -488,7 +500,8 @@ class MonitoramentoApp:
             self.memoria_label.config(text=f"{memoria_val:.1f} %")
             self.memoria_progress.config(text=self._criar_barra(memoria_val), fg=self._cor_para_valor(memoria_val))
 
-            disco_val = dados_so['uso_disco']
+            # Ausente enquanto a primeira varredura de montagens está pendente
+            disco_val = dados_so.get('uso_disco', 0)
             self.disco_label.config(text=f"{disco_val:.1f} %")
             self.disco_progress.config(text=self._criar_barra(disco_val), fg=self._cor_para_valor(disco_val))
 
@@ -498,7 +511,10 @@ class MonitoramentoApp:
             self.swap_progress.config(text=self._criar_barra(swap_val), fg=self._cor_para_valor(swap_val))
 
             latencia_val = dados_so.get('latencia_disco_ms', 0)
-            self.latencia_label.config(text=f"{latencia_val:.2f} ms")
+            if dados_so.get('latencia_disco_sem_dados'):
+                self.latencia_label.config(text="sem I/O na janela")
+            else:
+                self.latencia_label.config(text=f"{latencia_val:.2f} ms ({dados_so.get('disco_mais_lento')})")
 
             self.status_label.config(text="✅ Monitoramento do SO concluído!", fg=self.CORES['sucesso'])
             messagebox.showinfo("✅ Monitoramento Completo", "Métricas do SO atualizadas com sucesso!")
@@ -512,7 +528,7 @@ class MonitoramentoApp:
 
     def monitorar_banco_dados(self):
         """Monitora as métricas do banco de dados em thread separada"""
-        if not self.conexao_db or not self.conexao_db.is_connected():
+        if not len(self.servidores_db):
             messagebox.showwarning("⚠️ Aviso", "Você precisa estar conectado ao banco de dados.")
             return
 
@@ -526,12 +542,16 @@ class MonitoramentoApp:
             self.status_conexao_label.config(text="⏳ Monitorando...", fg=self.CORES['aviso'])
             self.master.update_idletasks()
 
-            # Coletar e atualizar métricas
-            metricas = coletar_metricas_db(self.conexao_db)
-            self._atualizar_metricas_db(metricas)
+            # Coletar todos os servidores em paralelo; os rótulos mostram o primeiro cadastrado
+            dados_db = self.servidores_db.coletar()
+            metricas = dados_db['servidores']
+            self._atualizar_metricas_db(next(iter(metricas.values())))
+            self._atualizar_status_servidores(metricas)
 
-            self.status_conexao_label.config(text="🟢 Conectado", fg=self.CORES['sucesso'])
-            messagebox.showinfo("✅ Monitoramento Completo", "Métricas atualizadas com sucesso!")
+            resumo = "\n".join(f"{nome}: {dados.get('status')} ({dados.get('tempo_resposta', 0)} ms)"
+                               for nome, dados in metricas.items())
+            messagebox.showinfo("✅ Monitoramento Completo",
+                                f"Métricas atualizadas em {dados_db['duracao_coleta_ms']} ms:\n\n{resumo}")
 
         except Exception as e:
             messagebox.showerror("❌ Erro", f"Erro ao monitorar banco de dados:\n\n{str(e)}")
@@ -660,7 +680,8 @@ class MonitoramentoApp:
             self.memoria_label.config(text=f"{memoria_val:.1f} %")
             self.memoria_progress.config(text=self._criar_barra(memoria_val), fg=self._cor_para_valor(memoria_val))
 
-            disco_val = dados_so['uso_disco']
+            # Ausente enquanto a primeira varredura de montagens está pendente
+            disco_val = dados_so.get('uso_disco', 0)
             self.disco_label.config(text=f"{disco_val:.1f} %")
             self.disco_progress.config(text=self._criar_barra(disco_val), fg=self._cor_para_valor(disco_val))
 
@@ -669,7 +690,7 @@ class MonitoramentoApp:
             self.status_label.config(text="⏳ Coletando métricas do banco de dados...", fg=self.CORES['primaria'])
             self.master.update_idletasks()
 
-            dados_db = coletar_metricas_db(self.conexao_db)
+            dados_db = self._coletar_banco_diagnostico()
             analise = analisar_dados(dados_so, dados_db)
 
             self.ultima_analise = analise
@@ -677,7 +698,10 @@ class MonitoramentoApp:
             relatorio_formatado = formatar_relatorio(analise)
             self._atualizar_relatorio(relatorio_formatado)
 
-            self.status_label.config(text="✅ Diagnóstico concluído com sucesso!", fg=self.CORES['sucesso'])
+            if dados_db.get('degradado'):
+                self.status_label.config(text="⚠️ Diagnóstico concluído sem parte das métricas do banco", fg=self.CORES['aviso'])
+            else:
+                self.status_label.config(text="✅ Diagnóstico concluído com sucesso!", fg=self.CORES['sucesso'])
 
             self.notebook.select(2)
 
@@ -694,6 +718,17 @@ class MonitoramentoApp:
                 self.btn_salvar.config(state="normal")
                 self.btn_salvar_html.config(state="normal")
 
+    def _coletar_banco_diagnostico(self) -> dict:
+        """Métricas do banco dentro do orçamento da rodada; uma falha não impede o relatório do SO"""
+        if not len(self.servidores_db):
+            return coletar_metricas_db(None)
+        try:
+            return self.servidores_db.coletar()
+        except Exception as e:
+            metricas = metricas_desconectado()
+            metricas.update(status='Degradado', erro=str(e), degradado=True)
+            return metricas
+
     def _atualizar_relatorio(self, relatorio_texto: str):
         self.relatorio_text.config(state="normal")
         self.relatorio_text.delete("1.0", "end")
@@ -1,28 +1,107 @@
 import psutil
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
+from src.db_servidores import por_servidor
+from src.instrumentacao import instrumentar
+from src.processos_metricas import formatar_processos
 
+
+# Tempo mínimo de atividade (s) para apontar índices que nunca foram lidos
+UPTIME_MINIMO_INDICES = 7 * 24 * 3600
+
+
+@instrumentar('analisar_dados')
 def analisar_dados(dados_so: Dict[str, float], dados_db: Dict[str, Any]) -> Dict[str, Any]:
     try:
         alertas = []
         recomendacoes = []
 
+        # Em container os limites do cgroup valem mais que os totais do host
+        cgroup = dados_so.get('cgroup') or {}
+        limite_cpus = cgroup.get('limite_cpus')
+        limite_memoria = cgroup.get('memoria_limite_mb')
+        uso_cpu = cgroup.get('uso_cpu_percent', 0) if limite_cpus else dados_so.get('uso_cpu', 0)
+        uso_memoria = cgroup.get('uso_memoria_percent', 0) if limite_memoria else dados_so.get('uso_memoria', 0)
+        escopo_cpu = f" da cota de {limite_cpus} CPUs do container" if limite_cpus else ""
+        escopo_memoria = f" do limite de {limite_memoria:.0f} MB do container" if limite_memoria else ""
+
         # ====== ANÁLISE DE CPU ======
-        if dados_so.get('uso_cpu', 0) > 80:
-            alertas.append("🔴 CRÍTICO: Uso de CPU muito alto (>80%)")
-            recomendacoes.append("Verifique processos em execução e encerre desnecessários")
-        elif dados_so.get('uso_cpu', 0) > 60:
-            alertas.append("🟡 ALERTA: Uso de CPU alto (>60%)")
-            recomendacoes.append("Monitore a atividade da CPU para evitar picos")
+        top_cpu = formatar_processos(dados_so.get('top_processos_cpu', [])[:3], 'cpu_percent', '%')
+        if uso_cpu > 80:
+            alertas.append(f"🔴 CRÍTICO: Uso de CPU muito alto (>80%{escopo_cpu})")
+            if top_cpu:
+                recomendacoes.append(f"Verifique processos em execução e encerre desnecessários - maiores consumidores: {top_cpu}")
+            else:
+                recomendacoes.append("Verifique processos em execução e encerre desnecessários")
+        elif uso_cpu > 60:
+            alertas.append(f"🟡 ALERTA: Uso de CPU alto (>60%{escopo_cpu})")
+            if top_cpu:
+                recomendacoes.append(f"Monitore a atividade da CPU para evitar picos - maiores consumidores: {top_cpu}")
+            else:
+                recomendacoes.append("Monitore a atividade da CPU para evitar picos")
+
+        # Cota de CPU do cgroup esgotada dentro do período (latência mesmo com CPU ociosa no host)
+        estrangulado = cgroup.get('periodos_estrangulados_percent', 0)
+        if estrangulado > 25:
+            alertas.append(f"🔴 CRÍTICO: Container estrangulado pela cota de CPU em {estrangulado:.1f}% dos períodos ({cgroup.get('estrangulado_ms_s', 0)} ms/s)")
+            recomendacoes.append("Aumente cpu.max (limite de CPU do container) ou reduza a concorrência - as consultas ficam paradas esperando o próximo período")
+        elif estrangulado > 5:
+            alertas.append(f"🟡 ALERTA: Container estrangulado pela cota de CPU em {estrangulado:.1f}% dos períodos")
+            recomendacoes.append("Picos de uso estão esbarrando no limite de CPU do container - avalie aumentar a cota")
+
+        # Núcleo saturado com média baixa (carga single-thread invisível no agregado)
+        uso_nucleo_max = dados_so.get('uso_nucleo_max', 0)
+        if dados_so.get('cpu_cores', 1) > 1 and uso_nucleo_max > 90 and dados_so.get('desequilibrio_cpu', 0) > 40:
+            alertas.append(f"🟡 ALERTA: Núcleo cpu{dados_so.get('nucleo_mais_quente')} saturado ({uso_nucleo_max:.1f}%) com média de {dados_so.get('uso_cpu', 0):.1f}%")
+            if top_cpu:
+                recomendacoes.append(f"Há um processo single-thread limitando o desempenho ({top_cpu}) - avalie paralelizar a carga")
+            else:
+                recomendacoes.append("Há um processo single-thread limitando o desempenho - identifique-o e avalie paralelizar a carga")
+
+        # Tempo de CPU esperando I/O
+        cpu_iowait = dados_so.get('cpu_iowait', 0)
+        if cpu_iowait > 25:
+            alertas.append(f"🔴 CRÍTICO: CPU aguardando I/O em {cpu_iowait:.1f}% do tempo")
+            recomendacoes.append("A lentidão vem do disco e não da CPU - verifique a latência e a utilização de cada disco")
+            top_io = formatar_processos(dados_so.get('top_processos_io', [])[:3], 'io_mb_s', ' MB/s')
+            if top_io:
+                recomendacoes.append(f"Processos com maior I/O: {top_io}")
+        elif cpu_iowait > 10:
+            alertas.append(f"🟡 ALERTA: CPU aguardando I/O em {cpu_iowait:.1f}% do tempo")
+            recomendacoes.append("Monitore o I/O de disco - processos estão bloqueados esperando leitura/escrita")
+
+        # Tempo roubado pelo hipervisor
+        cpu_steal = dados_so.get('cpu_steal', 0)
+        if cpu_steal > 10:
+            alertas.append(f"🟡 ALERTA: Tempo de CPU roubado pelo hipervisor ({cpu_steal:.1f}%)")
+            recomendacoes.append("A máquina virtual está disputando CPU com outras - solicite mais recursos ou migre de host")
+
+        # Interrupções de software (tipicamente rede)
+        cpu_softirq = dados_so.get('cpu_softirq', 0)
+        if cpu_softirq > 20:
+            alertas.append(f"🟡 ALERTA: Alto tempo de CPU em softirq ({cpu_softirq:.1f}%)")
+            recomendacoes.append("Verifique o volume de tráfego de rede e a distribuição de interrupções entre núcleos")
 
         # ====== ANÁLISE DE MEMÓRIA RAM ======
-        if dados_so.get('uso_memoria', 0) > 85:
-            alertas.append("🔴 CRÍTICO: Uso de Memória RAM crítico (>85%)")
-            recomendacoes.append("Libere memória encerrando programas desnecessários ou aumente a RAM")
-        elif dados_so.get('uso_memoria', 0) > 70:
-            alertas.append("🟡 ALERTA: Uso de Memória RAM alto (>70%)")
+        top_memoria = formatar_processos(dados_so.get('top_processos_memoria', [])[:3], 'rss_mb', ' MB')
+        if uso_memoria > 85:
+            alertas.append(f"🔴 CRÍTICO: Uso de Memória RAM crítico (>85%{escopo_memoria})")
+            if top_memoria:
+                recomendacoes.append(f"Libere memória encerrando programas desnecessários ou aumente a RAM - maiores consumidores: {top_memoria}")
+            else:
+                recomendacoes.append("Libere memória encerrando programas desnecessários ou aumente a RAM")
+        elif uso_memoria > 70:
+            alertas.append(f"🟡 ALERTA: Uso de Memória RAM alto (>70%{escopo_memoria})")
             recomendacoes.append("Considere aumentar a memória RAM para evitar travamentos")
 
+        # Processos mortos pelo OOM killer do cgroup
+        if cgroup.get('oom_kill_novos', 0) > 0:
+            alertas.append(f"🔴 CRÍTICO: OOM killer encerrou {cgroup['oom_kill_novos']} processo(s) no container")
+            recomendacoes.append("O container atingiu memory.max - aumente o limite ou reduza buffers/caches (ex.: innodb_buffer_pool_size)")
+        elif cgroup.get('oom_kill_total', 0) > 0:
+            alertas.append(f"🟡 ALERTA: Container já teve {cgroup['oom_kill_total']} processo(s) encerrado(s) pelo OOM killer")
+            recomendacoes.append("Revise o limite de memória do container - houve OOM desde a criação do cgroup")
+
         # ====== ANÁLISE DE SWAP ======
         if dados_so.get('uso_swap', 0) > 50:
             alertas.append("🔴 CRÍTICO: Uso de Memória de Troca muito alto (>50%)")
@@ -31,49 +110,134 @@ def analisar_dados(dados_so: Dict[str, float], dados_db: Dict[str, Any]) -> Dict
             alertas.append("🟡 ALERTA: Uso de Memória de Troca detectado (>10%)")
             recomendacoes.append("Sistema está usando disco como memória - esto degradará performance")
 
+        # Swap ativo (páginas trocadas agora) pesa mais que o percentual ocupado
+        swap_out = dados_so.get('swap_out_paginas_s', 0)
+        if swap_out > 100:
+            alertas.append(f"🔴 CRÍTICO: Sistema trocando páginas com o disco ativamente ({swap_out:.0f} páginas/s)")
+            recomendacoes.append("Memória insuficiente para a carga atual - reduza o consumo ou aumente a RAM")
+
         # ====== ANÁLISE DE DISCO ======
-        if dados_so.get('uso_disco', 0) > 90:
-            alertas.append("🔴 CRÍTICO: Espaço em Disco crítico (>90%)")
-            recomendacoes.append("Libere espaço em disco imediatamente para evitar falhas de sistema")
-        elif dados_so.get('uso_disco', 0) > 80:
-            alertas.append("🟡 ALERTA: Espaço em Disco baixo (>80%)")
-            recomendacoes.append("Limpe arquivos temporários e desnecessários para liberar espaço")
+        sistemas_arquivos = dados_so.get('sistemas_arquivos')
+        if sistemas_arquivos is None:
+            # Dados sem detalhamento por montagem (formato antigo)
+            sistemas_arquivos = [{'ponto': '/', 'uso_percent': dados_so.get('uso_disco', 0)}]
+
+        for sistema in sistemas_arquivos:
+            ponto = sistema.get('ponto', '/')
+            uso_fs = sistema.get('uso_percent', 0)
+            if uso_fs > 90:
+                alertas.append(f"🔴 CRÍTICO: Espaço em Disco crítico em {ponto} ({uso_fs:.1f}%)")
+                recomendacoes.append(f"Libere espaço em {ponto} imediatamente para evitar falhas de sistema")
+            elif uso_fs > 80:
+                alertas.append(f"🟡 ALERTA: Espaço em Disco baixo em {ponto} ({uso_fs:.1f}%)")
+                recomendacoes.append(f"Limpe arquivos temporários e desnecessários em {ponto} para liberar espaço")
+
+            uso_inodes = sistema.get('uso_inodes_percent', 0)
+            if uso_inodes > 90:
+                alertas.append(f"🔴 CRÍTICO: Inodes quase esgotados em {ponto} ({uso_inodes:.1f}%)")
+                recomendacoes.append(f"Remova arquivos pequenos em excesso (logs, sessões, cache) em {ponto} - sem inodes não é possível criar arquivos")
+            elif uso_inodes > 80:
+                alertas.append(f"🟡 ALERTA: Uso de inodes alto em {ponto} ({uso_inodes:.1f}%)")
+                recomendacoes.append(f"Verifique diretórios com muitos arquivos pequenos em {ponto}")
 
         # ====== ANÁLISE DE LATÊNCIA DO DISCO ======
-        latencia_disco = dados_so.get('latencia_disco_ms', 0)
-        if latencia_disco > 20:
-            alertas.append(f"🔴 CRÍTICO: Latência do Disco muito alta ({latencia_disco:.2f}ms)")
-            recomendacoes.append("Disco com problemas de I/O - considere verificar saúde do disco ou substituir")
-        elif latencia_disco > 10:
-            alertas.append(f"🟡 ALERTA: Latência do Disco elevada ({latencia_disco:.2f}ms)")
-            recomendacoes.append("Disco apresenta atraso na leitura/escrita - monitore performance")
+        discos = dados_so.get('discos')
+        if discos is None:
+            # Dados sem detalhamento por dispositivo (formato antigo)
+            discos = [{'dispositivo': 'disco', 'sem_dados': False,
+                       'latencia_ms': dados_so.get('latencia_disco_ms', 0), 'utilizacao': 0}]
+
+        for disco in discos:
+            # Janela sem I/O não indica latência alguma
+            if disco.get('sem_dados'):
+                continue
+
+            nome = disco.get('dispositivo', 'disco')
+            latencia_disco = disco.get('latencia_ms') or 0
+            if latencia_disco > 20:
+                alertas.append(f"🔴 CRÍTICO: Latência do Disco {nome} muito alta ({latencia_disco:.2f}ms)")
+                recomendacoes.append(f"Disco {nome} com problemas de I/O - considere verificar saúde do disco ou substituir")
+            elif latencia_disco > 10:
+                alertas.append(f"🟡 ALERTA: Latência do Disco {nome} elevada ({latencia_disco:.2f}ms)")
+                recomendacoes.append(f"Disco {nome} apresenta atraso na leitura/escrita - monitore performance")
+
+            utilizacao = disco.get('utilizacao', 0)
+            if utilizacao > 90:
+                alertas.append(f"🟡 ALERTA: Disco {nome} saturado ({utilizacao:.1f}% ocupado, fila média {disco.get('fila_media', 0)})")
+                recomendacoes.append(f"Distribua a carga de I/O do disco {nome} ou migre para um dispositivo mais rápido")
+
+        # ====== ANÁLISE DE PRESSÃO (PSI) ======
+        # Stall mede tempo em que tarefas ficaram paradas esperando o recurso,
+        # sinal mais direto de lentidão do que o percentual de utilização
+        pressao = dados_so.get('pressao', {})
+        nomes_recursos = {'cpu': 'CPU', 'memory': 'Memória', 'io': 'I/O'}
+        recomendacoes_psi = {
+            'cpu': "Tarefas estão esperando CPU - reduza a carga concorrente ou adicione núcleos",
+            'memory': "Tarefas estão paradas recuperando memória (reclaim/swap) - reduza o consumo ou aumente a RAM",
+            'io': "Tarefas estão paradas esperando disco - verifique os discos mais lentos e os processos com mais I/O",
+        }
+        for recurso, valores in pressao.items():
+            nome = nomes_recursos.get(recurso, recurso)
+            full_avg10 = valores.get('full_avg10', 0)
+            some_avg10 = valores.get('some_avg10', 0)
+            # Em 'full' todas as tarefas não ociosas estão paradas ao mesmo tempo
+            if recurso != 'cpu' and full_avg10 > 10:
+                alertas.append(f"🔴 CRÍTICO: Sistema totalmente parado por {nome} em {full_avg10:.1f}% do tempo (PSI full avg10)")
+                recomendacoes.append(recomendacoes_psi[recurso])
+            elif some_avg10 > (50 if recurso == 'cpu' else 20):
+                alertas.append(f"🟡 ALERTA: Tarefas paradas esperando {nome} em {some_avg10:.1f}% do tempo (PSI some avg10)")
+                recomendacoes.append(recomendacoes_psi.get(recurso, "Verifique a contenção do recurso"))
+
+        for recurso in dados_so.get('pressao_disparada', []):
+            alertas.append(f"🟡 ALERTA: Gatilho de pressão de {nomes_recursos.get(recurso, recurso)} disparado pelo kernel")
+
+        # ====== ANÁLISE DE REDE ======
+        for interface in dados_so.get('interfaces_rede', []):
+            nome = interface.get('interface')
+            uso_rede = interface.get('uso_percent') or 0
+            if uso_rede > 90:
+                alertas.append(f"🔴 CRÍTICO: Interface {nome} saturada ({uso_rede:.1f}% de {interface.get('velocidade_mbps')} Mbps)")
+                recomendacoes.append(f"Reduza o tráfego em {nome} ou aumente a capacidade do link - respostas do BD ficarão lentas")
+            elif uso_rede > 70:
+                alertas.append(f"🟡 ALERTA: Interface {nome} com uso alto ({uso_rede:.1f}% de {interface.get('velocidade_mbps')} Mbps)")
+                recomendacoes.append(f"Monitore o tráfego da interface {nome} para evitar saturação")
+
+            if interface.get('erros_s', 0) > 0 or interface.get('descartes_s', 0) > 0:
+                alertas.append(f"🟡 ALERTA: Interface {nome} com erros ({interface.get('erros_s')}/s) ou descartes ({interface.get('descartes_s')}/s)")
+                recomendacoes.append(f"Verifique cabo, driver e buffers de recepção da interface {nome}")
+
+        retransmissao = dados_so.get('tcp_retransmissao_percent', 0)
+        if retransmissao > 5:
+            alertas.append(f"🔴 CRÍTICO: Tempestade de retransmissões TCP ({retransmissao:.2f}% dos segmentos)")
+            recomendacoes.append("Há perda de pacotes na rede - verifique switches, MTU e congestionamento entre aplicação e BD")
+        elif retransmissao > 2:
+            alertas.append(f"🟡 ALERTA: Retransmissões TCP elevadas ({retransmissao:.2f}% dos segmentos)")
+            recomendacoes.append("Monitore a perda de pacotes na rede - retransmissões aumentam a latência das consultas")
+
+        if dados_so.get('tcp_listen_overflows_s', 0) > 0:
+            alertas.append(f"🟡 ALERTA: Fila de conexões TCP transbordando ({dados_so.get('tcp_listen_overflows_s')}/s)")
+            recomendacoes.append("O servidor não aceita conexões a tempo - aumente back_log/somaxconn ou verifique se o serviço está travado")
+
+        # ====== CUSTO DO PRÓPRIO MONITOR ======
+        monitor = dados_so.get('monitor', {})
+        cpu_monitor = monitor.get('cpu_percent') or 0
+        orcamento_monitor = monitor.get('orcamento_cpu_percent')
+        if orcamento_monitor is not None and cpu_monitor > orcamento_monitor:
+            alertas.append(f"🟡 ALERTA: Monitor acima do orçamento de CPU ({cpu_monitor:.1f}% de {orcamento_monitor}%) - coleta desacelerada {monitor.get('fator_recuo', 1)}x")
+            recomendacoes.append("Aumente o intervalo de coleta ou o orçamento - o próprio monitor está competindo com o banco de dados")
+        elif cpu_monitor > 10:
+            alertas.append(f"🟡 ALERTA: O próprio monitor está consumindo {cpu_monitor:.1f}% de CPU")
+            recomendacoes.append("Defina um orçamento de CPU para o monitor ou aumente o intervalo de coleta")
 
         # ====== ANÁLISE DO BANCO DE DADOS ======
-        # Status da Conexão
-        if dados_db.get('status', '') == 'Desconectado':
-            alertas.append("🔴 CRÍTICO: Banco de Dados Desconectado")
-            recomendacoes.append("Reconecte ao banco de dados para monitoramento")
-
-        # Tempo de Resposta do BD
-        tempo_resposta_bd = dados_db.get('tempo_resposta', 0)
-        if tempo_resposta_bd > 100:
-            alertas.append(f"🔴 CRÍTICO: Tempo de resposta do BD muito alto ({tempo_resposta_bd}ms)")
-            recomendacoes.append("Banco de dados está lento - verifique queries ativas e índices")
-        elif tempo_resposta_bd > 50:
-            alertas.append(f"🟡 ALERTA: Tempo de resposta do BD elevado ({tempo_resposta_bd}ms)")
-            recomendacoes.append("Monitore a performance do banco de dados")
-
-        # Conexões Ativas
-        conexoes = dados_db.get('conexoes_ativas', 0)
-        if conexoes > 80:
-            alertas.append(f"🟡 ALERTA: Muitas conexões ativas ({conexoes})")
-            recomendacoes.append("Verifique se há muitos clientes conectados simultaneamente")
-
-        # Queries Lentas
-        queries_lentas = dados_db.get('queries_lentas', [])
-        if queries_lentas and len(queries_lentas) > 0:
-            alertas.append(f"🔴 CRÍTICO: {len(queries_lentas)} query(s) lenta(s) detectada(s)")
-            recomendacoes.append("Otimize as queries lentas - adicione índices ou reescreva as consultas")
+        # Cada servidor monitorado é analisado separadamente; com mais de um, os alertas levam o nome
+        for nome, dados_servidor in por_servidor(dados_db):
+            alertas_servidor, recomendacoes_servidor = _analisar_servidor_db(dados_servidor)
+            if nome is not None:
+                alertas_servidor = [alerta.replace(': ', f': [{nome}] ', 1) for alerta in alertas_servidor]
+                recomendacoes_servidor = [f"[{nome}] {recomendacao}" for recomendacao in recomendacoes_servidor]
+            alertas.extend(alertas_servidor)
+            recomendacoes.extend(recomendacoes_servidor)
 
         # ====== DETERMINAÇÃO DO STATUS GERAL ======
         status_geral = "🟢 OK - Sistema operando normalmente"
@@ -96,4 +260,229 @@ def analisar_dados(dados_so: Dict[str, float], dados_db: Dict[str, Any]) -> Dict
 
         return analise
     except Exception as e:
-        raise Exception(f"Erro ao analisar dados: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Erro ao analisar dados: {str(e)}")
+
+
+def _analisar_servidor_db(dados_db: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Alertas e recomendações das métricas de um servidor de banco de dados"""
+    alertas = []
+    recomendacoes = []
+
+    # Status da Conexão
+    if dados_db.get('status', '') == 'Desconectado':
+        erro = dados_db.get('erro')
+        alertas.append(f"🔴 CRÍTICO: Banco de Dados Desconectado{f' ({erro})' if erro else ''}")
+        recomendacoes.append("Reconecte ao banco de dados para monitoramento")
+    elif dados_db.get('status', '') == 'Degradado':
+        # Servidor conectado mas lento demais para o prazo da coleta: sem métricas nesta rodada
+        alertas.append(f"🔴 CRÍTICO: Banco de Dados não respondeu a tempo - métricas omitidas ({dados_db.get('erro')})")
+        recomendacoes.append("O próprio banco é o gargalo - verifique consultas em execução, locks e I/O do servidor diretamente")
+
+    # Tempo de Resposta do BD
+    # Percentis do histograma de sondas; uma amostra isolada é só ruído
+    latencia = dados_db.get('latencia') or {}
+    p95_bd = latencia.get('p95_ms')
+    p99_bd = latencia.get('p99_ms')
+    if p95_bd is None:
+        p95_bd = p99_bd = dados_db.get('tempo_resposta', 0)
+    # Com poucas sondas na janela o p95/p99 é quase o máximo: não passa de alerta
+    poucas_sondas = latencia.get('baixa_confianca', False)
+    nota = f" - apenas {latencia.get('amostras')} sondas, percentis pouco confiáveis" if poucas_sondas else ""
+    if p95_bd > 100 and not poucas_sondas:
+        alertas.append(f"🔴 CRÍTICO: Tempo de resposta do BD muito alto (p95 {p95_bd}ms, p99 {p99_bd}ms)")
+        recomendacoes.append("Banco de dados está lento - verifique queries ativas e índices")
+    elif p95_bd > 50 or p99_bd > 100:
+        alertas.append(f"🟡 ALERTA: Tempo de resposta do BD elevado (p95 {p95_bd}ms, p99 {p99_bd}ms){nota}")
+        recomendacoes.append("Monitore a performance do banco de dados - há picos de latência nas sondas")
+
+    # Conexões Ativas
+    conexoes = dados_db.get('conexoes_ativas', 0)
+    if conexoes > 80:
+        alertas.append(f"🟡 ALERTA: Muitas conexões ativas ({conexoes})")
+        recomendacoes.append("Verifique se há muitos clientes conectados simultaneamente")
+
+    # Taxas de contadores do servidor
+    taxas = dados_db.get('taxas') or {}
+    leituras_sequenciais = taxas.get('leituras_sequenciais_s', 0)
+    referencia = taxas.get('leituras_sequenciais_media_s', 0)
+    if leituras_sequenciais > 100000 and leituras_sequenciais > 3 * referencia:
+        alertas.append(f"🟡 ALERTA: Varreduras completas dispararam ({leituras_sequenciais:.0f} linhas/s lidas sequencialmente, média {referencia:.0f}/s)")
+        recomendacoes.append("Alguma consulta nova ou plano alterado está lendo tabelas inteiras - confira o ranking de instruções e os índices")
+    if taxas.get('joins_sem_indice_s', 0) > 1:
+        alertas.append(f"🟡 ALERTA: Joins sem índice ({taxas['joins_sem_indice_s']}/s)")
+        recomendacoes.append("Adicione índices nas colunas de junção das consultas com Select_full_join")
+    if taxas.get('tmp_disco_s', 0) > 1 and taxas.get('tmp_disco_percent', 0) > 25:
+        alertas.append(f"🟡 ALERTA: Tabelas temporárias indo para o disco ({taxas['tmp_disco_percent']}% - {taxas['tmp_disco_s']}/s)")
+        recomendacoes.append("Aumente tmp_table_size/max_heap_table_size ou evite colunas TEXT/BLOB em GROUP BY e ORDER BY")
+
+    # InnoDB: buffer pool, locks de linha, redo e purge
+    innodb = dados_db.get('innodb') or {}
+    acerto = innodb.get('buffer_pool_acerto_percent')
+    if acerto is not None and (innodb.get('requisicoes_leitura_s') or 0) > 100 and acerto < 99:
+        tamanho_bp = f" (hoje {innodb['buffer_pool_mb']} MB)" if innodb.get('buffer_pool_mb') else ""
+        if acerto < 90:
+            alertas.append(f"🔴 CRÍTICO: Buffer pool com {acerto}% de acerto ({innodb.get('leituras_disco_s')} leituras de disco/s)")
+        else:
+            alertas.append(f"🟡 ALERTA: Buffer pool com {acerto}% de acerto ({innodb.get('leituras_disco_s')} leituras de disco/s)")
+        if dados_db.get('uptime', 0) < 3600:
+            recomendacoes.append("O servidor reiniciou há pouco e o buffer pool está frio - mantenha innodb_buffer_pool_dump_at_shutdown e innodb_buffer_pool_load_at_startup ligados")
+        else:
+            recomendacoes.append(f"O conjunto de dados quente não cabe na memória - aumente innodb_buffer_pool_size{tamanho_bp} ou reduza varreduras completas")
+    if (innodb.get('espera_pagina_livre_s') or 0) > 0:
+        alertas.append(f"🟡 ALERTA: Consultas esperando página livre no buffer pool ({innodb['espera_pagina_livre_s']}/s)")
+        recomendacoes.append("O flush de páginas sujas não acompanha as leituras - aumente innodb_io_capacity/innodb_lru_scan_depth")
+    elif (innodb.get('paginas_sujas_percent') or 0) > 75:
+        alertas.append(f"🟡 ALERTA: {innodb['paginas_sujas_percent']}% do buffer pool com páginas sujas")
+        recomendacoes.append("Aumente innodb_io_capacity para o flush acompanhar as escritas")
+    pendentes = innodb.get('leituras_pendentes', 0) + innodb.get('escritas_pendentes', 0)
+    if pendentes > 10:
+        alertas.append(f"🟡 ALERTA: {pendentes} operações de I/O do InnoDB pendentes")
+        recomendacoes.append("O disco do banco está saturado - verifique a latência do dispositivo de dados")
+
+    bloqueios = innodb.get('bloqueios', [])
+    if innodb.get('esperas_lock_atuais', 0) > 0:
+        maior_espera = max((b['espera_s'] for b in bloqueios), default=0)
+        nivel = "🔴 CRÍTICO" if maior_espera > 30 else "🟡 ALERTA"
+        alertas.append(f"{nivel}: {innodb['esperas_lock_atuais']} transação(ões) esperando lock de linha agora"
+                       + (f" (maior espera {maior_espera}s)" if bloqueios else ""))
+        # Bloqueador de mais de um par costuma ser a transação esquecida aberta
+        for bloqueadora in dict.fromkeys(b['thread_bloqueadora'] for b in bloqueios):
+            par = next(b for b in bloqueios if b['thread_bloqueadora'] == bloqueadora)
+            bloqueadas = sum(1 for b in bloqueios if b['thread_bloqueadora'] == bloqueadora)
+            recomendacoes.append(f"Thread {bloqueadora} (transação aberta há {par['transacao_bloqueadora_s']}s em {par['tabela']}) bloqueia {bloqueadas} "
+                                 f"transação(ões) - confirme/desfaça a transação ou use KILL {bloqueadora}")
+        if not bloqueios:
+            recomendacoes.append("Identifique a transação bloqueadora em performance_schema.data_lock_waits e encurte transações longas")
+    elif (innodb.get('espera_lock_media_ms') or 0) > 500 and (innodb.get('esperas_lock_s') or 0) > 0:
+        alertas.append(f"🟡 ALERTA: Esperas por lock de linha de {innodb['espera_lock_media_ms']} ms em média ({innodb['esperas_lock_s']}/s)")
+        recomendacoes.append("Há contenção em linhas quentes - reduza o tamanho das transações e garanta índices nos filtros de UPDATE/DELETE")
+
+    idade_checkpoint = innodb.get('checkpoint_idade_percent')
+    if idade_checkpoint is not None and idade_checkpoint > 75:
+        nivel = "🔴 CRÍTICO" if idade_checkpoint > 90 else "🟡 ALERTA"
+        alertas.append(f"{nivel}: Idade do checkpoint em {idade_checkpoint}% do redo log ({innodb.get('checkpoint_idade_mb')} de {innodb.get('redo_capacidade_mb')} MB)")
+        recomendacoes.append("O redo log está perto de forçar flush síncrono - aumente innodb_redo_log_capacity (ou innodb_log_file_size)")
+    historico = innodb.get('historico_undo') or 0
+    if historico > 1000000:
+        alertas.append(f"🟡 ALERTA: History list length em {historico}")
+        recomendacoes.append("Uma transação longa está impedindo o purge - procure em information_schema.INNODB_TRX a mais antiga e finalize-a")
+
+    # Replicação: threads paradas, atraso e tendência do atraso
+    for canal in (dados_db.get('replicacao') or {}).get('canais', []):
+        nome_canal = f"canal '{canal['canal']}' ({canal.get('origem')})"
+        if canal.get('io_thread') != 'Yes' or canal.get('sql_thread') != 'Yes':
+            erro = canal.get('erro_sql') or canal.get('erro_io') or 'sem erro registrado'
+            if canal.get('io_thread') == 'Connecting':
+                alertas.append(f"🔴 CRÍTICO: Réplica sem conexão com o primário no {nome_canal}: {erro}")
+                recomendacoes.append("Verifique rede, credenciais do usuário de replicação e se o primário está no ar")
+            else:
+                alertas.append(f"🔴 CRÍTICO: Replicação parada no {nome_canal} (IO {canal.get('io_thread')}, SQL {canal.get('sql_thread')}): {erro}")
+                recomendacoes.append("Corrija o erro da replicação e reinicie-a com START REPLICA - enquanto isso a réplica serve dados desatualizados")
+            continue
+
+        atraso = canal.get('atraso_s') or 0
+        tendencia = canal.get('tendencia')
+        if atraso > 30:
+            descricao = f"{atraso}s"
+            if canal.get('variacao_atraso_s_min') is not None:
+                descricao += f", {tendencia} ({canal['variacao_atraso_s_min']:+} s/min)"
+            if tendencia == 'alcançando':
+                previsao = canal.get('previsao_alcance_s')
+                alertas.append(f"🟡 ALERTA: Réplica atrasada no {nome_canal} ({descricao})")
+                recomendacoes.append(f"A réplica está recuperando o atraso{f' - previsão de {previsao // 60} min' if previsao else ''}; evite direcionar leituras críticas a ela até lá")
+            elif atraso > 300 or tendencia == 'divergindo':
+                alertas.append(f"🔴 CRÍTICO: Réplica atrasada no {nome_canal} ({descricao})")
+                recomendacoes.append("A réplica não acompanha o primário - habilite aplicação paralela (replica_parallel_workers), procure transações grandes ou DDL no primário e verifique o disco da réplica")
+            else:
+                alertas.append(f"🟡 ALERTA: Réplica atrasada no {nome_canal} ({descricao})")
+                recomendacoes.append("Acompanhe o atraso da réplica - se continuar crescendo, avalie aplicação paralela (replica_parallel_workers)")
+        crescimento_relay = canal.get('relay_log_variacao_mb_min') or 0
+        if crescimento_relay >= 10:
+            alertas.append(f"🟡 ALERTA: Relay log crescendo {crescimento_relay} MB/min no {nome_canal} "
+                           f"(total {canal['relay_log_mb']} MB)")
+            recomendacoes.append("A réplica recebe mais do que consegue aplicar - verifique o espaço em disco e a thread SQL")
+
+    # I/O por tabela e índice (análise periódica do performance_schema)
+    indices = dados_db.get('indices') or {}
+    varreduras = [v for v in indices.get('varreduras_sem_indice', []) if v['latencia_ms'] >= 100 and v['linhas_lidas'] >= 10000]
+    if varreduras:
+        alertas.append(f"🟡 ALERTA: {len(varreduras)} tabela(s) lida(s) sem índice nos últimos {indices.get('janela_s')}s "
+                       f"(maior: {varreduras[0]['tabela']}, {varreduras[0]['linhas_lidas']} linhas)")
+        for varredura in varreduras[:3]:
+            recomendacoes.append(f"Tabela {varredura['tabela']}: {varredura['linhas_lidas']} linhas lidas sem índice "
+                                 f"({varredura['latencia_ms']} ms, {varredura['percentual_leituras']}% das leituras) - "
+                                 f"crie índices para os filtros das consultas que a varrem")
+    quentes = indices.get('tabelas_quentes', [])
+    if quentes and quentes[0]['percentual_latencia'] > 50 and quentes[0]['latencia_leitura_ms'] + quentes[0]['latencia_escrita_ms'] > 1000:
+        quente = quentes[0]
+        alertas.append(f"🟡 ALERTA: Tabela {quente['tabela']} concentra {quente['percentual_latencia']}% da latência de I/O")
+        tipo = "leituras" if quente['latencia_leitura_ms'] >= quente['latencia_escrita_ms'] else "escritas"
+        recomendacoes.append(f"A tabela {quente['tabela']} é o ponto quente do banco, dominado por {tipo} "
+                             f"({quente['leituras']} leituras, {quente['escritas']} escritas) - revise as consultas sobre ela")
+    # Sem leitura desde o início do servidor só é significativo depois de um ciclo de uso completo
+    if dados_db.get('uptime', 0) >= UPTIME_MINIMO_INDICES:
+        for indice in indices.get('indices_nao_usados', [])[:3]:
+            recomendacoes.append(f"Índice {indice['indice']} de {indice['tabela']} nunca foi lido desde o início do servidor, "
+                                 f"mas é mantido nas {indice['escritas_tabela']} escritas da tabela "
+                                 f"({indice['latencia_escrita_tabela_ms']} ms) - "
+                                 f"avalie removê-lo (confirme antes que não garante UNIQUE)")
+
+    # Instruções que dominam o tempo do banco (digests)
+    top_digests = dados_db.get('top_digests', [])
+    if top_digests:
+        principal = top_digests[0]
+        if principal.get('percentual_tempo', 0) > 50 and principal.get('tempo_total_ms', 0) > 1000:
+            alertas.append(f"🟡 ALERTA: Uma instrução responde por {principal['percentual_tempo']}% do tempo do banco "
+                           f"({principal.get('chamadas')} chamadas, média {principal.get('latencia_media_ms')} ms)")
+            recomendacoes.append(f"Otimize primeiro a instrução dominante: {principal.get('texto', '')[:80]}")
+        for digest in top_digests[:3]:
+            razao = digest.get('examinadas_por_enviada') or 0
+            if razao > 1000 and digest.get('sem_indice', 0) > 0:
+                alertas.append(f"🟡 ALERTA: Instrução examina {razao:.0f} linhas por linha retornada sem usar índice")
+                recomendacoes.append(f"Crie um índice para os filtros de: {digest.get('texto', '')[:80]}")
+            if digest.get('tmp_disco', 0) > 0:
+                recomendacoes.append(f"Instrução criou {digest['tmp_disco']} tabela(s) temporária(s) em disco - revise GROUP BY/ORDER BY ou tmp_table_size: {digest.get('texto', '')[:60]}")
+
+    # Instruções longas concluídas (amostrador de alta frequência)
+    instrucoes = dados_db.get('instrucoes_longas') or {}
+    for ofensor in instrucoes.get('ofensores', [])[:3]:
+        if ofensor['ocorrencias'] >= 5 or ofensor['tempo_total_s'] > 30:
+            alertas.append(f"🟡 ALERTA: Instrução de {ofensor['duracao_media_s']}s em média concluída {ofensor['ocorrencias']} vezes "
+                           f"({ofensor['tempo_total_s']}s somados)")
+            tipo = "curta porém recorrente" if ofensor['duracao_media_s'] < 5 else "longa e recorrente"
+            recomendacoes.append(f"Consulta {tipo} - otimize ou coloque em cache: {ofensor['query'][:80]}")
+
+    # Queries Lentas
+    queries_lentas = dados_db.get('queries_lentas', [])
+    if queries_lentas and len(queries_lentas) > 0:
+        grupos = dados_db.get('queries_lentas_agrupadas', [])
+        alertas.append(f"🔴 CRÍTICO: {len(queries_lentas)} query(s) lenta(s) detectada(s) em {len(grupos) or len(queries_lentas)} padrão(ões)")
+        if grupos:
+            principal = grupos[0]
+            recomendacoes.append(f"Otimize primeiro o padrão com mais tempo acumulado ({principal['ocorrencias']} execução(ões), "
+                                 f"{principal['tempo_total_s']}s): {principal['consulta_normalizada'][:80]}")
+        else:
+            recomendacoes.append("Otimize as queries lentas - adicione índices ou reescreva as consultas")
+
+        # Plano de execução (EXPLAIN) dos padrões de leitura
+        for grupo in grupos[:3]:
+            plano = grupo.get('plano')
+            if not plano or plano.get('erro'):
+                continue
+            for tabela in plano['varreduras_completas']:
+                if tabela['acesso'] == 'ALL' and tabela['indices_possiveis']:
+                    motivo = f"índice(s) possível(is) não usado(s): {', '.join(tabela['indices_possiveis'])}"
+                elif tabela['acesso'] == 'ALL':
+                    motivo = "sem índice utilizável - crie um índice nas colunas do filtro/junção"
+                else:
+                    motivo = f"lê o índice {tabela['indice']} inteiro - filtre por uma coluna indexada"
+                recomendacoes.append(f"Tabela {tabela['tabela']} lida por {tabela['descricao']} (~{tabela['linhas']} linhas), "
+                                     f"{motivo}: {grupo['consulta_normalizada'][:60]}")
+            if plano['filesort']:
+                recomendacoes.append(f"Ordenação sem índice (filesort) - crie um índice que cubra o ORDER BY: "
+                                     f"{grupo['consulta_normalizada'][:60]}")
+            if plano['tabela_temporaria']:
+                recomendacoes.append(f"Tabela temporária no GROUP BY/DISTINCT - indexe as colunas agrupadas: "
+                                     f"{grupo['consulta_normalizada'][:60]}")
+
+    return alertas, recomendacoes
@@ -0,0 +1,194 @@
+from typing import Dict, Any, Optional
+import os
+import time
+
+from src.proc_rapido import abrir_leitor, ler_chave_valor
+
+
+CHAVES_CPU_STAT = frozenset((b'usage_usec', b'nr_periods', b'nr_throttled', b'throttled_usec'))
+CHAVES_MEMORY_STAT = frozenset((b'inactive_file', b'anon', b'file'))
+CHAVES_MEMORY_EVENTS = frozenset((b'high', b'max', b'oom', b'oom_kill'))
+
+
+def detectar_cgroup(raiz: str = '/sys/fs/cgroup') -> Optional[str]:
+    """
+    Localiza o diretório do cgroup v2 do processo atual
+
+    Args:
+        raiz: Ponto de montagem da hierarquia de cgroups
+
+    Returns:
+        Caminho do cgroup, ou None fora do Linux ou sem hierarquia v2
+    """
+    try:
+        with open('/proc/self/cgroup') as arquivo:
+            linhas = arquivo.read().splitlines()
+    except OSError:
+        return None
+
+    # Na hierarquia unificada a linha é "0::/caminho"
+    relativo = next((linha[3:] for linha in linhas if linha.startswith('0::')), None)
+    if relativo is None:
+        return None
+
+    # Modo híbrido monta a hierarquia v2 em <raiz>/unified
+    for base in (raiz, os.path.join(raiz, 'unified')):
+        caminho = os.path.join(base, relativo.lstrip('/'))
+        if os.path.exists(os.path.join(caminho, 'cgroup.controllers')):
+            return caminho.rstrip('/')
+    return None
+
+
+class ColetorCgroup:
+    """
+    Coletor de limites e uso do cgroup v2 (container) do monitor
+
+    Dentro de um container psutil reporta os totais do host; este coletor
+    lê cpu.max/cpu.stat, memory.current/memory.max, memory.events e io.stat
+    do cgroup atual para medir o uso contra os limites que realmente valem.
+    Controladores não habilitados no cgroup ficam de fora do resultado.
+    """
+
+    def __init__(self, caminho: Optional[str] = None):
+        """
+        Args:
+            caminho: Diretório do cgroup (padrão: detectado em /proc/self/cgroup)
+        """
+        self.caminho = caminho or detectar_cgroup()
+        self._leitores: Dict[str, Any] = {}
+        if self.caminho is not None:
+            for arquivo in ('cpu.max', 'cpu.stat', 'memory.current', 'memory.max',
+                            'memory.stat', 'memory.events', 'io.stat'):
+                leitor = abrir_leitor(os.path.join(self.caminho, arquivo))
+                if leitor is not None:
+                    self._leitores[arquivo] = leitor
+        self._anterior: Optional[tuple] = None
+
+    @property
+    def disponivel(self) -> bool:
+        return bool(self._leitores)
+
+    def coletar(self) -> Dict[str, Any]:
+        """
+        Lê o uso atual do cgroup
+
+        Returns:
+            Dicionário 'cgroup' com CPU, memória, eventos de OOM e I/O, ou
+            vazio quando não há cgroup v2
+        """
+        if not self._leitores:
+            return {}
+
+        agora = time.monotonic()
+        contadores = {
+            'cpu': self._ler_chave_valor('cpu.stat', CHAVES_CPU_STAT),
+            'eventos': self._ler_chave_valor('memory.events', CHAVES_MEMORY_EVENTS),
+            'io': self._ler_io(),
+        }
+        anterior, self._anterior = self._anterior, (agora, contadores)
+        duracao = agora - anterior[0] if anterior is not None else 0.0
+        base = anterior[1] if anterior is not None and duracao > 0 else None
+
+        cgroup: Dict[str, Any] = {'caminho': self.caminho}
+        cgroup.update(self._calcular_cpu(contadores['cpu'], base['cpu'] if base else None, duracao))
+        cgroup.update(self._calcular_memoria(contadores['eventos'], base['eventos'] if base else None))
+        cgroup.update(_calcular_io(contadores['io'], base['io'] if base else None, duracao))
+        return {'cgroup': cgroup}
+
+    def _ler(self, arquivo: str) -> Optional[bytes]:
+        leitor = self._leitores.get(arquivo)
+        return leitor.ler().tobytes() if leitor is not None else None
+
+    def _ler_chave_valor(self, arquivo: str, chaves: frozenset) -> Dict[bytes, int]:
+        leitor = self._leitores.get(arquivo)
+        return ler_chave_valor(leitor.ler(), chaves) if leitor is not None else {}
+
+    def _ler_io(self) -> Dict[bytes, Dict[bytes, int]]:
+        conteudo = self._ler('io.stat')
+        dispositivos = {}
+        for linha in (conteudo or b'').splitlines():
+            # "8:0 rbytes=... wbytes=... rios=... wios=... dbytes=... dios=..."
+            campos = linha.split()
+            if not campos:
+                continue
+            dispositivos[campos[0]] = {
+                chave: int(valor)
+                for chave, _, valor in (campo.partition(b'=') for campo in campos[1:])
+            }
+        return dispositivos
+
+    def _calcular_cpu(self, atual: Dict[bytes, int], base: Optional[Dict[bytes, int]], duracao: float) -> Dict[str, Any]:
+        if not atual:
+            return {}
+
+        limite_cpus = None
+        cpu_max = self._ler('cpu.max')
+        if cpu_max:
+            cota, _, periodo = cpu_max.strip().partition(b' ')
+            if cota != b'max' and periodo:
+                limite_cpus = int(cota) / int(periodo)
+
+        metricas = {'limite_cpus': round(limite_cpus, 2) if limite_cpus is not None else None}
+        if base is None:
+            return metricas
+
+        def _delta(chave: bytes) -> int:
+            return max(atual.get(chave, 0) - base.get(chave, 0), 0)
+
+        cpus_usadas = _delta(b'usage_usec') / (duracao * 1_000_000)
+        # Sem cota, a referência são os núcleos em que o processo pode rodar
+        capacidade = limite_cpus or len(os.sched_getaffinity(0))
+        periodos = _delta(b'nr_periods')
+        metricas.update({
+            'cpus_usadas': round(cpus_usadas, 2),
+            'uso_cpu_percent': round(cpus_usadas / capacidade * 100, 1) if capacidade else 0.0,
+            'periodos_estrangulados_percent': round(_delta(b'nr_throttled') / periodos * 100, 1) if periodos else 0.0,
+            'estrangulado_ms_s': round(_delta(b'throttled_usec') / 1000 / duracao, 1),
+        })
+        return metricas
+
+    def _calcular_memoria(self, eventos: Dict[bytes, int], base: Optional[Dict[bytes, int]]) -> Dict[str, Any]:
+        atual = self._ler('memory.current')
+        if atual is None:
+            return {}
+
+        atual = int(atual)
+        limite = self._ler('memory.max')
+        limite = int(limite) if limite and limite.strip() != b'max' else None
+
+        # Working set: o cache de arquivos inativo é recuperável antes de um OOM
+        inativo = self._ler_chave_valor('memory.stat', CHAVES_MEMORY_STAT).get(b'inactive_file', 0)
+        working_set = max(atual - inativo, 0)
+
+        metricas = {
+            'memoria_atual_mb': round(atual / (1024 ** 2), 1),
+            'memoria_working_set_mb': round(working_set / (1024 ** 2), 1),
+            'memoria_limite_mb': round(limite / (1024 ** 2), 1) if limite is not None else None,
+            'uso_memoria_percent': round(working_set / limite * 100, 1) if limite else None,
+            'oom_total': eventos.get(b'oom', 0),
+            'oom_kill_total': eventos.get(b'oom_kill', 0),
+            'eventos_memoria_max': eventos.get(b'max', 0),
+        }
+        if base is not None:
+            metricas['oom_kill_novos'] = max(eventos.get(b'oom_kill', 0) - base.get(b'oom_kill', 0), 0)
+            metricas['eventos_memoria_high_novos'] = max(eventos.get(b'high', 0) - base.get(b'high', 0), 0)
+        return metricas
+
+
+def _calcular_io(atual: Dict[bytes, Dict[bytes, int]], base: Optional[Dict[bytes, Dict[bytes, int]]],
+                 duracao: float) -> Dict[str, Any]:
+    """Soma as taxas de io.stat de todos os dispositivos do cgroup"""
+    if base is None or not atual:
+        return {}
+
+    totais = dict.fromkeys((b'rbytes', b'wbytes', b'rios', b'wios'), 0)
+    for dispositivo, campos in atual.items():
+        anteriores = base.get(dispositivo, {})
+        for chave in totais:
+            totais[chave] += max(campos.get(chave, 0) - anteriores.get(chave, 0), 0)
+
+    return {
+        'io_leitura_mb_s': round(totais[b'rbytes'] / (1024 ** 2) / duracao, 2),
+        'io_escrita_mb_s': round(totais[b'wbytes'] / (1024 ** 2) / duracao, 2),
+        'io_iops': round((totais[b'rios'] + totais[b'wios']) / duracao, 1),
+    }
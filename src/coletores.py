@@ -0,0 +1,284 @@
+from typing import Dict, Any, Callable, List, Optional
+import heapq
+import threading
+import time
+
+from src.instrumentacao import medir_etapa
+
+
+class Coletor:
+    """
+    Registro de um coletor no agendador
+
+    Cada coletor declara o próprio intervalo e, opcionalmente, um orçamento
+    de custo por execução. Quando a execução passa do orçamento, o intervalo
+    efetivo é multiplicado (até FATOR_MAXIMO) e volta ao normal quando o
+    custo cai abaixo da metade do orçamento. Um coletor adiado não executa
+    em iniciar(): a primeira execução acontece já na thread do agendador,
+    depois da primeira rodada dos demais.
+    """
+
+    FATOR_MAXIMO = 8
+
+    __slots__ = ('nome', 'funcao', 'intervalo', 'orcamento_ms', 'adiado', 'fator', 'proxima',
+                 'execucoes', 'falhas', 'ultimo_custo_ms', 'ultimo_erro', 'resultado')
+
+    def __init__(self, nome: str, funcao: Callable[[], Dict[str, Any]], intervalo: float,
+                 orcamento_ms: Optional[float] = None, adiado: bool = False):
+        self.nome = nome
+        self.funcao = funcao
+        self.intervalo = intervalo
+        self.orcamento_ms = orcamento_ms
+        self.adiado = adiado
+        self.fator = 1
+        self.proxima = 0.0
+        self.execucoes = 0
+        self.falhas = 0
+        self.ultimo_custo_ms = 0.0
+        self.ultimo_erro: Optional[Exception] = None
+        self.resultado: Dict[str, Any] = {}
+
+    @property
+    def intervalo_efetivo(self) -> float:
+        return self.intervalo * self.fator
+
+    def ajustar_cadencia(self) -> None:
+        """Recua ou recupera o intervalo conforme o custo da última execução"""
+        if self.orcamento_ms is None:
+            return
+        if self.ultimo_custo_ms > self.orcamento_ms:
+            self.fator = min(self.fator * 2, self.FATOR_MAXIMO)
+        elif self.fator > 1 and self.ultimo_custo_ms < self.orcamento_ms / 2:
+            self.fator //= 2
+
+
+class AgendadorColetores:
+    """
+    Registro de coletores e agendador único baseado em heap de prazos
+
+    Uma única thread executa cada coletor no seu próprio intervalo
+    (contadores baratos a cada segundo, varreduras caras a cada poucos
+    minutos) e mescla os resultados num único snapshot. O fator global
+    multiplica o intervalo de todos os coletores, para recuar quando o
+    próprio monitor passa do orçamento de CPU.
+    """
+
+    FATOR_GLOBAL_MAXIMO = 8
+
+    def __init__(self, nome: str = "AgendadorColetores",
+                 espera: Optional[Callable[[float], list]] = None,
+                 ao_evento: Optional[Callable[[list], None]] = None,
+                 despertar: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            nome: Nome da thread do agendador
+            espera: Função de espera alternativa (timeout -> eventos); permite
+                acordar o agendador por eventos externos, como gatilhos de PSI
+            ao_evento: Chamada com os eventos retornados pela função de espera
+            despertar: Interrompe a função de espera alternativa
+        """
+        self.nome = nome
+        self._espera = espera
+        self._ao_evento = ao_evento
+        self._despertar = despertar
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._pronto = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._coletores: Dict[str, Coletor] = {}
+        self._heap: List[tuple] = []
+        self._sequencia = 0
+        self._rodada_inicial: set = set()
+        self.fator_global = 1
+
+    def registrar(self, nome: str, funcao: Callable[[], Dict[str, Any]], intervalo: float,
+                  orcamento_ms: Optional[float] = None, adiado: bool = False) -> None:
+        """
+        Registra (ou substitui) um coletor
+
+        Args:
+            nome: Nome único do coletor
+            funcao: Função sem argumentos que retorna um dicionário de métricas
+            intervalo: Intervalo entre execuções em segundos
+            orcamento_ms: Custo máximo esperado por execução em milissegundos
+            adiado: Executar a primeira vez na thread, sem bloquear iniciar()
+        """
+        coletor = Coletor(nome, funcao, intervalo, orcamento_ms, adiado)
+        with self._lock:
+            self._coletores[nome] = coletor
+            if self._thread is not None:
+                # Com o agendador rodando, o novo coletor executa no próximo ciclo
+                self._agendar(coletor, time.monotonic())
+        self._sinalizar()
+
+    def remover(self, nome: str) -> None:
+        """Remove um coletor; entradas antigas no heap são descartadas ao sair"""
+        with self._lock:
+            self._coletores.pop(nome, None)
+            self._rodada_inicial.discard(nome)
+            if not self._rodada_inicial:
+                self._pronto.set()
+
+    def antecipar(self, nomes: List[str]) -> None:
+        """Agenda os coletores informados para executar imediatamente"""
+        agora = time.monotonic()
+        with self._lock:
+            for nome in nomes:
+                coletor = self._coletores.get(nome)
+                if coletor is not None:
+                    self._agendar(coletor, agora)
+        self._sinalizar()
+
+    def definir_fator_global(self, fator: int) -> None:
+        """Multiplica o intervalo de todos os coletores a partir da próxima execução"""
+        with self._lock:
+            self.fator_global = max(1, min(int(fator), self.FATOR_GLOBAL_MAXIMO))
+
+    def iniciar(self) -> None:
+        """
+        Executa cada coletor não adiado uma vez para formar a base dos deltas
+        e inicia a thread. A primeira execução agendada acontece após o menor
+        intervalo registrado, com os adiados depois dos demais (idempotente)
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            coletores = [c for c in self._coletores.values() if not c.adiado]
+
+        for coletor in coletores:
+            self._executar(coletor)
+
+        with self._lock:
+            self._parar.clear()
+            self._heap = []
+            agora = time.monotonic()
+            menor = min((c.intervalo for c in coletores), default=0.0)
+            # Sequência maior: no mesmo prazo, os adiados executam depois dos demais
+            for coletor in sorted(self._coletores.values(), key=lambda c: c.adiado):
+                self._agendar(coletor, agora + menor)
+            # A amostra fica pronta sem esperar os adiados, que aparecem em pendentes()
+            self._rodada_inicial = {nome for nome, c in self._coletores.items() if not c.adiado}
+            if not self._rodada_inicial:
+                self._pronto.set()
+            self._thread = threading.Thread(target=self._loop, name=self.nome, daemon=True)
+            self._thread.start()
+
+    def parar(self, timeout: Optional[float] = None) -> None:
+        """Sinaliza a thread do agendador para encerrar"""
+        self._parar.set()
+        self._sinalizar()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+            self._thread = None
+
+    def aguardar_pronto(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda a primeira rodada agendada de todos os coletores"""
+        return self._pronto.wait(timeout)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Mescla o último resultado de cada coletor, na ordem de registro
+
+        Raises:
+            Exception: Se nenhum coletor produziu resultado e algum falhou
+        """
+        with self._lock:
+            snapshot: Dict[str, Any] = {}
+            erro = None
+            for coletor in self._coletores.values():
+                snapshot.update(coletor.resultado)
+                erro = erro or coletor.ultimo_erro
+            if not snapshot and erro is not None:
+                raise erro
+            return snapshot
+
+    def pendentes(self) -> List[str]:
+        """Coletores que ainda não executaram nenhuma vez"""
+        with self._lock:
+            return [c.nome for c in self._coletores.values() if c.execucoes == 0]
+
+    def estatisticas(self) -> List[Dict[str, Any]]:
+        """Custo e cadência atuais de cada coletor"""
+        with self._lock:
+            return [
+                {
+                    'nome': c.nome,
+                    'intervalo': c.intervalo,
+                    'intervalo_efetivo': c.intervalo_efetivo * self.fator_global,
+                    'orcamento_ms': c.orcamento_ms,
+                    'ultimo_custo_ms': round(c.ultimo_custo_ms, 3),
+                    'execucoes': c.execucoes,
+                    'falhas': c.falhas,
+                    'ultimo_erro': str(c.ultimo_erro) if c.ultimo_erro else None,
+                }
+                for c in self._coletores.values()
+            ]
+
+    def _sinalizar(self) -> None:
+        self._acordar.set()
+        if self._despertar is not None:
+            self._despertar()
+
+    def _agendar(self, coletor: Coletor, quando: float) -> None:
+        # A sequência desempata prazos iguais e invalida entradas antigas do heap
+        self._sequencia += 1
+        coletor.proxima = quando
+        heapq.heappush(self._heap, (quando, self._sequencia, coletor))
+
+    def _loop(self) -> None:
+        while not self._parar.is_set():
+            # Limpa antes de ler o heap para não perder um aviso de registro
+            self._acordar.clear()
+            with self._lock:
+                restante = self._heap[0][0] - time.monotonic() if self._heap else 1.0
+
+            if restante > 0:
+                if self._espera is not None:
+                    eventos = self._espera(restante)
+                    if eventos and self._ao_evento is not None:
+                        self._ao_evento(eventos)
+                else:
+                    self._acordar.wait(restante)
+                continue
+
+            with self._lock:
+                quando, _, coletor = heapq.heappop(self._heap)
+                # Coletor removido, substituído ou reagendado depois desta entrada
+                if self._coletores.get(coletor.nome) is not coletor or coletor.proxima != quando:
+                    continue
+
+            self._executar(coletor)
+
+            with self._lock:
+                if self._coletores.get(coletor.nome) is coletor:
+                    # Prazo absoluto evita deriva; se atrasou muito, reagenda a partir de agora
+                    proxima = max(quando + coletor.intervalo_efetivo * self.fator_global, time.monotonic())
+                    self._agendar(coletor, proxima)
+                self._rodada_inicial.discard(coletor.nome)
+                if not self._rodada_inicial:
+                    self._pronto.set()
+
+    def _executar(self, coletor: Coletor) -> None:
+        inicio = time.perf_counter()
+        try:
+            # Cada coletor é uma etapa própria nas estatísticas do monitor (CPU, syscalls, alocações)
+            with medir_etapa(f"{self.nome}/{coletor.nome}"):
+                resultado = coletor.funcao() or {}
+            erro = None
+        except Exception as e:
+            resultado = None
+            erro = e
+        custo_ms = (time.perf_counter() - inicio) * 1000
+
+        with self._lock:
+            coletor.execucoes += 1
+            coletor.ultimo_custo_ms = custo_ms
+            coletor.ultimo_erro = erro
+            if erro is not None:
+                coletor.falhas += 1
+            else:
+                coletor.resultado = resultado
+            coletor.ajustar_cadencia()
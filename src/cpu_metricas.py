@@ -0,0 +1,134 @@
+import psutil
+from array import array
+from typing import Dict, Any, List, Optional
+import re
+
+from src.proc_rapido import abrir_leitor
+
+
+# Modos de CPU na ordem das colunas de /proc/stat
+MODOS = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal')
+N_MODOS = len(MODOS)
+INDICE_MODO = {modo: i for i, modo in enumerate(MODOS)}
+
+# Linhas "cpu"/"cpuN" com os N_MODOS primeiros contadores, casadas direto no buffer
+_LINHA_CPU = re.compile(rb'^cpu\d* +' + rb' +'.join([rb'(\d+)'] * N_MODOS), re.MULTILINE)
+
+_IDLE = INDICE_MODO['idle']
+_IOWAIT = INDICE_MODO['iowait']
+
+
+class DistribuicaoCPU:
+    """
+    Percentual de tempo por núcleo e por modo de CPU
+
+    Os valores ficam num único array('d') contíguo (linha por núcleo,
+    coluna por modo), sem um dicionário por núcleo, o que mantém o custo
+    baixo mesmo em hosts com dezenas de núcleos.
+    """
+
+    __slots__ = ('nucleos', 'valores', 'total')
+
+    def __init__(self, nucleos: int, valores: array, total: array):
+        self.nucleos = nucleos
+        self.valores = valores
+        self.total = total
+
+    def percentual(self, nucleo: int, modo: str) -> float:
+        """Percentual de um modo num núcleo"""
+        return self.valores[nucleo * N_MODOS + INDICE_MODO[modo]]
+
+    def ocupado(self, nucleo: int) -> float:
+        """Percentual ocupado de um núcleo (exclui idle e iowait)"""
+        base = nucleo * N_MODOS
+        return 100.0 - self.valores[base + _IDLE] - self.valores[base + _IOWAIT]
+
+    def por_modo(self, modo: str) -> List[float]:
+        """Percentual de um modo em cada núcleo"""
+        return list(self.valores[INDICE_MODO[modo]::N_MODOS])
+
+    def resumo(self) -> Dict[str, Any]:
+        """Campos agregados publicados na amostra do SO"""
+        ocupacao = [round(self.ocupado(n), 1) for n in range(self.nucleos)]
+        media = sum(ocupacao) / len(ocupacao) if ocupacao else 0.0
+        nucleo_max = max(range(len(ocupacao)), key=ocupacao.__getitem__) if ocupacao else None
+
+        resumo = {
+            'uso_cpu': round(100.0 - self.total[_IDLE] - self.total[_IOWAIT], 1),
+            'cpu_por_nucleo': ocupacao,
+            'nucleo_mais_quente': nucleo_max,
+            'uso_nucleo_max': ocupacao[nucleo_max] if ocupacao else 0.0,
+            'desequilibrio_cpu': round(ocupacao[nucleo_max] - media, 1) if ocupacao else 0.0,
+        }
+        for modo in ('user', 'system', 'iowait', 'steal', 'irq', 'softirq'):
+            resumo[f'cpu_{modo}'] = round(self.total[INDICE_MODO[modo]], 1)
+        return resumo
+
+
+class ColetorCPU:
+    """
+    Coletor de CPU por núcleo e por modo (user/system/iowait/steal/irq/softirq)
+
+    Mantém o snapshot anterior dos contadores cumulativos e calcula os
+    percentuais pela diferença entre chamadas.
+    """
+
+    def __init__(self, caminho: str = '/proc/stat'):
+        """
+        Args:
+            caminho: Caminho do arquivo de estatísticas do kernel
+        """
+        self.caminho = caminho
+        self._leitor = abrir_leitor(caminho)
+        self._anterior: Optional[array] = None
+
+    def coletar(self) -> Optional[DistribuicaoCPU]:
+        """
+        Registra um novo snapshot e calcula a distribuição desde o anterior
+
+        Returns:
+            Distribuição por núcleo, ou None na primeira chamada
+        """
+        atual = self._ler_proc() if self._leitor is not None else self._ler_psutil()
+        anterior, self._anterior = self._anterior, atual
+
+        # Núcleos colocados online/offline mudam o layout; recomeça a base
+        if anterior is None or len(anterior) != len(atual):
+            return None
+
+        return _calcular_distribuicao(anterior, atual)
+
+    def _ler_proc(self) -> array:
+        # Linha 0 é o agregado "cpu"; seguem "cpuN" para cada núcleo. Só o
+        # trecho das linhas cpu é processado (a linha "intr" pode ser enorme)
+        conteudo = self._leitor.ler()
+        fim = conteudo.obj.find(b'\nintr', 0, len(conteudo))
+        contadores = array('d')
+        for linha in _LINHA_CPU.finditer(conteudo, 0, fim if fim >= 0 else len(conteudo)):
+            contadores.extend(map(float, linha.groups()))
+        return contadores
+
+    def _ler_psutil(self) -> array:
+        contadores = array('d')
+        for tempos in [psutil.cpu_times()] + psutil.cpu_times(percpu=True):
+            contadores.extend(getattr(tempos, modo, 0.0) for modo in MODOS)
+        return contadores
+
+
+def _calcular_distribuicao(anterior: array, atual: array) -> DistribuicaoCPU:
+    """Converte dois snapshots cumulativos em percentuais por modo"""
+    linhas = len(atual) // N_MODOS
+    percentuais = array('d', bytes(8 * len(atual)))
+
+    for linha in range(linhas):
+        base = linha * N_MODOS
+        deltas = [max(atual[base + m] - anterior[base + m], 0.0) for m in range(N_MODOS)]
+        total = sum(deltas)
+        if total <= 0:
+            # Núcleo sem tempo contabilizado no intervalo é considerado ocioso
+            percentuais[base + _IDLE] = 100.0
+            continue
+        for m in range(N_MODOS):
+            percentuais[base + m] = deltas[m] * 100.0 / total
+
+    return DistribuicaoCPU(linhas - 1, percentuais[N_MODOS:], percentuais[:N_MODOS])
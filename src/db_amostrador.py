@@ -0,0 +1,263 @@
+from collections import deque
+from typing import Dict, Any, List, Optional
+import threading
+import time
+
+import mysql.connector
+
+from src.coletores import AgendadorColetores
+from src.db_fingerprint import normalizar_consulta
+from src.db_pool import PoolConexoes
+from src.histograma import JanelaLatencia
+
+
+# Instruções em execução há mais de `limiar` segundos (TIMER_WAIT cresce até o fim do evento)
+CONSULTA_EM_EXECUCAO = """
+    SELECT
+        s.THREAD_ID,
+        s.EVENT_ID,
+        t.PROCESSLIST_ID,
+        t.PROCESSLIST_USER,
+        COALESCE(s.CURRENT_SCHEMA, t.PROCESSLIST_DB),
+        t.PROCESSLIST_COMMAND,
+        t.PROCESSLIST_STATE,
+        s.TIMER_WAIT,
+        COALESCE(s.DIGEST_TEXT, s.SQL_TEXT),
+        s.SQL_TEXT
+    FROM performance_schema.events_statements_current s
+    JOIN performance_schema.threads t ON t.THREAD_ID = s.THREAD_ID
+    WHERE t.TYPE = 'FOREGROUND'
+      AND s.END_EVENT_ID IS NULL
+      AND s.TIMER_WAIT >= %s
+      AND t.PROCESSLIST_ID <> CONNECTION_ID()
+"""
+
+# Timers do performance_schema são em picossegundos
+_PS_POR_S = 1_000_000_000_000
+
+# Tempo (s) a partir do qual uma instrução em execução aparece em queries_lentas
+LIMITE_QUERY_LENTA = 5
+
+
+class AmostradorInstrucoes:
+    """
+    Amostrador de alta frequência das instruções em execução
+
+    A cada `intervalo` segundos lê events_statements_current (junto com
+    threads), que não passa pelo mutex global do PROCESSLIST, e acompanha
+    cada instrução (thread + evento) entre as amostras: início, maior
+    duração observada e fim. Quando uma instrução acompanhada some, ela é
+    emitida como evento concluído se tiver durado pelo menos `limite_s`, o
+    que revela consultas de poucos segundos, muito frequentes, que uma foto
+    isolada do PROCESSLIST quase nunca pega. O amostrador mantém uma conexão
+    própria do pool entre as amostras, para não disputar a cada tick as
+    conexões da coleta. Com uma janela de latência,
+    cada amostra também mede um SELECT 1 na mesma conexão, o que espalha as
+    sondas pelos ticks em vez de concentrá-las na coleta.
+    """
+
+    def __init__(self, intervalo: float = 0.5, limite_s: float = 1.0, maximo_eventos: int = 200,
+                 tamanho_texto: int = 200, janela_latencia: Optional[JanelaLatencia] = None):
+        """
+        Args:
+            intervalo: Intervalo entre amostras em segundos
+            limite_s: Duração mínima para emitir uma instrução concluída
+            maximo_eventos: Quantidade de eventos concluídos mantidos
+            tamanho_texto: Tamanho máximo do texto guardado por instrução
+            janela_latencia: Histograma onde cada amostra registra uma sonda SELECT 1
+        """
+        self.intervalo = intervalo
+        self.limite_s = limite_s
+        self.tamanho_texto = tamanho_texto
+        self.janela_latencia = janela_latencia
+        self.disponivel = True
+        self._lock = threading.Lock()
+        self._lock_inicio = threading.Lock()
+        self._agendador: Optional[AgendadorColetores] = None
+        self._pool: Optional[PoolConexoes] = None
+        self._conexao = None
+        self._rastreadas: Dict[tuple, Dict[str, Any]] = {}
+        self._em_execucao: List[Dict[str, Any]] = []
+        self._concluidas: deque = deque(maxlen=maximo_eventos)
+        self._amostras = 0
+
+    def obter(self, pool: PoolConexoes) -> Optional[Dict[str, Any]]:
+        """
+        Inicia a amostragem (na primeira chamada) e retorna o estado atual
+
+        Args:
+            pool: Pool de onde cada amostra empresta uma conexão
+
+        Returns:
+            Dicionário com 'em_execucao', 'concluidas' e 'ofensores', ou None
+            se o performance_schema não estiver disponível
+        """
+        self._iniciar(pool)
+        if not self.disponivel:
+            return None
+
+        with self._lock:
+            em_execucao = list(self._em_execucao)
+            concluidas = list(self._concluidas)
+            amostras = self._amostras
+
+        return {
+            'em_execucao': em_execucao,
+            'concluidas': concluidas[-20:][::-1],
+            'ofensores': _agrupar_ofensores(concluidas),
+            'amostras': amostras,
+            'intervalo_amostragem_s': self.intervalo,
+            'limite_s': self.limite_s,
+        }
+
+    def parar(self) -> None:
+        """Encerra a thread de amostragem e devolve a conexão própria ao pool"""
+        agendador, self._agendador = self._agendador, None
+        if agendador is not None:
+            agendador.parar(timeout=1.0)
+        conexao, self._conexao = self._conexao, None
+        if conexao is not None and self._pool is not None:
+            self._pool.devolver(conexao, descartar=True)
+
+    def _iniciar(self, pool: PoolConexoes) -> None:
+        with self._lock_inicio:
+            if self._agendador is not None or not self.disponivel:
+                return
+            agendador = AgendadorColetores("AmostradorInstrucoes")
+            agendador.registrar('instrucoes', lambda: self._amostrar(pool, agendador), self.intervalo)
+            # A primeira amostra roda de forma síncrona
+            self._pool = pool
+            agendador.iniciar()
+            if not self.disponivel:
+                # Sem performance_schema a primeira amostra removeu o único coletor: não mantém a thread ociosa
+                agendador.parar(timeout=1.0)
+                return
+            self._agendador = agendador
+            pool.ao_fechar(self.parar)
+
+    def _amostrar(self, pool: PoolConexoes, agendador: AgendadorColetores) -> Dict[str, Any]:
+        # Só as que podem passar do limite até a próxima amostra interessam
+        limiar_ps = int(max(self.limite_s - self.intervalo, 0) * _PS_POR_S)
+        if self._conexao is None:
+            self._conexao = pool.emprestar()
+        conexao = self._conexao
+        try:
+            cursor = conexao.cursor()
+            try:
+                cursor.execute(CONSULTA_EM_EXECUCAO, (limiar_ps,))
+                linhas = cursor.fetchall()
+                if self.janela_latencia is not None:
+                    inicio = time.perf_counter_ns()
+                    cursor.execute("SELECT 1")
+                    cursor.fetchall()
+                    self.janela_latencia.registrar(time.perf_counter_ns() - inicio)
+            finally:
+                cursor.close()
+        except mysql.connector.ProgrammingError:
+            # performance_schema desligado ou sem privilégio: volta ao PROCESSLIST
+            self.disponivel = False
+            agendador.remover('instrucoes')
+            self._conexao = None
+            pool.devolver(conexao)
+            return {}
+        except Exception:
+            # Estado da sessão indefinido: a próxima amostra empresta outra conexão
+            self._conexao = None
+            pool.devolver(conexao, descartar=True)
+            raise
+
+        self._registrar_amostra(linhas, time.time())
+        return {}
+
+    def _registrar_amostra(self, linhas: List[tuple], agora: float) -> None:
+        vistas = set()
+        for thread_id, evento_id, conexao_id, usuario, banco, comando, estado, espera_ps, texto, sql in linhas:
+            chave = (thread_id, evento_id)
+            decorrido = int(espera_ps or 0) / _PS_POR_S
+            vistas.add(chave)
+            rastreada = self._rastreadas.get(chave)
+            if rastreada is None:
+                texto = texto or ''
+                fingerprint, normalizada = normalizar_consulta(texto)
+                self._rastreadas[chave] = {
+                    'id': conexao_id,
+                    'usuario': usuario or 'desconhecido',
+                    'banco': banco or 'N/A',
+                    'comando': comando or 'N/A',
+                    'estado': estado or 'N/A',
+                    'query': texto[:self.tamanho_texto] + ('...' if len(texto) > self.tamanho_texto else ''),
+                    'fingerprint': fingerprint,
+                    'consulta_normalizada': normalizada[:self.tamanho_texto],
+                    'inicio': agora - decorrido,
+                    'duracao_s': decorrido,
+                    # Texto com os valores reais, para o EXPLAIN (não é publicado)
+                    'texto_completo': sql,
+                }
+            else:
+                rastreada['duracao_s'] = max(rastreada['duracao_s'], decorrido)
+                rastreada['estado'] = estado or rastreada['estado']
+
+        # Sumiu da amostra: terminou entre a última vez em que foi vista e agora
+        concluidas = []
+        for chave in [chave for chave in self._rastreadas if chave not in vistas]:
+            rastreada = self._rastreadas.pop(chave)
+            # Filtra pela duração observada; o limite superior (até esta amostra) é só informativo
+            duracao_maxima = agora - rastreada['inicio']
+            if rastreada['duracao_s'] >= self.limite_s:
+                rastreada.pop('texto_completo')
+                concluidas.append(dict(rastreada, fim=agora, duracao_s=round(rastreada['duracao_s'], 3),
+                                       duracao_maxima_s=round(duracao_maxima, 3)))
+
+        em_execucao = sorted(
+            (dict(r, duracao_s=round(agora - r['inicio'], 3)) for r in self._rastreadas.values()),
+            key=lambda r: r['duracao_s'], reverse=True
+        )
+        with self._lock:
+            self._concluidas.extend(concluidas)
+            self._em_execucao = em_execucao
+            self._amostras += 1
+
+
+def _agrupar_ofensores(concluidas: List[Dict[str, Any]], top_n: int = 5) -> List[Dict[str, Any]]:
+    """Instruções concluídas agrupadas por fingerprint, ordenadas pelo tempo somado"""
+    grupos: Dict[str, Dict[str, Any]] = {}
+    for evento in concluidas:
+        grupo = grupos.setdefault(evento['fingerprint'], {
+            'fingerprint': evento['fingerprint'], 'query': evento['consulta_normalizada'],
+            'exemplo': evento['query'], 'banco': evento['banco'], 'ocorrencias': 0,
+            'tempo_total_s': 0.0, 'duracao_maxima_s': 0.0,
+        })
+        grupo['ocorrencias'] += 1
+        grupo['tempo_total_s'] += evento['duracao_s']
+        grupo['duracao_maxima_s'] = max(grupo['duracao_maxima_s'], evento['duracao_maxima_s'])
+
+    ofensores = sorted(grupos.values(), key=lambda g: g['tempo_total_s'], reverse=True)[:top_n]
+    for grupo in ofensores:
+        grupo['duracao_media_s'] = round(grupo['tempo_total_s'] / grupo['ocorrencias'], 2)
+        grupo['tempo_total_s'] = round(grupo['tempo_total_s'], 2)
+    return ofensores
+
+
+def queries_lentas_da_amostra(amostra: Dict[str, Any], limite: float = LIMITE_QUERY_LENTA) -> List[Dict[str, Any]]:
+    """
+    Instruções em execução há mais de `limite` segundos, no formato de queries_lentas
+
+    Args:
+        amostra: Resultado de AmostradorInstrucoes.obter()
+        limite: Duração mínima em segundos
+
+    Returns:
+        Até 10 instruções, da mais longa para a mais curta
+    """
+    return [{
+        'id': instrucao['id'],
+        'usuario': instrucao['usuario'],
+        'banco': instrucao['banco'],
+        'comando': instrucao['comando'],
+        'tempo_segundos': int(instrucao['duracao_s']),
+        'estado': instrucao['estado'],
+        'query': instrucao['query'],
+        'fingerprint': instrucao['fingerprint'],
+        'consulta_normalizada': instrucao['consulta_normalizada'],
+        'texto_completo': instrucao['texto_completo'],
+    } for instrucao in amostra['em_execucao'] if instrucao['duracao_s'] > limite][:10]
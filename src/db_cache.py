@@ -0,0 +1,136 @@
+from typing import Dict, Any, Callable, Optional
+import threading
+import time
+
+from src.coletores import AgendadorColetores
+from src.db_pool import PoolConexoes
+
+
+# Limite por instrução (s) das consultas em segundo plano, acima do timeout da coleta
+TEMPO_CONSULTA_SEGUNDO_PLANO = 120.0
+
+# Espera mínima (s) entre tentativas de primeira carga que falharam
+RETENTAR_CARGA = 30.0
+
+
+class CacheConsultaDB:
+    """
+    Cache com TTL para consultas caras e de variação lenta no banco
+
+    Com um pool, a consulta é reexecutada em segundo plano a cada `ttl`
+    segundos (AgendadorColetores com conexão emprestada) e quem lê nunca
+    espera pela varredura, nem pela primeira: até ela terminar é exposto o
+    valor pendente, com idade None. Com uma conexão avulsa, que não pode
+    ser usada por outra thread, a consulta é refeita no próprio chamador
+    quando o valor expira. Em ambos os casos uma falha mantém o último
+    valor, e a idade exposta mostra o quanto ele é antigo. Se a primeira
+    carga pelo pool falhar, uma nova tentativa é antecipada pela leitura
+    seguinte após RETENTAR_CARGA segundos, sem esperar o ttl.
+    """
+
+    def __init__(self, nome: str, consulta: Callable[[Any], Dict[str, Any]], ttl: float = 300.0,
+                 tempo_consulta: Optional[float] = TEMPO_CONSULTA_SEGUNDO_PLANO,
+                 pendente: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            nome: Nome da consulta (e da thread de atualização)
+            consulta: Função (conexão) -> dicionário de métricas
+            ttl: Validade do valor em segundos
+            tempo_consulta: Limite por instrução (s) na conexão emprestada do
+                pool; None mantém o timeout_consulta do pool
+            pendente: Valor exposto enquanto a primeira carga em segundo plano
+                não termina (vazio por padrão)
+        """
+        self.nome = nome
+        self.consulta = consulta
+        self.ttl = ttl
+        self.tempo_consulta = tempo_consulta
+        self.pendente = pendente or {}
+        self._lock = threading.Lock()
+        self._lock_carga = threading.Lock()
+        self._pool: Optional[PoolConexoes] = None
+        self._valor: Optional[Dict[str, Any]] = None
+        self._coletado_em = 0.0
+        self._agendador: Optional[AgendadorColetores] = None
+        self._falhou_em: Optional[float] = None
+        self._pool_gancho: Optional[PoolConexoes] = None
+
+    def obter(self, fonte) -> Dict[str, Any]:
+        """
+        Retorna o valor em cache, carregando-o na primeira chamada
+
+        Args:
+            fonte: PoolConexoes (atualização em segundo plano) ou conexão ativa
+
+        Returns:
+            Cópia do valor com 'idade_cache_s'; com pool, o valor pendente
+            (idade None) até a primeira carga terminar
+        """
+        if isinstance(fonte, PoolConexoes):
+            self._iniciar_atualizacao(fonte)
+            with self._lock:
+                if self._valor is None:
+                    return dict(self.pendente, idade_cache_s=None)
+        elif self._valor is None or time.monotonic() - self._coletado_em >= self.ttl:
+            try:
+                self._atualizar(fonte)
+            except Exception:
+                if self._valor is None:
+                    raise
+
+        with self._lock:
+            if self._valor is None:
+                raise Exception(f"Consulta '{self.nome}' ainda sem valor em cache")
+            valor = dict(self._valor)
+            valor['idade_cache_s'] = round(time.monotonic() - self._coletado_em, 1)
+            return valor
+
+    def definir_ttl(self, ttl: float) -> None:
+        """Altera a validade; com atualização em segundo plano, vale a partir do próximo ciclo"""
+        if ttl == self.ttl:
+            return
+        self.ttl = ttl
+        agendador, pool = self._agendador, self._pool
+        if agendador is not None and pool is not None:
+            agendador.registrar(self.nome, lambda: self._atualizar_pelo_pool(pool), ttl)
+
+    def parar(self) -> None:
+        """Encerra a atualização em segundo plano"""
+        agendador, self._agendador = self._agendador, None
+        self._pool = None
+        if agendador is not None:
+            agendador.parar(timeout=1.0)
+
+    def _atualizar(self, conexao) -> Dict[str, Any]:
+        valor = self.consulta(conexao)
+        with self._lock:
+            self._valor = valor
+            self._coletado_em = time.monotonic()
+        return valor
+
+    def _atualizar_pelo_pool(self, pool: PoolConexoes) -> Dict[str, Any]:
+        try:
+            with pool.conexao(tempo_consulta=self.tempo_consulta) as conexao:
+                valor = self._atualizar(conexao)
+        except Exception:
+            if self._valor is None:
+                self._falhou_em = time.monotonic()
+            raise
+        self._falhou_em = None
+        return valor
+
+    def _iniciar_atualizacao(self, pool: PoolConexoes) -> None:
+        with self._lock_carga:
+            if self._agendador is None:
+                agendador = AgendadorColetores(f"CacheDB-{self.nome}")
+                # Coletor adiado: a primeira carga corre na thread, não em quem lê
+                agendador.registrar(self.nome, lambda: self._atualizar_pelo_pool(pool), self.ttl, adiado=True)
+                agendador.iniciar()
+                self._agendador, self._pool = agendador, pool
+                if self._pool_gancho is not pool:
+                    pool.ao_fechar(self.parar)
+                    self._pool_gancho = pool
+            elif self._falhou_em is not None and time.monotonic() - self._falhou_em >= RETENTAR_CARGA:
+                # Primeira carga falhou: nova tentativa sem esperar o ttl
+                self._falhou_em = None
+                self._agendador.antecipar([self.nome])
@@ -0,0 +1,148 @@
+from typing import Dict, Any, List, Optional
+import heapq
+import threading
+import time
+
+import mysql.connector
+
+
+# Colunas cumulativas de events_statements_summary_by_digest, na ordem da consulta
+CONTADORES_DIGEST = ('COUNT_STAR', 'SUM_TIMER_WAIT', 'SUM_ROWS_EXAMINED', 'SUM_ROWS_SENT',
+                     'SUM_CREATED_TMP_DISK_TABLES', 'SUM_NO_INDEX_USED')
+_CHAMADAS, _TEMPO, _EXAMINADAS, _ENVIADAS, _TMP_DISCO, _SEM_INDICE = range(len(CONTADORES_DIGEST))
+
+# A cada quantas coletas a tabela inteira é relida (remove digests descartados do snapshot)
+COLETAS_POR_VARREDURA = 60
+
+# Timers do performance_schema são em picossegundos
+_PS_POR_MS = 1_000_000_000
+
+
+class ColetorDigest:
+    """
+    Ranking de instruções por tempo total de banco, a partir dos digests
+
+    Mantém o snapshot anterior de events_statements_summary_by_digest
+    (chave: schema + digest) e calcula as diferenças a cada coleta, o que
+    revela consultas rápidas porém muito frequentes que nunca aparecem no
+    PROCESSLIST. Depois da primeira carga só são lidos os digests com
+    LAST_SEEN posterior à coleta anterior.
+    """
+
+    def __init__(self, top_n: int = 10, tamanho_texto: int = 200):
+        """
+        Args:
+            top_n: Quantidade de digests no ranking
+            tamanho_texto: Tamanho máximo do texto normalizado exibido
+        """
+        self.top_n = top_n
+        self.tamanho_texto = tamanho_texto
+        self.disponivel = True
+        self._anterior: Dict[tuple, tuple] = {}
+        self._textos: Dict[tuple, str] = {}
+        self._visto_ate = None
+        self._instante: Optional[float] = None
+        self._coletas = 0
+        self._lock = threading.Lock()
+
+    def coletar(self, cursor) -> Dict[str, Any]:
+        """
+        Lê os digests alterados desde a última coleta e calcula o ranking
+
+        Args:
+            cursor: Cursor (sem dictionary) de uma conexão exclusiva
+
+        Returns:
+            Dicionário com 'top_digests' e 'tempo_total_db_ms' do intervalo;
+            vazio na primeira coleta ou sem performance_schema
+        """
+        # Coletas simultâneas da mesma fonte compartilham o snapshot
+        with self._lock:
+            return self._coletar(cursor)
+
+    def _coletar(self, cursor) -> Dict[str, Any]:
+        if not self.disponivel:
+            return {}
+
+        varredura_completa = self._visto_ate is None or self._coletas % COLETAS_POR_VARREDURA == 0
+        consulta = (
+            "SELECT NOW(6), SCHEMA_NAME, DIGEST, DIGEST_TEXT, " + ", ".join(CONTADORES_DIGEST) +
+            " FROM performance_schema.events_statements_summary_by_digest WHERE DIGEST IS NOT NULL"
+        )
+        parametros = ()
+        if not varredura_completa:
+            consulta += " AND LAST_SEEN >= %s"
+            parametros = (self._visto_ate,)
+
+        try:
+            cursor.execute(consulta, parametros)
+            linhas = cursor.fetchall()
+        except mysql.connector.Error:
+            # performance_schema desligado ou sem privilégio de leitura
+            self.disponivel = False
+            return {}
+
+        agora = time.monotonic()
+        # Leitura incremental atualiza o snapshot no lugar; a completa o substitui
+        atual: Dict[tuple, tuple] = {} if varredura_completa else self._anterior
+        deltas = []
+        for linha in linhas:
+            self._visto_ate = linha[0]
+            chave = (linha[1], linha[2])
+            contadores = tuple(int(valor or 0) for valor in linha[4:])
+            base = self._anterior.get(chave)
+            atual[chave] = contadores
+            if chave not in self._textos:
+                # Só o trecho exibido fica em memória (até milhares de digests)
+                texto = linha[3] or ''
+                self._textos[chave] = texto[:self.tamanho_texto] + ('...' if len(texto) > self.tamanho_texto else '')
+
+            if base is None or contadores[_CHAMADAS] < base[_CHAMADAS]:
+                # Digest novo ou tabela truncada: o delta é o próprio acumulado,
+                # exceto na carga inicial, que só forma a base
+                if self._instante is None:
+                    continue
+                base = (0,) * len(CONTADORES_DIGEST)
+            delta = tuple(c - b for c, b in zip(contadores, base))
+            if delta[_CHAMADAS] > 0:
+                deltas.append((chave, delta))
+
+        if varredura_completa:
+            self._textos = {chave: self._textos[chave] for chave in atual if chave in self._textos}
+        self._anterior = atual
+        instante, self._instante = self._instante, agora
+        self._coletas += 1
+
+        if instante is None:
+            return {}
+        return self._ranking(deltas, agora - instante)
+
+    def _ranking(self, deltas: List[tuple], duracao: float) -> Dict[str, Any]:
+        tempo_total = sum(delta[_TEMPO] for _, delta in deltas)
+        maiores = heapq.nlargest(self.top_n, deltas, key=lambda item: item[1][_TEMPO])
+
+        top = []
+        for (schema, digest), delta in maiores:
+            chamadas = delta[_CHAMADAS]
+            enviadas = delta[_ENVIADAS]
+            top.append({
+                'digest': digest,
+                'schema': schema or 'N/A',
+                'texto': self._textos.get((schema, digest), ''),
+                'chamadas': chamadas,
+                'chamadas_s': round(chamadas / duracao, 2) if duracao > 0 else None,
+                'tempo_total_ms': round(delta[_TEMPO] / _PS_POR_MS, 2),
+                'latencia_media_ms': round(delta[_TEMPO] / chamadas / _PS_POR_MS, 3),
+                'linhas_examinadas': delta[_EXAMINADAS],
+                'linhas_enviadas': enviadas,
+                'examinadas_por_enviada': round(delta[_EXAMINADAS] / enviadas, 1) if enviadas else None,
+                'tmp_disco': delta[_TMP_DISCO],
+                'sem_indice': delta[_SEM_INDICE],
+                'percentual_tempo': round(delta[_TEMPO] / tempo_total * 100, 1) if tempo_total else 0.0,
+            })
+
+        return {
+            'top_digests': top,
+            'tempo_total_db_ms': round(tempo_total / _PS_POR_MS, 2),
+            'janela_digests_s': round(duracao, 1),
+        }
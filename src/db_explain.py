@@ -0,0 +1,225 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+import json
+import threading
+import time
+
+import mysql.connector
+
+from src.db_pool import PoolConexoes
+
+
+# Tipos de acesso que leem a tabela (ou o índice) inteira
+ACESSOS_COMPLETOS = {'ALL': 'varredura completa da tabela', 'index': 'varredura completa do índice'}
+
+
+class CachePlanos:
+    """
+    Planos de execução (EXPLAIN FORMAT=JSON) por fingerprint de consulta
+
+    Cada fingerprint é explicado uma vez e o plano fica em cache por `ttl`
+    segundos (com no máximo `maximo` entradas, descartando as mais antigas).
+    Com um pool, o EXPLAIN roda numa conexão emprestada à parte por uma
+    única thread de fundo: a coleta nunca espera pelo plano, que aparece a
+    partir da coleta seguinte. Com uma conexão avulsa ele roda na própria
+    coleta. Em ambos os casos lock_wait_timeout limita a espera por
+    metadata locks, o único ponto em que um EXPLAIN pode travar.
+    """
+
+    def __init__(self, ttl: float = 600.0, timeout_s: int = 2, maximo: int = 256):
+        """
+        Args:
+            ttl: Validade de cada plano em segundos
+            timeout_s: Espera máxima por locks (e por conexão livre) no EXPLAIN
+            maximo: Quantidade máxima de planos em cache
+        """
+        self.ttl = ttl
+        self.timeout_s = timeout_s
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._planos: "OrderedDict[str, tuple]" = OrderedDict()
+        self._pendentes: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def obter(self, fonte, fingerprint: str, sql: str, banco: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o plano da consulta, solicitando-o se ainda não estiver em cache
+
+        Args:
+            fonte: PoolConexoes (EXPLAIN em segundo plano) ou conexão ativa
+            fingerprint: Fingerprint da consulta (chave do cache)
+            sql: Texto completo de uma execução da consulta
+            banco: Banco em que a consulta foi executada
+
+        Returns:
+            Resumo do plano com 'idade_s', ou None enquanto não houver plano
+        """
+        with self._lock:
+            entrada = self._planos.get(fingerprint)
+            valido = entrada is not None and time.monotonic() - entrada[0] < self.ttl
+
+        if not valido:
+            if isinstance(fonte, PoolConexoes):
+                self._solicitar(fonte, fingerprint, sql, banco)
+            else:
+                self._guardar(fingerprint, _explicar(fonte, sql, banco, self.timeout_s)[0])
+                with self._lock:
+                    entrada = self._planos.get(fingerprint)
+
+        if entrada is None:
+            return None
+        plano = dict(entrada[1])
+        plano['idade_s'] = round(time.monotonic() - entrada[0], 1)
+        return plano
+
+    def parar(self) -> None:
+        """Encerra a thread de EXPLAIN em segundo plano"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _solicitar(self, pool: PoolConexoes, fingerprint: str, sql: str, banco: Optional[str]) -> None:
+        with self._lock:
+            if fingerprint in self._pendentes:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ExplainDB")
+                pool.ao_fechar(self.parar)
+            self._pendentes.add(fingerprint)
+            self._executor.submit(self._explicar_pelo_pool, pool, fingerprint, sql, banco)
+
+    def _explicar_pelo_pool(self, pool: PoolConexoes, fingerprint: str, sql: str, banco: Optional[str]) -> None:
+        try:
+            conexao = pool.emprestar(self.timeout_s)
+            restaurada = False
+            try:
+                plano, restaurada = _explicar(conexao, sql, banco, self.timeout_s)
+            finally:
+                # Sessão que não voltou ao estado original não serve a outra coleta
+                pool.devolver(conexao, descartar=not restaurada)
+        except Exception as e:
+            plano = {'erro': str(e)}
+        finally:
+            with self._lock:
+                self._pendentes.discard(fingerprint)
+        self._guardar(fingerprint, plano)
+
+    def _guardar(self, fingerprint: str, plano: Dict[str, Any]) -> None:
+        with self._lock:
+            self._planos[fingerprint] = (time.monotonic(), plano)
+            self._planos.move_to_end(fingerprint)
+            while len(self._planos) > self.maximo:
+                self._planos.popitem(last=False)
+
+
+def explicavel(consulta_normalizada: str) -> bool:
+    """Só consultas de leitura são explicadas"""
+    return consulta_normalizada.startswith(('select ', 'with ', '(select '))
+
+
+def _explicar(conexao: mysql.connector.MySQLConnection, sql: str, banco: Optional[str],
+              timeout_s: int) -> Tuple[Dict[str, Any], bool]:
+    """
+    Executa EXPLAIN FORMAT=JSON no banco da consulta e resume o plano
+
+    Returns:
+        Resumo do plano (ou 'erro') e se a sessão voltou ao estado original
+    """
+    cursor = conexao.cursor()
+    try:
+        banco_original = None
+        try:
+            cursor.execute("SELECT DATABASE()")
+            banco_original = cursor.fetchone()[0]
+            cursor.execute("SET SESSION lock_wait_timeout = %s", (max(int(timeout_s), 1),))
+            if banco and banco != banco_original:
+                cursor.execute(f"USE {_identificador(banco)}")
+            cursor.execute(f"EXPLAIN FORMAT=JSON {sql}")
+            linha = cursor.fetchone()
+            cursor.fetchall()
+            plano = resumir_plano(json.loads(linha[0]))
+        except (mysql.connector.Error, ValueError, TypeError) as e:
+            # Texto truncado, sintaxe não explicável ou sem privilégio na tabela
+            plano = {'erro': str(e)}
+        return plano, _restaurar_sessao(cursor, banco, banco_original)
+    finally:
+        cursor.close()
+
+
+def _restaurar_sessao(cursor, banco: Optional[str], banco_original: Optional[str]) -> bool:
+    """Desfaz o lock_wait_timeout e a troca de banco do EXPLAIN; False se não foi possível"""
+    try:
+        cursor.execute("SET SESSION lock_wait_timeout = DEFAULT")
+        if banco and banco != banco_original:
+            if not banco_original:
+                # Sem banco padrão não há USE que desfaça a troca
+                return False
+            cursor.execute(f"USE {_identificador(banco_original)}")
+        return True
+    except mysql.connector.Error:
+        return False
+
+
+def _identificador(nome: str) -> str:
+    return "`" + nome.replace("`", "``") + "`"
+
+
+def resumir_plano(plano: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extrai do JSON do EXPLAIN o que explica uma consulta lenta
+
+    Args:
+        plano: Documento retornado por EXPLAIN FORMAT=JSON
+
+    Returns:
+        Dicionário com custo, tabelas e seus tipos de acesso, varreduras
+        completas, uso de filesort e de tabela temporária
+    """
+    tabelas: List[Dict[str, Any]] = []
+    sinais = {'filesort': False, 'tabela_temporaria': False}
+
+    def _visitar(no):
+        if isinstance(no, list):
+            for item in no:
+                _visitar(item)
+            return
+        if not isinstance(no, dict):
+            return
+        if no.get('using_filesort'):
+            sinais['filesort'] = True
+        if no.get('using_temporary_table'):
+            sinais['tabela_temporaria'] = True
+        tabela = no.get('table')
+        if isinstance(tabela, dict) and 'table_name' in tabela:
+            tabelas.append({
+                'tabela': tabela['table_name'],
+                'acesso': tabela.get('access_type', 'N/A'),
+                'indice': tabela.get('key'),
+                'indices_possiveis': tabela.get('possible_keys', []),
+                'linhas': int(float(tabela.get('rows_examined_per_scan', 0) or 0)),
+                'condicao': (tabela.get('attached_condition') or '')[:120] or None,
+            })
+        for chave, valor in no.items():
+            if chave != 'table' or not isinstance(valor, dict):
+                _visitar(valor)
+            else:
+                # A tabela pode conter subconsultas materializadas
+                _visitar({k: v for k, v in valor.items() if k != 'table_name'})
+
+    bloco = plano.get('query_block', {})
+    _visitar(bloco)
+
+    varreduras = [
+        dict(tabela, descricao=ACESSOS_COMPLETOS[tabela['acesso']])
+        for tabela in tabelas if tabela['acesso'] in ACESSOS_COMPLETOS
+    ]
+    custo = (bloco.get('cost_info') or {}).get('query_cost')
+    return {
+        'custo': float(custo) if custo is not None else None,
+        'tabelas': tabelas,
+        'varreduras_completas': varreduras,
+        'filesort': sinais['filesort'],
+        'tabela_temporaria': sinais['tabela_temporaria'],
+    }
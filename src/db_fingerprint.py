@@ -0,0 +1,112 @@
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
+import hashlib
+import re
+
+
+# Instruções normalizadas mantidas em cache (as mais recentes)
+TAMANHO_CACHE = 2048
+
+# Só o início de instruções enormes (INSERTs em lote) entra na normalização e no cache
+TAMANHO_MAXIMO = 8192
+
+# Comentários, literais (texto, hexadecimal, números) e identificadores entre crases, na ordem
+# em que aparecem, para que um '--' dentro de uma string não seja tratado como comentário
+_TOKENS = re.compile(r"""
+    (?P<comentario>/\*.*?(?:\*/|$)|--\s[^\n]*|\#[^\n]*)
+  | (?P<literal>
+        '(?:[^'\\]|\\.|'')*'?
+      | "(?:[^"\\]|\\.|"")*"?
+      | \b0x[0-9a-fA-F]+\b
+      | \b[xXbB]'[0-9a-fA-F]*'
+      | (?<![\w.`$])[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b
+    )
+  | (?P<identificador>`[^`]*`?)
+""", re.S | re.X)
+
+_ESPACOS = re.compile(r"\s+")
+_OPERADORES = re.compile(r" ?(<=>|<=|>=|<>|!=|=|<|>) ?")
+_VIRGULAS = re.compile(r" ?, ?")
+_PARENTESES = re.compile(r"\( ?| ?\)")
+_ABRE_LISTA = re.compile(r"\b(in|values?) ?\(")
+_LISTA_IN = re.compile(r"\bin \(\?(?:, \?)*\)?")
+_LINHAS_VALUES = re.compile(r"\b(values?) (\([^()]*\))(?:, \([^()]*\))*")
+
+
+def _substituir(token: re.Match) -> str:
+    if token.lastgroup == 'comentario':
+        return ' '
+    if token.lastgroup == 'literal':
+        return '?'
+    return token.group()
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _normalizar(texto: str) -> Tuple[str, str]:
+    normalizada = _TOKENS.sub(_substituir, texto)
+    normalizada = _ESPACOS.sub(' ', normalizada).strip().rstrip(';').strip().lower()
+    # Espaçamento canônico: "id=?" e "id = ?" são a mesma instrução
+    normalizada = _OPERADORES.sub(r' \1 ', normalizada)
+    normalizada = _VIRGULAS.sub(', ', normalizada)
+    normalizada = _PARENTESES.sub(lambda m: m.group().strip(), normalizada)
+    normalizada = _ABRE_LISTA.sub(r'\1 (', normalizada)
+    normalizada = _LISTA_IN.sub('in (?+)', normalizada)
+    # INSERT em lote: qualquer número de linhas tem o mesmo fingerprint
+    normalizada = _LINHAS_VALUES.sub(r'\1 \2', normalizada)
+    fingerprint = hashlib.blake2b(normalizada.encode('utf-8', 'replace'), digest_size=8).hexdigest()
+    return fingerprint, normalizada
+
+
+def normalizar_consulta(texto: str) -> Tuple[str, str]:
+    """
+    Normaliza uma instrução SQL e calcula o seu fingerprint
+
+    Literais viram '?', listas de IN e linhas de VALUES são colapsadas,
+    comentários são removidos e espaços/maiúsculas unificados, de modo que
+    a mesma instrução com valores diferentes tenha o mesmo fingerprint. O
+    resultado fica num cache LRU: instruções repetidas são normalizadas
+    uma única vez.
+
+    Args:
+        texto: Instrução SQL original
+
+    Returns:
+        Tupla (fingerprint hexadecimal de 16 caracteres, texto normalizado)
+    """
+    return _normalizar((texto or '')[:TAMANHO_MAXIMO])
+
+
+def agrupar_por_fingerprint(queries: List[Dict[str, Any]], tamanho_texto: int = 200) -> List[Dict[str, Any]]:
+    """
+    Agrupa consultas lentas pelo fingerprint
+
+    Args:
+        queries: Itens com 'fingerprint', 'consulta_normalizada' e 'tempo_segundos'
+        tamanho_texto: Tamanho máximo do texto normalizado exibido
+
+    Returns:
+        Grupos com ocorrências e tempo acumulado, do maior tempo total para o menor
+    """
+    grupos: Dict[str, Dict[str, Any]] = {}
+    for query in queries:
+        grupo = grupos.get(query['fingerprint'])
+        if grupo is None:
+            normalizada = query['consulta_normalizada']
+            grupo = grupos[query['fingerprint']] = {
+                'fingerprint': query['fingerprint'],
+                'consulta_normalizada': normalizada[:tamanho_texto] + ('...' if len(normalizada) > tamanho_texto else ''),
+                'exemplo': query.get('query'),
+                'ocorrencias': 0,
+                'tempo_total_s': 0,
+                'tempo_maximo_s': 0,
+                'usuarios': [],
+                'bancos': [],
+            }
+        grupo['ocorrencias'] += 1
+        grupo['tempo_total_s'] += query.get('tempo_segundos', 0)
+        grupo['tempo_maximo_s'] = max(grupo['tempo_maximo_s'], query.get('tempo_segundos', 0))
+        for campo, chave in (('usuarios', 'usuario'), ('bancos', 'banco')):
+            if query.get(chave) and query[chave] not in grupo[campo]:
+                grupo[campo].append(query[chave])
+
+    return sorted(grupos.values(), key=lambda g: g['tempo_total_s'], reverse=True)
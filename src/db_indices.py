@@ -0,0 +1,175 @@
+from typing import Dict, Any, List, Optional
+import threading
+import time
+
+import mysql.connector
+
+
+# Schemas do próprio servidor, fora da análise
+SCHEMAS_SISTEMA = ('mysql', 'performance_schema', 'sys', 'information_schema')
+
+# Itens exibidos em cada ranking
+TOP_N = 5
+
+# Timers do performance_schema são em picossegundos
+_PS_POR_MS = 1_000_000_000
+
+_CONTADORES = "COUNT_READ, SUM_TIMER_READ, COUNT_WRITE, SUM_TIMER_WRITE"
+_LEITURAS, _TEMPO_LEITURA, _ESCRITAS, _TEMPO_ESCRITA = range(4)
+
+
+class ColetorIndices:
+    """
+    Tabelas quentes, índices sem uso e leituras sem índice
+
+    Lê table_io_waits_summary_by_table e table_io_waits_summary_by_index_usage
+    e calcula as diferenças de contagem e latência de leitura/escrita desde
+    a execução anterior. Pensado para rodar de tempos em tempos pelo
+    CacheConsultaDB (em segundo plano com pool): as duas tabelas têm uma
+    linha por tabela/índice e custam mais que os contadores globais. Os
+    índices sem uso são avaliados sobre o acumulado desde o início do
+    servidor, já que uma janela curta não prova que um índice nunca é lido:
+    como em sys.schema_unused_indexes, são os secundários com COUNT_STAR = 0
+    (o performance_schema não atribui a manutenção a cada índice, por isso o
+    custo exibido é o das escritas na tabela).
+    """
+
+    def __init__(self, top_n: int = TOP_N):
+        """
+        Args:
+            top_n: Quantidade de itens em cada ranking
+        """
+        self.top_n = top_n
+        self.disponivel = True
+        self._lock = threading.Lock()
+        self._tabelas: Dict[tuple, tuple] = {}
+        self._indices: Dict[tuple, tuple] = {}
+        self._instante: Optional[float] = None
+
+    def coletar(self, conexao: mysql.connector.MySQLConnection) -> Dict[str, Any]:
+        """
+        Lê os resumos de I/O e monta os rankings
+
+        Args:
+            conexao: Conexão de uso exclusivo durante a leitura
+
+        Returns:
+            Dicionário com 'tabelas_quentes' e 'varreduras_sem_indice' (vazios
+            na primeira execução), 'indices_nao_usados' e 'janela_s'; vazio
+            sem performance_schema
+        """
+        with self._lock:
+            if not self.disponivel:
+                return {}
+            cursor = conexao.cursor()
+            try:
+                tabelas = _ler(cursor, "OBJECT_SCHEMA, OBJECT_NAME",
+                               "performance_schema.table_io_waits_summary_by_table")
+                indices = _ler(cursor, "OBJECT_SCHEMA, OBJECT_NAME, INDEX_NAME",
+                               "performance_schema.table_io_waits_summary_by_index_usage")
+                sem_uso = _ler_sem_uso(cursor)
+            except mysql.connector.ProgrammingError:
+                # performance_schema desligado ou sem privilégio de leitura
+                self.disponivel = False
+                return {}
+            finally:
+                cursor.close()
+
+            agora = time.monotonic()
+            primeira = self._instante is None
+            deltas_tabelas = _deltas(tabelas, self._tabelas)
+            deltas_indices = _deltas(indices, self._indices)
+            instante, self._instante = self._instante, agora
+            self._tabelas, self._indices = tabelas, indices
+
+        resultado = {
+            'tabelas_quentes': [],
+            'varreduras_sem_indice': [],
+            'indices_nao_usados': self._nao_usados(sem_uso, tabelas),
+            'janela_s': None,
+        }
+        if not primeira:
+            resultado['tabelas_quentes'] = self._quentes(deltas_tabelas)
+            resultado['varreduras_sem_indice'] = self._sem_indice(deltas_indices, deltas_tabelas)
+            resultado['janela_s'] = round(agora - instante, 1)
+        return resultado
+
+    def _quentes(self, deltas: Dict[tuple, tuple]) -> List[Dict[str, Any]]:
+        """Tabelas com maior latência de I/O somada no intervalo"""
+        total = sum(delta[_TEMPO_LEITURA] + delta[_TEMPO_ESCRITA] for delta in deltas.values())
+        maiores = sorted(deltas.items(), key=lambda item: item[1][_TEMPO_LEITURA] + item[1][_TEMPO_ESCRITA],
+                         reverse=True)[:self.top_n]
+        return [{
+            'tabela': f"{schema}.{nome}",
+            'leituras': delta[_LEITURAS],
+            'escritas': delta[_ESCRITAS],
+            'latencia_leitura_ms': round(delta[_TEMPO_LEITURA] / _PS_POR_MS, 2),
+            'latencia_escrita_ms': round(delta[_TEMPO_ESCRITA] / _PS_POR_MS, 2),
+            'percentual_latencia': round((delta[_TEMPO_LEITURA] + delta[_TEMPO_ESCRITA]) / total * 100, 1),
+        } for (schema, nome), delta in maiores if delta[_TEMPO_LEITURA] + delta[_TEMPO_ESCRITA] > 0]
+
+    def _sem_indice(self, deltas_indices: Dict[tuple, tuple], deltas_tabelas: Dict[tuple, tuple]) -> List[Dict[str, Any]]:
+        """Linhas lidas sem índice (INDEX_NAME nulo) no intervalo, por tabela"""
+        varreduras = []
+        for (schema, nome, indice), delta in deltas_indices.items():
+            if indice is not None or delta[_LEITURAS] == 0:
+                continue
+            leituras_tabela = deltas_tabelas.get((schema, nome), delta)[_LEITURAS]
+            varreduras.append({
+                'tabela': f"{schema}.{nome}",
+                'linhas_lidas': delta[_LEITURAS],
+                'latencia_ms': round(delta[_TEMPO_LEITURA] / _PS_POR_MS, 2),
+                'percentual_leituras': round(delta[_LEITURAS] / leituras_tabela * 100, 1) if leituras_tabela else 100.0,
+            })
+        varreduras.sort(key=lambda item: item['latencia_ms'], reverse=True)
+        return varreduras[:self.top_n]
+
+    def _nao_usados(self, sem_uso: List[tuple], tabelas: Dict[tuple, tuple]) -> List[Dict[str, Any]]:
+        """Índices secundários nunca usados desde o início do servidor em tabelas que recebem escritas"""
+        nao_usados = []
+        for schema, nome, indice in sem_uso:
+            # Cada escrita na tabela também mantém o índice
+            contadores = tabelas.get((schema, nome))
+            if contadores is None or contadores[_ESCRITAS] == 0:
+                continue
+            nao_usados.append({
+                'tabela': f"{schema}.{nome}",
+                'indice': indice,
+                'escritas_tabela': contadores[_ESCRITAS],
+                'latencia_escrita_tabela_ms': round(contadores[_TEMPO_ESCRITA] / _PS_POR_MS, 2),
+            })
+        nao_usados.sort(key=lambda item: item['latencia_escrita_tabela_ms'], reverse=True)
+        return nao_usados[:self.top_n]
+
+
+def _ler(cursor, chaves: str, tabela: str) -> Dict[tuple, tuple]:
+    """Contadores de leitura/escrita por chave, só das linhas com atividade"""
+    quantidade = chaves.count(',') + 1
+    marcadores = ', '.join(['%s'] * len(SCHEMAS_SISTEMA))
+    cursor.execute(f"SELECT {chaves}, {_CONTADORES} FROM {tabela} "
+                   f"WHERE COUNT_STAR > 0 AND OBJECT_SCHEMA NOT IN ({marcadores})", SCHEMAS_SISTEMA)
+    return {tuple(linha[:quantidade]): tuple(int(valor or 0) for valor in linha[quantidade:])
+            for linha in cursor.fetchall()}
+
+
+def _ler_sem_uso(cursor) -> List[tuple]:
+    """Índices secundários sem nenhum evento de I/O (COUNT_STAR = 0), como sys.schema_unused_indexes"""
+    marcadores = ', '.join(['%s'] * len(SCHEMAS_SISTEMA))
+    cursor.execute(f"SELECT OBJECT_SCHEMA, OBJECT_NAME, INDEX_NAME "
+                   f"FROM performance_schema.table_io_waits_summary_by_index_usage "
+                   f"WHERE INDEX_NAME IS NOT NULL AND INDEX_NAME <> 'PRIMARY' AND COUNT_STAR = 0 "
+                   f"AND OBJECT_SCHEMA NOT IN ({marcadores})", SCHEMAS_SISTEMA)
+    return [tuple(linha) for linha in cursor.fetchall()]
+
+
+def _deltas(atual: Dict[tuple, tuple], anterior: Dict[tuple, tuple]) -> Dict[tuple, tuple]:
+    """Diferenças por chave; contador menor que o anterior indica TRUNCATE do resumo"""
+    deltas = {}
+    for chave, contadores in atual.items():
+        base = anterior.get(chave)
+        if base is None or contadores[_LEITURAS] < base[_LEITURAS] or contadores[_ESCRITAS] < base[_ESCRITAS]:
+            base = (0,) * len(contadores)
+        delta = tuple(c - b for c, b in zip(contadores, base))
+        if delta[_LEITURAS] or delta[_ESCRITAS]:
+            deltas[chave] = delta
+    return deltas
@@ -0,0 +1,235 @@
+from typing import Dict, Any, List, Optional
+import re
+import threading
+import time
+
+import mysql.connector
+
+from src.db_taxas import MotorTaxas
+
+
+# Variáveis de status do InnoDB lidas junto com STATUS_GLOBAL (mesmo round trip)
+STATUS_INNODB = (
+    'Innodb_buffer_pool_read_requests', 'Innodb_buffer_pool_reads', 'Innodb_buffer_pool_wait_free',
+    'Innodb_buffer_pool_pages_total', 'Innodb_buffer_pool_pages_free', 'Innodb_buffer_pool_pages_dirty',
+    'Innodb_data_pending_reads', 'Innodb_data_pending_writes',
+    'Innodb_row_lock_waits', 'Innodb_row_lock_time', 'Innodb_row_lock_current_waits',
+)
+
+# Contadores cumulativos convertidos em taxas (o restante é instantâneo)
+CONTADORES_INNODB = ('innodb_buffer_pool_read_requests', 'innodb_buffer_pool_reads', 'innodb_buffer_pool_wait_free',
+                     'innodb_row_lock_waits', 'innodb_row_lock_time')
+
+# Contadores de INNODB_METRICS (os de LSN ficam desligados em algumas instalações)
+METRICAS_INNODB = ('trx_rseg_history_len', 'log_lsn_current', 'log_lsn_last_checkpoint')
+
+# A cada quantas coletas as variáveis de configuração (tamanhos) são relidas
+COLETAS_POR_VARIAVEIS = 60
+
+# Intervalo (s) entre leituras do SHOW ENGINE INNODB STATUS quando os LSNs não estão no INNODB_METRICS
+TTL_STATUS_ENGINE = 60.0
+
+# Pares bloqueador/bloqueado exibidos
+MAXIMO_BLOQUEIOS = 10
+
+_LSN_ATUAL = re.compile(r'^Log sequence number\s+(\d+)', re.MULTILINE)
+_LSN_CHECKPOINT = re.compile(r'^Last checkpoint at\s+(\d+)', re.MULTILINE)
+_MB = 1024 * 1024
+
+
+class ColetorInnoDB:
+    """
+    Buffer pool, esperas por lock de linha, redo log e purge do InnoDB
+
+    Os contadores vêm da leitura de status global já feita pela coleta; a
+    taxa de acerto do buffer pool e as esperas por lock são calculadas
+    sobre as diferenças entre coletas (MotorTaxas), e não sobre o
+    acumulado desde o boot, que esconde um buffer pool frio ou uma
+    contenção recente. Os pares bloqueador/bloqueado só são consultados
+    quando Innodb_row_lock_current_waits indica esperas em andamento. Com
+    o módulo 'log' do INNODB_METRICS desligado, a idade do checkpoint vem
+    do SHOW ENGINE INNODB STATUS, lido no máximo a cada TTL_STATUS_ENGINE
+    segundos.
+    """
+
+    def __init__(self):
+        self.taxas = MotorTaxas(CONTADORES_INNODB)
+        self._lock = threading.Lock()
+        self._variaveis: Dict[str, int] = {}
+        self._coletas = 0
+        self._sem_metricas_lsn = False
+        self._sem_bloqueios = False
+        self._lsn_engine: Optional[tuple] = None
+        self._lsn_engine_em = 0.0
+
+    def coletar(self, cursor, status: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Calcula as métricas do InnoDB
+
+        Args:
+            cursor: Cursor (sem dictionary) de uma conexão exclusiva
+            status: Variáveis de status já lidas (nomes minúsculos)
+
+        Returns:
+            Dicionário com as métricas; taxas ausentes (None) na primeira coleta
+        """
+        with self._lock:
+            if self._coletas % COLETAS_POR_VARIAVEIS == 0:
+                self._variaveis = _ler_variaveis(cursor)
+            self._coletas += 1
+
+            leitura = self.taxas.atualizar(status, int(status.get('uptime', 0) or 0))
+            metricas = _metricas_buffer_pool(status, leitura.get('taxas'), self._variaveis)
+            metricas.update(_metricas_locks(status, leitura.get('taxas')))
+            metricas.update(self._metricas_redo(cursor))
+
+            metricas['bloqueios'] = []
+            if metricas['esperas_lock_atuais'] > 0 and not self._sem_bloqueios:
+                try:
+                    metricas['bloqueios'] = _consultar_bloqueios(cursor)
+                except mysql.connector.Error:
+                    # Sem data_lock_waits (MySQL 5.7/MariaDB) ou sem privilégio
+                    self._sem_bloqueios = True
+            return metricas
+
+    def _metricas_redo(self, cursor) -> Dict[str, Any]:
+        """Idade do checkpoint (LSN atual - último checkpoint) e tamanho da history list"""
+        try:
+            marcadores = ', '.join(['%s'] * len(METRICAS_INNODB))
+            cursor.execute(f"SELECT NAME, COUNT FROM information_schema.INNODB_METRICS "
+                           f"WHERE STATUS = 'enabled' AND NAME IN ({marcadores})", METRICAS_INNODB)
+            metricas = {nome: int(valor) for nome, valor in cursor.fetchall()}
+        except mysql.connector.Error:
+            metricas = {}
+
+        lsn_atual = metricas.get('log_lsn_current')
+        lsn_checkpoint = metricas.get('log_lsn_last_checkpoint')
+        if (lsn_atual is None or lsn_checkpoint is None) and not self._sem_metricas_lsn:
+            # Módulo 'log' desligado: os mesmos valores estão no SHOW ENGINE INNODB STATUS,
+            # caro demais para cada coleta; entre leituras vale o último par lido
+            agora = time.monotonic()
+            if self._lsn_engine is None or agora - self._lsn_engine_em >= TTL_STATUS_ENGINE:
+                self._lsn_engine = self._ler_lsn_engine(cursor)
+                self._lsn_engine_em = agora
+            if self._lsn_engine is not None:
+                lsn_atual, lsn_checkpoint = self._lsn_engine
+
+        idade = lsn_atual - lsn_checkpoint if lsn_atual is not None and lsn_checkpoint is not None else None
+        capacidade = self._variaveis.get('capacidade_redo')
+        return {
+            'historico_undo': metricas.get('trx_rseg_history_len'),
+            'checkpoint_idade_mb': round(idade / _MB, 1) if idade is not None else None,
+            'redo_capacidade_mb': round(capacidade / _MB, 1) if capacidade else None,
+            'checkpoint_idade_percent': round(idade / capacidade * 100, 1) if idade is not None and capacidade else None,
+        }
+
+    def _ler_lsn_engine(self, cursor) -> Optional[tuple]:
+        """LSN atual e do último checkpoint pelo SHOW ENGINE INNODB STATUS"""
+        try:
+            cursor.execute("SHOW ENGINE INNODB STATUS")
+            linha = cursor.fetchone()
+        except mysql.connector.Error:
+            # Sem privilégio PROCESS
+            self._sem_metricas_lsn = True
+            return None
+        texto = linha[2] if linha else ''
+        atual, checkpoint = _LSN_ATUAL.search(texto), _LSN_CHECKPOINT.search(texto)
+        if not (atual and checkpoint):
+            self._sem_metricas_lsn = True
+            return None
+        return int(atual.group(1)), int(checkpoint.group(1))
+
+
+def _ler_variaveis(cursor) -> Dict[str, int]:
+    """Tamanho do buffer pool e capacidade total do redo log"""
+    cursor.execute("SHOW GLOBAL VARIABLES WHERE Variable_name IN "
+                   "('innodb_buffer_pool_size', 'innodb_redo_log_capacity', 'innodb_log_file_size', 'innodb_log_files_in_group')")
+    variaveis = {nome.lower(): int(valor) for nome, valor in cursor.fetchall() if str(valor).isdigit()}
+    # innodb_redo_log_capacity (8.0.30+) substitui tamanho x quantidade de arquivos
+    capacidade = variaveis.get('innodb_redo_log_capacity')
+    if not capacidade and 'innodb_log_file_size' in variaveis:
+        capacidade = variaveis['innodb_log_file_size'] * variaveis.get('innodb_log_files_in_group', 2)
+    return {
+        'buffer_pool_bytes': variaveis.get('innodb_buffer_pool_size'),
+        'capacidade_redo': capacidade,
+    }
+
+
+def _metricas_buffer_pool(status: Dict[str, str], taxas: Optional[Dict[str, float]],
+                          variaveis: Dict[str, int]) -> Dict[str, Any]:
+    paginas_total = int(status.get('innodb_buffer_pool_pages_total', 0) or 0)
+    paginas_sujas = int(status.get('innodb_buffer_pool_pages_dirty', 0) or 0)
+    paginas_livres = int(status.get('innodb_buffer_pool_pages_free', 0) or 0)
+    tamanho = variaveis.get('buffer_pool_bytes')
+
+    acerto = requisicoes = leituras_disco = espera_livre = None
+    if taxas is not None:
+        requisicoes = taxas['innodb_buffer_pool_read_requests']
+        leituras_disco = taxas['innodb_buffer_pool_reads']
+        espera_livre = taxas['innodb_buffer_pool_wait_free']
+        # Sem leituras no intervalo não há o que errar
+        acerto = (1 - leituras_disco / requisicoes) * 100 if requisicoes else 100.0
+
+    return {
+        'buffer_pool_mb': round(tamanho / _MB) if tamanho else None,
+        'buffer_pool_acerto_percent': round(acerto, 2) if acerto is not None else None,
+        'requisicoes_leitura_s': round(requisicoes, 1) if requisicoes is not None else None,
+        'leituras_disco_s': round(leituras_disco, 1) if leituras_disco is not None else None,
+        'espera_pagina_livre_s': round(espera_livre, 2) if espera_livre is not None else None,
+        'paginas_sujas_percent': round(paginas_sujas / paginas_total * 100, 1) if paginas_total else None,
+        'paginas_livres_percent': round(paginas_livres / paginas_total * 100, 1) if paginas_total else None,
+        'leituras_pendentes': int(status.get('innodb_data_pending_reads', 0) or 0),
+        'escritas_pendentes': int(status.get('innodb_data_pending_writes', 0) or 0),
+    }
+
+
+def _metricas_locks(status: Dict[str, str], taxas: Optional[Dict[str, float]]) -> Dict[str, Any]:
+    esperas = tempo_medio = None
+    if taxas is not None:
+        esperas = taxas['innodb_row_lock_waits']
+        # Innodb_row_lock_time é em milissegundos
+        tempo_medio = taxas['innodb_row_lock_time'] / esperas if esperas else 0.0
+    return {
+        'esperas_lock_s': round(esperas, 2) if esperas is not None else None,
+        'espera_lock_media_ms': round(tempo_medio, 1) if tempo_medio is not None else None,
+        'esperas_lock_atuais': int(status.get('innodb_row_lock_current_waits', 0) or 0),
+    }
+
+
+def _consultar_bloqueios(cursor) -> List[Dict[str, Any]]:
+    """Pares bloqueador/bloqueado de performance_schema.data_lock_waits"""
+    cursor.execute(f"""
+        SELECT
+            espera.trx_mysql_thread_id,
+            TIMESTAMPDIFF(SECOND, espera.trx_wait_started, NOW()),
+            espera.trx_query,
+            bloqueio.trx_mysql_thread_id,
+            TIMESTAMPDIFF(SECOND, bloqueio.trx_started, NOW()),
+            bloqueio.trx_query,
+            lk.OBJECT_SCHEMA,
+            lk.OBJECT_NAME,
+            lk.INDEX_NAME,
+            lk.LOCK_MODE
+        FROM performance_schema.data_lock_waits w
+        JOIN information_schema.INNODB_TRX espera ON espera.trx_id = w.REQUESTING_ENGINE_TRANSACTION_ID
+        JOIN information_schema.INNODB_TRX bloqueio ON bloqueio.trx_id = w.BLOCKING_ENGINE_TRANSACTION_ID
+        JOIN performance_schema.data_locks lk ON lk.ENGINE_LOCK_ID = w.REQUESTING_ENGINE_LOCK_ID
+        ORDER BY espera.trx_wait_started
+        LIMIT {MAXIMO_BLOQUEIOS}
+    """)
+
+    def _texto(consulta) -> str:
+        consulta = consulta or 'N/A (transação ociosa)'
+        return consulta[:100] + '...' if len(consulta) > 100 else consulta
+
+    return [{
+        'thread_bloqueada': linha[0],
+        'espera_s': int(linha[1] or 0),
+        'query_bloqueada': _texto(linha[2]),
+        'thread_bloqueadora': linha[3],
+        'transacao_bloqueadora_s': int(linha[4] or 0),
+        'query_bloqueadora': _texto(linha[5]),
+        'tabela': f"{linha[6]}.{linha[7]}",
+        'indice': linha[8] or 'N/A',
+        'modo': linha[9],
+    } for linha in cursor.fetchall()]
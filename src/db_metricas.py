@@ -1,133 +1,360 @@
 import mysql.connector
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
+import threading
 import time
-
-
-def conectar_banco(host: str, usuario: str, senha: str, banco: str = "mysql") -> Optional[mysql.connector.MySQLConnection]:
+import weakref
+
+from src.db_amostrador import AmostradorInstrucoes, queries_lentas_da_amostra
+from src.db_cache import CacheConsultaDB
+from src.db_digest import ColetorDigest
+from src.db_explain import CachePlanos, explicavel
+from src.db_fingerprint import agrupar_por_fingerprint, normalizar_consulta
+from src.db_indices import ColetorIndices
+from src.db_innodb import ColetorInnoDB, STATUS_INNODB
+from src.db_pool import BancoIndisponivel, PoolConexoes
+from src.db_replicacao import ColetorReplicacao
+from src.db_taxas import MotorTaxas
+from src.histograma import JanelaLatencia
+from src.instrumentacao import instrumentar
+
+
+# Contadores cumulativos convertidos em taxas por segundo: nome do status -> campo publicado
+CONTADORES_TAXA = {
+    'Questions': 'qps',
+    'Com_select': 'selects_s',
+    'Com_insert': 'inserts_s',
+    'Com_update': 'updates_s',
+    'Com_delete': 'deletes_s',
+    'Com_commit': 'commits_s',
+    'Com_rollback': 'rollbacks_s',
+    'Innodb_rows_read': 'linhas_lidas_s',
+    'Innodb_rows_inserted': 'linhas_inseridas_s',
+    'Innodb_rows_updated': 'linhas_atualizadas_s',
+    'Innodb_rows_deleted': 'linhas_removidas_s',
+    'Handler_read_rnd_next': 'leituras_sequenciais_s',
+    'Select_scan': 'varreduras_completas_s',
+    'Select_full_join': 'joins_sem_indice_s',
+    'Created_tmp_tables': 'tmp_tabelas_s',
+    'Created_tmp_disk_tables': 'tmp_disco_s',
+    'Bytes_sent': 'bytes_enviados_s',
+    'Bytes_received': 'bytes_recebidos_s',
+}
+
+# Variáveis de status lidas a cada coleta, todas num único round trip
+STATUS_GLOBAL = ('Threads_connected', 'Uptime') + tuple(CONTADORES_TAXA) + STATUS_INNODB
+
+# Sondas de latência (SELECT 1) por coleta quando não há amostrador em segundo plano
+# (com ele, cada tick do amostrador faz uma sonda), acumuladas num histograma deslizante
+AMOSTRAS_LATENCIA = 5
+JANELA_LATENCIA = 60.0
+
+# Sondas na janela abaixo das quais p95/p99 são marcados como pouco confiáveis
+AMOSTRAS_PERCENTIS = 100
+
+# Validade padrão (s) das métricas de variação lenta (contagem e tamanho das tabelas)
+TTL_METRICAS_LENTAS = 300.0
+
+# Intervalo (s) da análise de I/O por tabela e índice, mais cara que os contadores globais
+TTL_INDICES = 300.0
+
+# Valores estáticos por conexão; somem junto com a conexão descartada
+_estaticos: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_estaticos_lock = threading.Lock()
+
+
+class _EstadoFonte:
+    """Estado mantido entre coletas de uma mesma fonte (pool ou conexão)"""
+
+    __slots__ = ('cache_tabelas', 'janela_latencia', 'digests', 'taxas', 'innodb', 'replicacao', 'amostrador',
+                 'planos', 'indices')
+
+    def __init__(self, ttl_metricas_lentas: float):
+        self.cache_tabelas = CacheConsultaDB('tabelas', _consultar_tabelas, ttl_metricas_lentas,
+                                             pendente={'tabelas': 0, 'tamanho_db': 'N/A'})
+        self.janela_latencia = JanelaLatencia(JANELA_LATENCIA)
+        self.digests = ColetorDigest()
+        self.taxas = MotorTaxas(tuple(nome.lower() for nome in CONTADORES_TAXA))
+        self.innodb = ColetorInnoDB()
+        self.replicacao = ColetorReplicacao()
+        self.amostrador = AmostradorInstrucoes(janela_latencia=self.janela_latencia)
+        self.planos = CachePlanos()
+        self.indices = CacheConsultaDB('indices', ColetorIndices().coletar, TTL_INDICES)
+
+
+_estados: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+@instrumentar('coletar_metricas_db')
+def coletar_metricas_db(conexao: Optional[Union[PoolConexoes, mysql.connector.MySQLConnection]] = None,
+                        ttl_metricas_lentas: float = TTL_METRICAS_LENTAS,
+                        amostras_latencia: int = AMOSTRAS_LATENCIA) -> Dict[str, Any]:
     """
-    Conecta ao banco de dados MySQL
+    Coleta métricas do banco de dados MySQL
 
     Args:
-        host: Nome ou IP do servidor
-        usuario: Usuário do banco
-        senha: Senha do usuário
-        banco: Nome do banco de dados
+        conexao: Pool de conexões (uma conexão é emprestada por coleta) ou
+            uma conexão ativa com o banco de dados
+        ttl_metricas_lentas: Validade em segundos do cache de contagem e
+            tamanho das tabelas (com pool, atualizado em segundo plano)
+        amostras_latencia: Número de sondas SELECT 1 por coleta quando as
+            sondas não correm no amostrador em segundo plano
 
     Returns:
-        Conexão com o banco ou None se falhar
+        Dicionário com as métricas coletadas
     """
     try:
-        conexao = mysql.connector.connect(
-            host=host,
-            user=usuario,
-            password=senha,
-            database=banco,
-            autocommit=True,
-            use_pure=True
-        )
-        return conexao
+        if isinstance(conexao, PoolConexoes):
+            try:
+                estado = _estado_fonte(conexao, ttl_metricas_lentas)
+                tabelas = _obter_metricas_tabelas(estado, conexao, ttl_metricas_lentas)
+                # Com pool, as instruções em execução vêm do amostrador em segundo plano
+                amostra = estado.amostrador.obter(conexao)
+                # Com o amostrador ativo as sondas de latência já correm nos ticks dele
+                sondas = 0 if amostra is not None else amostras_latencia
+                with conexao.conexao() as conexao_emprestada:
+                    metricas = _coletar_com_conexao(conexao_emprestada, tabelas, estado, sondas, amostra)
+                metricas['indices'] = _obter_indices(estado, conexao)
+                # EXPLAIN numa conexão à parte, fora da coleta
+                return _anexar_planos(metricas, estado, conexao)
+            except BancoIndisponivel:
+                return metricas_desconectado()
+
+        if conexao is None or not conexao.is_connected():
+            return metricas_desconectado()
+
+        estado = _estado_fonte(conexao, ttl_metricas_lentas)
+        tabelas = _obter_metricas_tabelas(estado, conexao, ttl_metricas_lentas)
+        metricas = _coletar_com_conexao(conexao, tabelas, estado, amostras_latencia)
+        metricas['indices'] = _obter_indices(estado, conexao)
+        return _anexar_planos(metricas, estado, conexao)
+
     except Exception as e:
-        raise Exception(f"Erro ao conectar ao banco de dados: {str(e)}")
+        raise Exception(f"Erro ao coletar métricas do banco de dados: {str(e)}")
+
+
+def metricas_desconectado() -> Dict[str, Any]:
+    """Métricas zeradas de um servidor sem conexão"""
+    return {
+        'status': 'Desconectado',
+        'conexoes_ativas': 0,
+        'tempo_resposta': 0,
+        'latencia': {},
+        'taxas': {},
+        'innodb': {},
+        'replicacao': {},
+        'indices': {},
+        'queries_lentas': [],
+        'queries_lentas_agrupadas': [],
+        'instrucoes_longas': {},
+        'top_digests': [],
+        'versao': 'N/A',
+        'uptime': 0,
+        'tabelas': 0,
+        'tamanho_db': '0 MB',
+        'idade_cache_tabelas_s': None
+    }
+
+
+def _coletar_com_conexao(conexao: mysql.connector.MySQLConnection, tabelas: Dict[str, Any],
+                         estado: _EstadoFonte, amostras_latencia: int,
+                         amostra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Executa as consultas de contadores vivos numa conexão de uso exclusivo"""
+    try:
+        cursor = conexao.cursor()
+
+        # Medir latência de resposta do BD com várias sondas
+        _sondar_latencia(cursor, estado.janela_latencia, amostras_latencia)
+        latencia = estado.janela_latencia.resumo_ms()
+        latencia['baixa_confianca'] = latencia['amostras'] < AMOSTRAS_PERCENTIS
+
+        # Contadores globais num único round trip
+        status = _ler_status_global(cursor, conexao)
+
+        # Buffer pool, locks e redo do InnoDB (deltas sobre o mesmo status)
+        innodb = estado.innodb.coletar(cursor, status)
+
+        # Atraso e threads de replicação (vazio se não for réplica)
+        replicacao = estado.replicacao.coletar(cursor)
+
+        # Instruções por tempo total desde a coleta anterior
+        digests = estado.digests.coletar(cursor)
+
+        cursor.close()
+
+        # Coletar queries lentas (do amostrador ou, sem ele, do PROCESSLIST)
+        if amostra is not None:
+            queries_lentas = queries_lentas_da_amostra(amostra)
+        else:
+            cursor = conexao.cursor(dictionary=True)
+            queries_lentas = _coletar_queries_lentas(cursor)
+            cursor.close()
+
+    except Exception as e:
+        raise Exception(f"Erro ao executar queries: {str(e)}")
+
+    metricas_db = {
+        'status': 'Conectado',
+        'conexoes_ativas': int(status.get('threads_connected', 0)),
+        'tempo_resposta': round(latencia['p50_ms'], 2) if latencia['p50_ms'] is not None else 0,
+        'latencia': latencia,
+        'queries_lentas': queries_lentas,
+        'queries_lentas_agrupadas': agrupar_por_fingerprint(queries_lentas),
+        'instrucoes_longas': {chave: valor for chave, valor in amostra.items() if chave != 'em_execucao'} if amostra else {},
+        'versao': _valores_estaticos(conexao).get('versao', 'N/A'),
+        'uptime': int(status.get('uptime', 0)),
+        'tabelas': tabelas['tabelas'],
+        'tamanho_db': tabelas['tamanho_db'],
+        'idade_cache_tabelas_s': tabelas['idade_cache_s'],
+        'taxas': _calcular_taxas(estado.taxas, status),
+        'innodb': innodb,
+        'replicacao': replicacao,
+        'top_digests': digests.get('top_digests', []),
+        'tempo_total_db_ms': digests.get('tempo_total_db_ms'),
+        'janela_digests_s': digests.get('janela_digests_s')
+    }
+
+    return metricas_db
+
+
+def _anexar_planos(metricas: Dict[str, Any], estado: _EstadoFonte, fonte) -> Dict[str, Any]:
+    """Plano de execução (em cache por fingerprint) de cada grupo de consultas lentas de leitura"""
+    textos = {}
+    for query in metricas['queries_lentas']:
+        texto = query.pop('texto_completo', None)
+        if texto and query['fingerprint'] not in textos:
+            textos[query['fingerprint']] = (texto, query.get('banco'))
+
+    for grupo in metricas['queries_lentas_agrupadas']:
+        texto, banco = textos.get(grupo['fingerprint'], (None, None))
+        if texto and explicavel(grupo['consulta_normalizada']):
+            grupo['plano'] = estado.planos.obter(fonte, grupo['fingerprint'], texto,
+                                                 banco if banco != 'N/A' else None)
+    return metricas
+
+
+def _estado_fonte(fonte, ttl_metricas_lentas: float) -> _EstadoFonte:
+    """Estado entre coletas da fonte, criado na primeira coleta"""
+    with _estaticos_lock:
+        estado = _estados.get(fonte)
+        if estado is None:
+            estado = _estados[fonte] = _EstadoFonte(ttl_metricas_lentas)
+        return estado
+
+
+def _obter_metricas_tabelas(estado: _EstadoFonte, fonte, ttl: float) -> Dict[str, Any]:
+    """Contagem e tamanho das tabelas pelo cache com TTL da fonte"""
+    estado.cache_tabelas.definir_ttl(ttl)
+    try:
+        return estado.cache_tabelas.obter(fonte)
+    except BancoIndisponivel:
+        raise
+    except Exception:
+        # Varredura do information_schema falhou (ex.: tempo esgotado): a coleta segue sem ela
+        return {'tabelas': 0, 'tamanho_db': 'N/A', 'idade_cache_s': None}
+
+
+def _obter_indices(estado: _EstadoFonte, fonte) -> Dict[str, Any]:
+    """Análise de I/O por tabela e índice pelo cache da fonte (com pool, em segundo plano)"""
+    try:
+        return estado.indices.obter(fonte)
+    except Exception:
+        # Análise opcional: a coleta segue sem ela
+        return {}
+
+
+def _consultar_tabelas(conexao: mysql.connector.MySQLConnection) -> Dict[str, Any]:
+    """Contagem e tamanho das tabelas numa única varredura do information_schema"""
+    cursor = conexao.cursor()
+    try:
+        cursor.execute("""
+            SELECT COUNT(*), ROUND(COALESCE(SUM(data_length + index_length), 0) / 1024 / 1024, 2)
+            FROM information_schema.tables
+            WHERE table_schema NOT IN ('information_schema', 'mysql', 'performance_schema', 'sys')
+        """)
+        resultado = cursor.fetchone()
+        cursor.fetchall()
+    finally:
+        cursor.close()
+    return {
+        'tabelas': resultado[0] if resultado else 0,
+        'tamanho_db': f"{resultado[1]} MB" if resultado and resultado[1] else '0 MB',
+    }
+
+
+def _calcular_taxas(motor: MotorTaxas, status: Dict[str, str]) -> Dict[str, Any]:
+    """Taxas por segundo dos CONTADORES_TAXA e indicadores derivados"""
+    leitura = motor.atualizar(status, int(status.get('uptime', 0)))
+    if not leitura:
+        return {}
+
+    taxas, medias = leitura['taxas'], leitura['medias']
+    resultado = {campo: round(taxas[nome.lower()], 1) for nome, campo in CONTADORES_TAXA.items()}
+    # Transações explícitas; em autocommit cada escrita já é uma transação
+    resultado['tps'] = round(taxas['com_commit'] + taxas['com_rollback'], 1)
+    resultado['tmp_disco_percent'] = (round(taxas['created_tmp_disk_tables'] / taxas['created_tmp_tables'] * 100, 1)
+                                      if taxas['created_tmp_tables'] else 0.0)
+    resultado['leituras_sequenciais_media_s'] = round(medias['handler_read_rnd_next'], 1)
+    resultado['rede_enviada_kb_s'] = round(resultado.pop('bytes_enviados_s') / 1024, 1)
+    resultado['rede_recebida_kb_s'] = round(resultado.pop('bytes_recebidos_s') / 1024, 1)
+    resultado['intervalo_s'] = round(leitura['intervalo_s'], 1)
+    return resultado
+
+
+def _sondar_latencia(cursor, janela: JanelaLatencia, amostras: int) -> None:
+    """Registra o tempo (perf_counter_ns) de `amostras` execuções de SELECT 1"""
+    for _ in range(amostras):
+        inicio = time.perf_counter_ns()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        janela.registrar(time.perf_counter_ns() - inicio)
 
 
-def coletar_metricas_db(conexao: Optional[mysql.connector.MySQLConnection] = None) -> Dict[str, Any]:
+def _ler_status_global(cursor, conexao: mysql.connector.MySQLConnection) -> Dict[str, str]:
     """
-    Coleta métricas do banco de dados MySQL
+    Lê as variáveis de STATUS_GLOBAL numa única consulta
+
+    Na primeira leitura de cada conexão a mesma consulta traz também a
+    versão do servidor, que fica em cache enquanto a conexão existir.
 
     Args:
-        conexao: Conexão ativa com o banco de dados
+        cursor: Cursor (sem dictionary) da conexão
+        conexao: Conexão dona do cache de valores estáticos
 
     Returns:
-        Dicionário com as métricas coletadas
+        Dicionário nome da variável (minúsculo) -> valor
     """
-    try:
-        if conexao is None or not conexao.is_connected():
-            return {
-                'status': 'Desconectado',
-                'conexoes_ativas': 0,
-                'tempo_resposta': 0,
-                'queries_lentas': [],
-                'versao': 'N/A',
-                'uptime': 0,
-                'tabelas': 0,
-                'tamanho_db': '0 MB'
-            }
-
-        conexoes_ativas = 0
-        versao = 'N/A'
-        uptime = 0
-        tabelas = 0
-        tamanho_db = '0 MB'
-        tempo_resposta = 0
-        queries_lentas = []
-
+    estaticos = _valores_estaticos(conexao)
+    marcadores = ', '.join(['%s'] * len(STATUS_GLOBAL))
+    consulta = f"SELECT VARIABLE_NAME, VARIABLE_VALUE FROM performance_schema.global_status WHERE VARIABLE_NAME IN ({marcadores})"
+    if 'versao' not in estaticos:
+        consulta += " UNION ALL SELECT 'versao', VERSION()"
+
+    linhas = None
+    if not estaticos.get('sem_global_status'):
         try:
-            cursor = conexao.cursor(dictionary=True)
+            cursor.execute(consulta, STATUS_GLOBAL)
+            linhas = cursor.fetchall()
+        except mysql.connector.Error:
+            # performance_schema desligado (ou MariaDB antigo): não tenta de novo nesta conexão
+            estaticos['sem_global_status'] = True
 
-            # Medir latência de resposta do BD
-            inicio = time.time()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-            tempo_resposta = round((time.time() - inicio) * 1000, 2)  # Converter para ms
-            cursor.fetchall()
-
-            # Obter status do servidor
-            cursor.execute("SHOW STATUS LIKE 'Threads_connected'")
-            resultado = cursor.fetchone()
-            conexoes_ativas = int(resultado['Value']) if resultado else 0
-            cursor.fetchall()
-
-            # Obter versão do MySQL
-            cursor.execute("SELECT VERSION() as versao")
-            resultado = cursor.fetchone()
-            versao = resultado['versao'] if resultado else 'N/A'
-            cursor.fetchall()
-
-            # Obter uptime
-            cursor.execute("SHOW STATUS LIKE 'Uptime'")
-            resultado = cursor.fetchone()
-            uptime = int(resultado['Value']) if resultado else 0
-            cursor.fetchall()
-
-            # Contar tabelas
-            cursor.execute("SELECT COUNT(*) as total FROM information_schema.tables WHERE table_schema != 'information_schema' AND table_schema != 'mysql' AND table_schema != 'performance_schema' AND table_schema != 'sys'")
-            resultado = cursor.fetchone()
-            tabelas = resultado['total'] if resultado else 0
-            cursor.fetchall()
-
-            # Obter tamanho do banco
-            cursor.execute("""
-                SELECT ROUND(COALESCE(SUM(data_length + index_length), 0) / 1024 / 1024, 2) as tamanho
-                FROM information_schema.tables
-                WHERE table_schema != 'information_schema' AND table_schema != 'mysql' AND table_schema != 'performance_schema' AND table_schema != 'sys'
-            """)
-            resultado = cursor.fetchone()
-            tamanho_db = f"{resultado['tamanho']} MB" if resultado and resultado['tamanho'] else '0 MB'
-            cursor.fetchall()
-
-            # Coletar queries lentas (PROCESSLIST)
-            queries_lentas = _coletar_queries_lentas(cursor)
+    if linhas is None:
+        cursor.execute(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({marcadores})", STATUS_GLOBAL)
+        linhas = cursor.fetchall()
+        if 'versao' not in estaticos:
+            cursor.execute("SELECT 'versao', VERSION()")
+            linhas += cursor.fetchall()
 
-            cursor.close()
+    status = {str(nome).lower(): valor for nome, valor in linhas}
+    if 'versao' in status:
+        estaticos['versao'] = status.pop('versao')
+    return status
 
-        except Exception as e:
-            raise Exception(f"Erro ao executar queries: {str(e)}")
 
-        metricas_db = {
-            'status': 'Conectado',
-            'conexoes_ativas': conexoes_ativas,
-            'tempo_resposta': tempo_resposta,
-            'queries_lentas': queries_lentas,
-            'versao': versao,
-            'uptime': uptime,
-            'tabelas': tabelas,
-            'tamanho_db': tamanho_db
-        }
-
-        return metricas_db
-
-    except Exception as e:
-        raise Exception(f"Erro ao coletar métricas do banco de dados: {str(e)}")
+def _valores_estaticos(conexao: mysql.connector.MySQLConnection) -> Dict[str, Any]:
+    """Cache de valores que não mudam durante a vida da conexão (ex.: VERSION())"""
+    with _estaticos_lock:
+        return _estaticos.setdefault(conexao, {})
 
 
 def _coletar_queries_lentas(cursor) -> list:
@@ -143,11 +370,6 @@ def _coletar_queries_lentas(cursor) -> list:
     try:
         queries_lentas = []
 
-        # Verificar se performance_schema está habilitado
-        cursor.execute("SHOW STATUS LIKE 'performance_schema'")
-        resultado = cursor.fetchone()
-        cursor.fetchall()
-
         # Obter queries ativas com tempo de execução
         cursor.execute("""
             SELECT
@@ -160,19 +382,20 @@ def _coletar_queries_lentas(cursor) -> list:
                 STATE,
                 INFO
             FROM INFORMATION_SCHEMA.PROCESSLIST
-            WHERE COMMAND != 'Sleep' AND TIME > 0
+            WHERE COMMAND != 'Sleep' AND TIME > 5
             ORDER BY TIME DESC
             LIMIT 10
         """)
 
         resultados = cursor.fetchall()
-        cursor.fetchall()
 
         for row in resultados:
             tempo_execucao = int(row.get('TIME', 0))
 
             # Considerar como "lenta" se tempo > 5 segundos
             if tempo_execucao > 5:
+                # Fingerprint calculado sobre o texto completo, antes do corte
+                fingerprint, normalizada = normalizar_consulta(row.get('INFO') or '')
                 queries_lentas.append({
                     'id': row.get('ID'),
                     'usuario': row.get('USER', 'desconhecido'),
@@ -180,7 +403,11 @@ def _coletar_queries_lentas(cursor) -> list:
                     'comando': row.get('COMMAND', 'N/A'),
                     'tempo_segundos': tempo_execucao,
                     'estado': row.get('STATE', 'N/A'),
-                    'query': (row.get('INFO', 'N/A')[:100] + '...') if len(str(row.get('INFO', ''))) > 100 else row.get('INFO', 'N/A')
+                    'query': (row.get('INFO', 'N/A')[:100] + '...') if len(str(row.get('INFO', ''))) > 100 else row.get('INFO', 'N/A'),
+                    'fingerprint': fingerprint,
+                    'consulta_normalizada': normalizada,
+                    # Texto com os valores reais, para o EXPLAIN (não é publicado)
+                    'texto_completo': row.get('INFO')
                 })
 
         return queries_lentas if queries_lentas else []
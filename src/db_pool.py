@@ -0,0 +1,290 @@
+import mysql.connector
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+import threading
+import time
+
+
+class BancoIndisponivel(Exception):
+    """Nenhuma conexão pôde ser obtida (servidor fora ou em espera de backoff)"""
+
+
+class PoolConexoes:
+    """
+    Pool de conexões MySQL com verificação por ping e reconexão com backoff
+
+    Cada coleta empresta uma conexão exclusiva e a devolve ao terminar, de
+    modo que threads diferentes nunca compartilham o mesmo cursor e as
+    coletas seguintes reaproveitam a conexão (sem novo handshake TCP e de
+    autenticação). Conexões ociosas há mais de `verificar_apos` segundos são
+    testadas com COM_PING antes do uso; falhas ao conectar abrem uma janela
+    de backoff exponencial em que o pool falha imediatamente. Cada conexão
+    nova recebe timeouts de socket e MAX_EXECUTION_TIME, para que um
+    servidor lento não prenda a thread de coleta indefinidamente; varreduras
+    em segundo plano podem pedir um limite maior só no próprio empréstimo.
+    """
+
+    def __init__(self, host: str, usuario: str, senha: str, banco: str = "mysql",
+                 tamanho_maximo: int = 6, timeout_conexao: int = 5, timeout_consulta: int = 5,
+                 verificar_apos: float = 30.0, backoff_inicial: float = 1.0,
+                 backoff_maximo: float = 60.0):
+        """
+        Args:
+            host: Nome ou IP do servidor
+            usuario: Usuário do banco
+            senha: Senha do usuário
+            banco: Nome do banco de dados
+            tamanho_maximo: Número máximo de conexões abertas; o padrão cobre a
+                coleta, a conexão fixa do amostrador de instruções, os dois
+                caches em segundo plano e o EXPLAIN, com uma de folga
+            timeout_conexao: Timeout do handshake em segundos
+            timeout_consulta: Tempo máximo de cada instrução (e de cada
+                leitura/escrita no socket) em segundos
+            verificar_apos: Ociosidade (s) a partir da qual a conexão é pingada
+            backoff_inicial: Espera após a primeira falha de conexão (s)
+            backoff_maximo: Espera máxima entre tentativas (s)
+        """
+        self.host = host
+        self.usuario = usuario
+        self.banco = banco
+        self._senha = senha
+        self.tamanho_maximo = tamanho_maximo
+        self.timeout_conexao = timeout_conexao
+        self.timeout_consulta = timeout_consulta
+        self.verificar_apos = verificar_apos
+        self.backoff_inicial = backoff_inicial
+        self.backoff_maximo = backoff_maximo
+
+        self._condicao = threading.Condition()
+        self._livres: deque = deque()
+        self._abertas = 0
+        self._fechado = False
+        self._ao_fechar: list = []
+
+        self._falhas_consecutivas = 0
+        self._proxima_tentativa = 0.0
+        self._ultimo_erro: Optional[str] = None
+        self._criadas = 0
+        self._descartadas = 0
+
+    @contextmanager
+    def conexao(self, timeout: Optional[float] = None, tempo_consulta: Optional[float] = None):
+        """
+        Empresta uma conexão pelo tempo do bloco with
+
+        A conexão é descartada (e não devolvida) se o bloco lançar exceção,
+        já que o estado do cursor/sessão fica indefinido.
+
+        Args:
+            timeout: Tempo máximo de espera por uma conexão livre
+            tempo_consulta: Limite por instrução (s) só para este empréstimo,
+                para varreduras em segundo plano que passam do timeout_consulta;
+                o limite padrão é restaurado antes da devolução
+
+        Raises:
+            BancoIndisponivel: Se não houver conexão disponível
+        """
+        conexao = self.emprestar(timeout)
+        try:
+            if tempo_consulta is not None:
+                self._limitar_tempo(conexao, tempo_consulta)
+            yield conexao
+            if tempo_consulta is not None:
+                self._limitar_tempo(conexao)
+        except Exception:
+            self.devolver(conexao, descartar=True)
+            raise
+        else:
+            self.devolver(conexao)
+
+    def emprestar(self, timeout: Optional[float] = None) -> mysql.connector.MySQLConnection:
+        """
+        Retira uma conexão saudável do pool, abrindo uma nova se preciso
+
+        Args:
+            timeout: Tempo máximo de espera quando o pool está no limite
+
+        Returns:
+            Conexão de uso exclusivo até devolver()
+
+        Raises:
+            BancoIndisponivel: Se o pool estiver fechado, em backoff ou esgotado
+        """
+        prazo = time.monotonic() + (timeout if timeout is not None else self.timeout_conexao)
+        while True:
+            with self._condicao:
+                if self._fechado:
+                    raise BancoIndisponivel("Pool de conexões fechado")
+
+                if self._livres:
+                    conexao, devolvida_em = self._livres.pop()
+                elif self._abertas < self.tamanho_maximo:
+                    conexao, devolvida_em = None, None
+                    self._abertas += 1
+                else:
+                    restante = prazo - time.monotonic()
+                    if restante <= 0:
+                        raise BancoIndisponivel(f"Nenhuma das {self.tamanho_maximo} conexões do pool foi liberada a tempo")
+                    self._condicao.wait(restante)
+                    continue
+
+            if conexao is None:
+                return self._abrir()
+            if self._saudavel(conexao, devolvida_em):
+                return conexao
+            self._descartar(conexao)
+
+    def devolver(self, conexao: mysql.connector.MySQLConnection, descartar: bool = False) -> None:
+        """
+        Devolve uma conexão emprestada
+
+        Args:
+            conexao: Conexão obtida com emprestar()
+            descartar: Fecha a conexão em vez de mantê-la no pool
+        """
+        if descartar or self._fechado:
+            self._descartar(conexao)
+            return
+        with self._condicao:
+            self._livres.append((conexao, time.monotonic()))
+            self._condicao.notify()
+
+    @property
+    def fechado(self) -> bool:
+        return self._fechado
+
+    def ao_fechar(self, callback) -> None:
+        """Registra uma função chamada quando o pool for fechado (ex.: parar atualizações)"""
+        with self._condicao:
+            self._ao_fechar.append(callback)
+
+    def fechar(self) -> None:
+        """Fecha as conexões ociosas; as emprestadas são fechadas ao voltar"""
+        with self._condicao:
+            self._fechado = True
+            livres, self._livres = list(self._livres), deque()
+            callbacks, self._ao_fechar = self._ao_fechar, []
+            self._condicao.notify_all()
+        for conexao, _ in livres:
+            self._descartar(conexao)
+        for callback in callbacks:
+            callback()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Ocupação do pool e estado da reconexão"""
+        with self._condicao:
+            return {
+                'tamanho_maximo': self.tamanho_maximo,
+                'abertas': self._abertas,
+                'livres': len(self._livres),
+                'em_uso': self._abertas - len(self._livres),
+                'criadas': self._criadas,
+                'descartadas': self._descartadas,
+                'falhas_consecutivas': self._falhas_consecutivas,
+                'proxima_tentativa_s': round(max(self._proxima_tentativa - time.monotonic(), 0.0), 1),
+                'ultimo_erro': self._ultimo_erro,
+            }
+
+    def _abrir(self) -> mysql.connector.MySQLConnection:
+        # A vaga em _abertas já foi reservada por emprestar()
+        espera = self._proxima_tentativa - time.monotonic()
+        if espera > 0:
+            self._liberar_vaga()
+            raise BancoIndisponivel(f"Banco indisponível ({self._ultimo_erro}); nova tentativa em {espera:.0f}s")
+
+        try:
+            conexao = mysql.connector.connect(
+                host=self.host,
+                user=self.usuario,
+                password=self._senha,
+                database=self.banco,
+                autocommit=True,
+                use_pure=True,
+                connection_timeout=self.timeout_conexao
+            )
+        except Exception as e:
+            with self._condicao:
+                self._falhas_consecutivas += 1
+                atraso = min(self.backoff_inicial * 2 ** (self._falhas_consecutivas - 1), self.backoff_maximo)
+                self._proxima_tentativa = time.monotonic() + atraso
+                self._ultimo_erro = str(e)
+            self._liberar_vaga()
+            raise BancoIndisponivel(f"Erro ao conectar ao banco de dados: {str(e)}")
+
+        self._limitar_tempo(conexao)
+        with self._condicao:
+            self._falhas_consecutivas = 0
+            self._proxima_tentativa = 0.0
+            self._ultimo_erro = None
+            self._criadas += 1
+        return conexao
+
+    def _limitar_tempo(self, conexao: mysql.connector.MySQLConnection, segundos: Optional[float] = None) -> None:
+        """Timeouts de socket e de execução de instruções da sessão (padrão: timeout_consulta)"""
+        segundos = self.timeout_consulta if segundos is None else segundos
+        # read/write_timeout existem a partir do conector 9.0; antes, no modo puro,
+        # o connection_timeout já vale para todas as operações do socket
+        if hasattr(conexao, 'read_timeout'):
+            conexao.read_timeout = segundos
+            conexao.write_timeout = segundos
+        cursor = conexao.cursor()
+        try:
+            try:
+                cursor.execute("SET SESSION max_execution_time = %s", (int(segundos * 1000),))
+            except mysql.connector.Error:
+                # MariaDB: max_statement_time, em segundos
+                cursor.execute("SET SESSION max_statement_time = %s", (segundos,))
+        except mysql.connector.Error:
+            # Servidor sem limite por instrução: resta o timeout do socket
+            pass
+        finally:
+            cursor.close()
+
+    def _saudavel(self, conexao: mysql.connector.MySQLConnection, devolvida_em: float) -> bool:
+        # Conexão usada há pouco dispensa o round-trip do ping
+        if time.monotonic() - devolvida_em < self.verificar_apos:
+            return True
+        try:
+            conexao.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _descartar(self, conexao: mysql.connector.MySQLConnection) -> None:
+        try:
+            conexao.close()
+        except Exception:
+            pass
+        with self._condicao:
+            self._descartadas += 1
+        self._liberar_vaga()
+
+    def _liberar_vaga(self) -> None:
+        with self._condicao:
+            self._abertas -= 1
+            self._condicao.notify()
+
+
+def criar_pool(host: str, usuario: str, senha: str, banco: str = "mysql", **opcoes) -> PoolConexoes:
+    """
+    Cria um pool e valida as credenciais abrindo a primeira conexão
+
+    Args:
+        host: Nome ou IP do servidor
+        usuario: Usuário do banco
+        senha: Senha do usuário
+        banco: Nome do banco de dados
+        **opcoes: Parâmetros adicionais de PoolConexoes
+
+    Returns:
+        Pool pronto para uso
+    """
+    pool = PoolConexoes(host, usuario, senha, banco, **opcoes)
+    try:
+        with pool.conexao():
+            pass
+    except Exception as e:
+        pool.fechar()
+        raise Exception(str(e))
+    return pool
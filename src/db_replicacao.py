@@ -0,0 +1,153 @@
+from collections import deque
+from typing import Dict, Any, List, Optional
+import threading
+import time
+
+import mysql.connector
+
+
+# Pontos (instante, atraso) guardados por canal para calcular a tendência
+PONTOS_TENDENCIA = 12
+
+# Variação mínima (s de atraso por minuto) para considerar a réplica alcançando ou divergindo
+VARIACAO_MINIMA = 1.0
+
+# Num servidor que não é réplica, a cada quantas coletas o status é consultado de novo
+COLETAS_SEM_REPLICACAO = 30
+
+_MB = 1024 * 1024
+
+
+class ColetorReplicacao:
+    """
+    Atraso e saúde da replicação de cada canal de uma réplica
+
+    Lê SHOW REPLICA STATUS (ou SHOW SLAVE STATUS em servidores anteriores
+    ao 8.0.22) e guarda os últimos atrasos de cada canal; a inclinação da
+    reta de mínimos quadrados sobre esses pontos diz se a réplica está
+    alcançando o primário ou ficando cada vez mais para trás; a mesma reta
+    sobre o tamanho do relay log mostra se ele está crescendo. Em servidores
+    que não são réplica a consulta é refeita só de tempos em tempos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._comando: Optional[str] = None
+        self._historico: Dict[str, deque] = {}
+        self._historico_relay: Dict[str, deque] = {}
+        self._coletas_sem_canais = 0
+
+    def coletar(self, cursor) -> Dict[str, Any]:
+        """
+        Lê o status de replicação
+
+        Args:
+            cursor: Cursor (sem dictionary) de uma conexão exclusiva
+
+        Returns:
+            Dicionário com 'canais' (uma entrada por canal); vazio se o
+            servidor não for réplica ou sem privilégio REPLICATION CLIENT
+        """
+        with self._lock:
+            if self._coletas_sem_canais and self._coletas_sem_canais % COLETAS_SEM_REPLICACAO:
+                self._coletas_sem_canais += 1
+                return {}
+
+            linhas = self._ler_status(cursor)
+            if not linhas:
+                self._coletas_sem_canais += 1
+                self._historico.clear()
+                self._historico_relay.clear()
+                return {}
+            self._coletas_sem_canais = 0
+
+            agora = time.monotonic()
+            canais = []
+            for linha in linhas:
+                canal = self._canal(linha)
+                historico = self._historico.setdefault(canal['canal'], deque(maxlen=PONTOS_TENDENCIA))
+                if canal['atraso_s'] is not None:
+                    historico.append((agora, canal['atraso_s']))
+                canal.update(_tendencia(historico, canal['atraso_s']))
+                relay = self._historico_relay.setdefault(canal['canal'], deque(maxlen=PONTOS_TENDENCIA))
+                relay.append((agora, canal['relay_log_mb']))
+                inclinacao = _inclinacao(relay)
+                canal['relay_log_variacao_mb_min'] = round(inclinacao * 60, 1) if inclinacao is not None else None
+                canais.append(canal)
+
+            # Canais removidos não deixam histórico para trás
+            ativos = {canal['canal'] for canal in canais}
+            for historicos in (self._historico, self._historico_relay):
+                for nome in set(historicos) - ativos:
+                    del historicos[nome]
+            return {'canais': canais}
+
+    def _ler_status(self, cursor) -> List[Dict[str, Any]]:
+        comandos = (self._comando,) if self._comando else ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS")
+        for comando in comandos:
+            try:
+                cursor.execute(comando)
+                colunas = cursor.column_names
+                linhas = cursor.fetchall()
+            except mysql.connector.Error:
+                # Sintaxe nova ausente (MySQL < 8.0.22, MariaDB) ou sem privilégio
+                continue
+            self._comando = comando
+            return [dict(zip(colunas, linha)) for linha in linhas]
+        return []
+
+    @staticmethod
+    def _canal(linha: Dict[str, Any]) -> Dict[str, Any]:
+        def _campo(nome_novo: str, nome_antigo: str, padrao=None):
+            # Nomes Source/Replica a partir do 8.0.22, Master/Slave antes
+            valor = linha.get(nome_novo, linha.get(nome_antigo, padrao))
+            return valor if valor is not None else padrao
+
+        atraso = _campo('Seconds_Behind_Source', 'Seconds_Behind_Master')
+        espaco_relay = int(linha.get('Relay_Log_Space') or 0)
+        return {
+            'canal': linha.get('Channel_Name') or 'padrão',
+            'origem': f"{_campo('Source_Host', 'Master_Host', 'N/A')}:{_campo('Source_Port', 'Master_Port', '')}",
+            'atraso_s': int(atraso) if atraso is not None else None,
+            'io_thread': _campo('Replica_IO_Running', 'Slave_IO_Running', 'No'),
+            'sql_thread': _campo('Replica_SQL_Running', 'Slave_SQL_Running', 'No'),
+            'estado_sql': _campo('Replica_SQL_Running_State', 'Slave_SQL_Running_State', ''),
+            'erro_io': linha.get('Last_IO_Error') or None,
+            'erro_sql': linha.get('Last_SQL_Error') or None,
+            'relay_log_mb': round(espaco_relay / _MB, 1),
+        }
+
+
+def _inclinacao(historico: deque) -> Optional[float]:
+    """Inclinação (por segundo) da reta de mínimos quadrados sobre os pontos (instante, valor)"""
+    if len(historico) < 3:
+        return None
+
+    inicio = historico[0][0]
+    xs = [instante - inicio for instante, _ in historico]
+    ys = [valor for _, valor in historico]
+    media_x, media_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variancia = sum((x - media_x) ** 2 for x in xs)
+    if variancia <= 0:
+        return None
+    return sum((x - media_x) * (y - media_y) for x, y in zip(xs, ys)) / variancia
+
+
+def _tendencia(historico: deque, atraso: Optional[int]) -> Dict[str, Any]:
+    """Inclinação do atraso (s por minuto) e previsão de alcance do primário"""
+    resultado = {'tendencia': None, 'variacao_atraso_s_min': None, 'previsao_alcance_s': None}
+    inclinacao = _inclinacao(historico)
+    if inclinacao is None:
+        return resultado
+
+    por_minuto = inclinacao * 60
+    resultado['variacao_atraso_s_min'] = round(por_minuto, 1)
+    if por_minuto <= -VARIACAO_MINIMA:
+        resultado['tendencia'] = 'alcançando'
+        if atraso:
+            resultado['previsao_alcance_s'] = round(atraso / -inclinacao)
+    elif por_minuto >= VARIACAO_MINIMA:
+        resultado['tendencia'] = 'divergindo'
+    else:
+        resultado['tendencia'] = 'estável'
+    return resultado
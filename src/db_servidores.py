@@ -0,0 +1,239 @@
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as TempoEsgotado
+from typing import Dict, Any, List, Optional, Tuple
+import threading
+import time
+
+from src.db_metricas import coletar_metricas_db, metricas_desconectado
+from src.db_pool import PoolConexoes
+
+
+# Prazo padrão (s) de cada servidor dentro de uma coleta
+TIMEOUT_PADRAO = 10.0
+
+# Tempo total (s) de uma rodada de coleta, qualquer que seja o prazo de cada servidor
+ORCAMENTO_PADRAO = 12.0
+
+# Falhas seguidas que abrem o circuito de um servidor, e a espera (s) até nova tentativa
+FALHAS_PARA_ABRIR = 3
+ESPERA_CIRCUITO = 60.0
+
+
+class _Alvo:
+    """Servidor registrado: pool próprio, prazo, coleta em andamento e estado do circuito"""
+
+    __slots__ = ('nome', 'pool', 'timeout', 'futuro', 'disparado_em', 'apurado', 'falhas', 'aberto_ate',
+                 'ultimo_erro', 'ultimo_status')
+
+    def __init__(self, nome: str, pool: PoolConexoes, timeout: float):
+        self.nome = nome
+        self.pool = pool
+        self.timeout = timeout
+        self.futuro: Optional[Future] = None
+        self.disparado_em = 0.0
+        # Última coleta já contada no circuito (cada uma conta uma única vez)
+        self.apurado: Optional[Future] = None
+        self.falhas = 0
+        self.aberto_ate = 0.0
+        self.ultimo_erro: Optional[str] = None
+        self.ultimo_status = 'Desconectado'
+
+
+class MonitorServidores:
+    """
+    Coleta concorrente de vários servidores MySQL (primário e réplicas)
+
+    Cada servidor tem seu pool e seu prazo; as coletas são disparadas ao
+    mesmo tempo num pool de threads, de modo que a duração total é a do
+    servidor mais lento (limitada pelo maior prazo) e não a soma de todos.
+    Um servidor que estoura o prazo entra no resultado como degradado;
+    enquanto a coleta dele não termina, a próxima rodada não dispara outra
+    para não acumular threads presas no mesmo servidor, e cada rodada com
+    a coleta ainda presa conta como uma falha. Depois de
+    `falhas_para_abrir` falhas seguidas o circuito do servidor abre e ele
+    deixa de ser consultado por `espera_circuito` segundos; passada a
+    espera, uma única coleta de teste decide se o circuito fecha. O
+    estado de cada servidor só muda sob o lock, e chamadas concorrentes
+    (monitor e diagnóstico) aguardam a mesma coleta em andamento em vez de
+    disparar outra.
+    """
+
+    def __init__(self, max_threads: int = 8, orcamento_s: float = ORCAMENTO_PADRAO,
+                 falhas_para_abrir: int = FALHAS_PARA_ABRIR, espera_circuito: float = ESPERA_CIRCUITO):
+        """
+        Args:
+            max_threads: Número máximo de coletas simultâneas
+            orcamento_s: Tempo máximo de uma rodada de coleta em segundos
+            falhas_para_abrir: Falhas seguidas que abrem o circuito de um servidor
+            espera_circuito: Tempo em segundos com o circuito aberto
+        """
+        self.max_threads = max_threads
+        self.orcamento_s = orcamento_s
+        self.falhas_para_abrir = falhas_para_abrir
+        self.espera_circuito = espera_circuito
+        self._lock = threading.Lock()
+        self._alvos: Dict[str, _Alvo] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def adicionar(self, nome: str, pool: PoolConexoes, timeout: float = TIMEOUT_PADRAO) -> None:
+        """
+        Registra um servidor (substitui, fechando o pool, um de mesmo nome)
+
+        Args:
+            nome: Identificação do servidor no relatório
+            pool: Pool de conexões do servidor
+            timeout: Prazo em segundos para a coleta deste servidor
+        """
+        with self._lock:
+            anterior = self._alvos.pop(nome, None)
+            self._alvos[nome] = _Alvo(nome, pool, timeout)
+        if anterior is not None and anterior.pool is not pool:
+            anterior.pool.fechar()
+
+    def remover(self, nome: str) -> None:
+        """Remove um servidor e fecha o seu pool"""
+        with self._lock:
+            alvo = self._alvos.pop(nome, None)
+        if alvo is not None:
+            alvo.pool.fechar()
+
+    def nomes(self) -> List[str]:
+        """Servidores registrados, na ordem de cadastro"""
+        with self._lock:
+            return list(self._alvos)
+
+    def __len__(self) -> int:
+        return len(self._alvos)
+
+    def coletar(self, orcamento_s: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Coleta as métricas de todos os servidores em paralelo
+
+        Args:
+            orcamento_s: Tempo máximo da rodada (padrão: o do monitor)
+
+        Returns:
+            Dicionário com 'servidores' (nome -> métricas, como em
+            coletar_metricas_db, mais 'duracao_coleta_ms', 'erro' e
+            'degradado'), 'degradado' (algum servidor sem métricas a tempo)
+            e 'duracao_coleta_ms' da rodada
+        """
+        try:
+            inicio = time.monotonic()
+            orcamento = orcamento_s if orcamento_s is not None else self.orcamento_s
+            # (alvo, coleta aguardada, prazo absoluto, métricas já decididas)
+            pendentes: List[Tuple[_Alvo, Optional[Future], float, Optional[Dict[str, Any]]]] = []
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="ColetaDB")
+                for alvo in self._alvos.values():
+                    prazo = min(alvo.timeout, orcamento)
+                    if alvo.aberto_ate > inicio:
+                        # Circuito aberto: o servidor não é consultado até o fim da espera
+                        metricas = self._falha(f"Circuito aberto após {alvo.falhas} falha(s) seguida(s) ({alvo.ultimo_erro}); "
+                                               f"nova tentativa em {alvo.aberto_ate - inicio:.0f}s", alvo.ultimo_status)
+                        pendentes.append((alvo, None, 0.0, metricas))
+                    elif alvo.futuro is not None and not alvo.futuro.done():
+                        if inicio - alvo.disparado_em < alvo.timeout:
+                            # Disparada por outra chamada e ainda no prazo: aguarda a mesma coleta
+                            pendentes.append((alvo, alvo.futuro, alvo.disparado_em + prazo, None))
+                        else:
+                            # Coleta anterior ainda presa neste servidor: servidor travado também abre o circuito
+                            metricas = self._falha(f"Coleta anterior ainda em andamento há {inicio - alvo.disparado_em:.0f}s",
+                                                   'Degradado')
+                            self._registrar_falha(alvo, metricas)
+                            pendentes.append((alvo, None, 0.0, metricas))
+                    else:
+                        alvo.futuro = self._executor.submit(self._coletar_alvo, alvo.pool)
+                        alvo.disparado_em = inicio
+                        pendentes.append((alvo, alvo.futuro, inicio + prazo, None))
+
+            servidores = {}
+            for alvo, futuro, limite, metricas in pendentes:
+                if futuro is not None:
+                    try:
+                        metricas = futuro.result(timeout=max(limite - time.monotonic(), 0))
+                    except TempoEsgotado:
+                        erro = f"Sem resposta em {min(alvo.timeout, orcamento):g}s"
+                        metricas = self._apurar(alvo, futuro, self._falha(erro, 'Degradado'))
+                    except Exception as e:
+                        metricas = self._apurar(alvo, futuro, self._falha(str(e)))
+                    else:
+                        self._apurar(alvo, futuro, metricas)
+                servidores[alvo.nome] = metricas
+
+            return {
+                'servidores': servidores,
+                'degradado': any(metricas['degradado'] for metricas in servidores.values()),
+                'duracao_coleta_ms': round((time.monotonic() - inicio) * 1000, 1),
+            }
+
+        except Exception as e:
+            raise Exception(f"Erro ao coletar métricas dos servidores: {str(e)}")
+
+    def fechar(self) -> None:
+        """Fecha os pools de todos os servidores e encerra as threads"""
+        with self._lock:
+            alvos, self._alvos = list(self._alvos.values()), {}
+            executor, self._executor = self._executor, None
+        for alvo in alvos:
+            alvo.pool.fechar()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _apurar(self, alvo: _Alvo, futuro: Future, metricas: Dict[str, Any]) -> Dict[str, Any]:
+        """Conta o resultado da coleta no circuito do servidor, que abre ao atingir o limite de falhas"""
+        with self._lock:
+            if alvo.apurado is futuro:
+                return metricas
+            alvo.apurado = futuro
+            if metricas['status'] == 'Conectado':
+                alvo.falhas = 0
+            else:
+                self._registrar_falha(alvo, metricas)
+        return metricas
+
+    def _registrar_falha(self, alvo: _Alvo, metricas: Dict[str, Any]) -> None:
+        """Conta uma falha seguida do servidor e abre o circuito no limite (chamada sob o lock)"""
+        alvo.falhas += 1
+        alvo.ultimo_erro = metricas.get('erro')
+        alvo.ultimo_status = metricas['status']
+        if alvo.falhas >= self.falhas_para_abrir:
+            alvo.aberto_ate = time.monotonic() + self.espera_circuito
+
+    @staticmethod
+    def _coletar_alvo(pool: PoolConexoes) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        metricas = coletar_metricas_db(pool)
+        metricas['duracao_coleta_ms'] = round((time.perf_counter() - inicio) * 1000, 1)
+        metricas.setdefault('erro', pool.estatisticas()['ultimo_erro'] if metricas.get('status') == 'Desconectado' else None)
+        metricas.setdefault('degradado', metricas.get('status') != 'Conectado')
+        return metricas
+
+    @staticmethod
+    def _falha(erro: str, status: str = 'Desconectado') -> Dict[str, Any]:
+        """Métricas vazias de um servidor sem resultado nesta rodada"""
+        metricas = metricas_desconectado()
+        metricas['status'] = status
+        metricas['erro'] = erro
+        metricas['degradado'] = True
+        metricas['duracao_coleta_ms'] = None
+        return metricas
+
+
+def por_servidor(dados_db: Dict[str, Any]) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+    """
+    Lista (nome, métricas) de cada servidor presente nos dados do banco
+
+    Aceita tanto o resultado de MonitorServidores.coletar() quanto o de
+    coletar_metricas_db() (um único servidor, sem nome).
+
+    Args:
+        dados_db: Métricas do banco de dados
+
+    Returns:
+        Lista de tuplas (nome ou None, métricas do servidor)
+    """
+    servidores = dados_db.get('servidores')
+    if servidores is None:
+        return [(None, dados_db)]
+    return list(servidores.items())
@@ -0,0 +1,66 @@
+from typing import Dict, Any, Optional, Tuple
+import threading
+import time
+
+
+class MotorTaxas:
+    """
+    Taxas por segundo de contadores cumulativos do servidor
+
+    Guarda o snapshot anterior e divide a diferença pelo tempo entre as
+    leituras. Quando o Uptime diminui ou um contador volta atrás
+    (reinício do servidor, FLUSH STATUS), a leitura vira a nova base em
+    vez de produzir taxas negativas. Cada taxa também alimenta uma média
+    móvel exponencial, usada como referência para detectar picos.
+    """
+
+    def __init__(self, nomes: Tuple[str, ...], suavizacao: float = 0.2):
+        """
+        Args:
+            nomes: Nomes dos contadores (minúsculos, como em STATUS_GLOBAL)
+            suavizacao: Peso da taxa atual na média móvel (0 a 1)
+        """
+        self.nomes = nomes
+        self.suavizacao = suavizacao
+        self._lock = threading.Lock()
+        self._anterior: Optional[tuple] = None
+        self._medias: Dict[str, float] = {}
+        self.reinicios = 0
+
+    def atualizar(self, contadores: Dict[str, Any], uptime: int) -> Dict[str, Any]:
+        """
+        Registra uma leitura e calcula as taxas desde a anterior
+
+        Args:
+            contadores: Valores cumulativos por nome
+            uptime: Uptime do servidor em segundos (detecta reinício)
+
+        Returns:
+            Dicionário com 'taxas' e 'medias' anteriores (por segundo); vazio na
+            primeira leitura ou logo após um reinício
+        """
+        agora = time.monotonic()
+        atual = {nome: int(contadores.get(nome, 0) or 0) for nome in self.nomes}
+
+        with self._lock:
+            anterior, self._anterior = self._anterior, (agora, uptime, atual)
+            if anterior is None:
+                return {}
+
+            instante, uptime_anterior, base = anterior
+            duracao = agora - instante
+            if uptime < uptime_anterior or any(atual[nome] < base[nome] for nome in self.nomes):
+                self.reinicios += 1
+                return {}
+            if duracao <= 0:
+                return {}
+
+            taxas = {nome: (atual[nome] - base[nome]) / duracao for nome in self.nomes}
+            medias = {}
+            for nome, taxa in taxas.items():
+                # A referência é a média antes desta leitura, para o pico não se diluir nela
+                media = self._medias.get(nome, taxa)
+                medias[nome] = media
+                self._medias[nome] = media + self.suavizacao * (taxa - media)
+
+        return {'taxas': taxas, 'medias': medias, 'intervalo_s': duracao}
@@ -0,0 +1,183 @@
+import psutil
+from collections import deque
+from typing import Dict, Any, List
+import os
+import re
+import time
+
+from src.proc_rapido import abrir_leitor
+
+
+# Tamanho do setor usado pelo kernel em /proc/diskstats (sempre 512 bytes)
+TAMANHO_SETOR = 512
+
+# Prefixos de dispositivos virtuais que não representam discos reais
+PREFIXOS_IGNORADOS = ('loop', 'ram', 'zram')
+
+# Nome e contadores usados de cada linha do diskstats, casados direto no buffer:
+# leituras, (mescladas), setores lidos, ms lendo, escritas, (mescladas), setores
+# escritos, ms escrevendo, em andamento, io_ticks, tempo ponderado na fila
+_LINHA_DISKSTATS = re.compile(
+    rb'^ *\d+ +\d+ +(\S+) +(\d+) +\d+ +(\d+) +(\d+) +(\d+) +\d+ +(\d+) +(\d+) +(\d+) +(\d+) +(\d+)',
+    re.MULTILINE
+)
+
+# Intervalo mínimo (s) entre releituras do /sys/block ao surgir um dispositivo desconhecido
+RELISTAR_DISPOSITIVOS = 60.0
+
+
+class ColetorDisco:
+    """
+    Coletor de métricas de disco por dispositivo
+
+    Lê /proc/diskstats (ou psutil fora do Linux) a cada chamada e calcula
+    latência, IOPS, vazão, fila e utilização sobre uma janela deslizante.
+    Quando não houve I/O na janela, o dispositivo é marcado como sem dados
+    em vez de recorrer às médias acumuladas desde o boot. Um dispositivo
+    que aparece no diskstats sem estar na lista do /sys/block (hotplug,
+    volume anexado depois) faz a lista ser relida, no máximo uma vez a
+    cada RELISTAR_DISPOSITIVOS segundos.
+    """
+
+    def __init__(self, janela: float = 5.0, caminho: str = '/proc/diskstats'):
+        """
+        Args:
+            janela: Tamanho da janela de cálculo em segundos
+            caminho: Caminho do arquivo de estatísticas do kernel
+        """
+        self.janela = janela
+        self.caminho = caminho
+        self._leitor = abrir_leitor(caminho)
+        self._dispositivos = _listar_dispositivos_bloco()
+        self._listado_em = time.monotonic()
+        self._historico = deque()
+        self._nomes: Dict[bytes, str] = {}
+
+    def coletar(self) -> List[Dict[str, Any]]:
+        """
+        Registra um novo snapshot e calcula as métricas da janela
+
+        Returns:
+            Lista com as métricas de cada dispositivo
+        """
+        agora = time.monotonic()
+        snapshot = self._ler_proc() if self._leitor is not None else self._ler_psutil()
+        self._historico.append((agora, snapshot))
+
+        # Mantém só o snapshot mais antigo ainda dentro da janela como base
+        while len(self._historico) > 2 and agora - self._historico[1][0] >= self.janela:
+            self._historico.popleft()
+
+        if len(self._historico) < 2:
+            return []
+
+        inicio, base = self._historico[0]
+        return _calcular_janela(base, snapshot, agora - inicio)
+
+    def _ler_proc(self) -> Dict[str, tuple]:
+        snapshot = {}
+        for linha in _LINHA_DISKSTATS.finditer(self._leitor.ler()):
+            bruto = linha.group(1)
+            nome = self._nomes.get(bruto)
+            if nome is None:
+                nome = self._nomes[bruto] = bruto.decode()
+            if not self._incluir(nome):
+                continue
+            snapshot[nome] = tuple(map(int, linha.group(2, 3, 4, 5, 6, 7, 8, 9, 10)))
+        return snapshot
+
+    def _ler_psutil(self) -> Dict[str, tuple]:
+        snapshot = {}
+        contadores = psutil.disk_io_counters(perdisk=True) or {}
+        for nome, io in contadores.items():
+            if not self._incluir(nome):
+                continue
+            snapshot[nome] = (
+                io.read_count, io.read_bytes // TAMANHO_SETOR, io.read_time,
+                io.write_count, io.write_bytes // TAMANHO_SETOR, io.write_time,
+                0, getattr(io, 'busy_time', 0), 0
+            )
+        return snapshot
+
+    def _incluir(self, nome: str) -> bool:
+        if nome.startswith(PREFIXOS_IGNORADOS):
+            return False
+        if nome not in self._dispositivos and self._dispositivos:
+            self._relistar()
+        # Com /sys/block disponível, considera só discos inteiros (sem partições)
+        return not self._dispositivos or nome in self._dispositivos
+
+    def _relistar(self) -> None:
+        # Partições também são desconhecidas: o intervalo mínimo evita reler a cada linha
+        agora = time.monotonic()
+        if agora - self._listado_em >= RELISTAR_DISPOSITIVOS:
+            self._dispositivos = _listar_dispositivos_bloco()
+            self._listado_em = agora
+
+
+def _listar_dispositivos_bloco() -> set:
+    try:
+        return set(os.listdir('/sys/block'))
+    except OSError:
+        return set()
+
+
+def _calcular_janela(base: Dict[str, tuple], atual: Dict[str, tuple], duracao: float) -> List[Dict[str, Any]]:
+    """Calcula as métricas de cada dispositivo entre dois snapshots"""
+    discos = []
+    if duracao <= 0:
+        return discos
+
+    duracao_ms = duracao * 1000
+    for nome, valores in atual.items():
+        anterior = base.get(nome)
+        if anterior is None:
+            continue
+
+        (leituras, setores_lidos, ms_leitura, escritas, setores_escritos,
+         ms_escrita, _, io_ticks, ms_fila) = (v - a for v, a in zip(valores, anterior))
+        em_andamento = valores[6]
+
+        # Contadores zerados (dispositivo recriado) invalidam a janela
+        if min(leituras, escritas, ms_leitura, ms_escrita, io_ticks) < 0:
+            continue
+
+        operacoes = leituras + escritas
+        sem_dados = operacoes == 0
+
+        discos.append({
+            'dispositivo': nome,
+            'sem_dados': sem_dados,
+            'leituras_s': round(leituras / duracao, 2),
+            'escritas_s': round(escritas / duracao, 2),
+            'iops': round(operacoes / duracao, 2),
+            'leitura_mb_s': round(setores_lidos * TAMANHO_SETOR / duracao / (1024 ** 2), 2),
+            'escrita_mb_s': round(setores_escritos * TAMANHO_SETOR / duracao / (1024 ** 2), 2),
+            'latencia_leitura_ms': round(ms_leitura / leituras, 2) if leituras else None,
+            'latencia_escrita_ms': round(ms_escrita / escritas, 2) if escritas else None,
+            'latencia_ms': None if sem_dados else round((ms_leitura + ms_escrita) / operacoes, 2),
+            'em_andamento': em_andamento,
+            'fila_media': round(ms_fila / duracao_ms, 2),
+            'utilizacao': round(min(io_ticks / duracao_ms * 100, 100.0), 1),
+        })
+
+    return sorted(discos, key=lambda d: d['dispositivo'])
+
+
+def resumir_discos(discos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Resume as métricas por dispositivo nos campos agregados do SO
+
+    Returns:
+        Dicionário com a pior latência da janela e o dispositivo correspondente
+    """
+    ativos = [d for d in discos if not d['sem_dados']]
+    if not ativos:
+        return {'latencia_disco_ms': 0.0, 'latencia_disco_sem_dados': True, 'disco_mais_lento': None}
+
+    mais_lento = max(ativos, key=lambda d: d['latencia_ms'])
+    return {
+        'latencia_disco_ms': mais_lento['latencia_ms'],
+        'latencia_disco_sem_dados': False,
+        'disco_mais_lento': mais_lento['dispositivo'],
+    }
@@ -0,0 +1,157 @@
+import psutil
+from typing import Dict, Any, List, Optional
+import os
+import select
+import time
+
+
+# Sistemas de arquivos virtuais que não ocupam espaço em disco
+TIPOS_VIRTUAIS = {
+    'proc', 'sysfs', 'devtmpfs', 'devpts', 'tmpfs', 'cgroup', 'cgroup2', 'securityfs',
+    'pstore', 'bpf', 'debugfs', 'tracefs', 'configfs', 'fusectl', 'mqueue', 'hugetlbfs',
+    'autofs', 'binfmt_misc', 'rpc_pipefs', 'nsfs', 'efivarfs', 'squashfs', 'ramfs',
+}
+
+# Sistemas de arquivos de rede, cujo statvfs pode travar se o servidor cair
+TIPOS_REDE = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', 'glusterfs', 'ceph'}
+
+
+class ColetorSistemaArquivos:
+    """
+    Coletor de espaço e inodes de todos os pontos de montagem
+
+    Descobre as montagens uma vez e só relê /proc/self/mountinfo quando o
+    kernel sinaliza mudança na tabela (POLLPRI). A cada tick faz exatamente
+    um statvfs por montagem. Fora do Linux usa psutil e redescobre as
+    partições periodicamente.
+    """
+
+    def __init__(self, incluir_rede: bool = False, caminho: str = '/proc/self/mountinfo',
+                 intervalo_redescoberta: float = 60.0):
+        """
+        Args:
+            incluir_rede: Incluir sistemas de arquivos de rede (NFS, CIFS...)
+            caminho: Caminho da tabela de montagens do kernel
+            intervalo_redescoberta: Intervalo de redescoberta sem mountinfo, em segundos
+        """
+        self.incluir_rede = incluir_rede
+        self.caminho = caminho
+        self.intervalo_redescoberta = intervalo_redescoberta
+        self._montagens: List[Dict[str, str]] = []
+        self._descoberto_em = 0.0
+        self._arquivo = None
+        self._poll = None
+
+        if os.path.exists(caminho) and hasattr(os, 'statvfs'):
+            self._arquivo = open(caminho)
+            self._poll = select.poll()
+            self._poll.register(self._arquivo.fileno(), select.POLLPRI | select.POLLERR)
+
+    def coletar(self) -> List[Dict[str, Any]]:
+        """
+        Atualiza a lista de montagens se necessário e mede cada uma
+
+        Returns:
+            Lista com uso de espaço e inodes por ponto de montagem
+        """
+        if self._montagens_mudaram():
+            self._montagens = self._descobrir()
+            self._descoberto_em = time.monotonic()
+
+        sistemas = []
+        for montagem in self._montagens:
+            medida = self._medir(montagem['ponto'])
+            if medida is not None:
+                medida.update(montagem)
+                sistemas.append(medida)
+        return sistemas
+
+    def _montagens_mudaram(self) -> bool:
+        if not self._descoberto_em:
+            return True
+        if self._poll is not None:
+            return bool(self._poll.poll(0))
+        return time.monotonic() - self._descoberto_em >= self.intervalo_redescoberta
+
+    def _descobrir(self) -> List[Dict[str, str]]:
+        if self._arquivo is None:
+            return [
+                {'ponto': p.mountpoint, 'dispositivo': p.device, 'tipo': p.fstype}
+                for p in psutil.disk_partitions(all=False)
+                if self.incluir_rede or p.fstype not in TIPOS_REDE
+            ]
+
+        # Reler desde o início também rearma o aviso de mudança do kernel
+        self._arquivo.seek(0)
+        por_dispositivo: Dict[str, Dict[str, str]] = {}
+        for linha in self._arquivo.read().splitlines():
+            campos = linha.split()
+            separador = campos.index('-')
+            tipo = campos[separador + 1]
+            if tipo in TIPOS_VIRTUAIS or (not self.incluir_rede and tipo in TIPOS_REDE):
+                continue
+
+            montagem = {
+                'ponto': _decodificar(campos[4]),
+                'dispositivo': _decodificar(campos[separador + 2]),
+                'tipo': tipo,
+            }
+            # Bind mounts do mesmo dispositivo (major:minor) são o mesmo sistema de
+            # arquivos; fica o ponto de montagem mais curto
+            existente = por_dispositivo.get(campos[2])
+            if existente is None or len(montagem['ponto']) < len(existente['ponto']):
+                por_dispositivo[campos[2]] = montagem
+
+        return sorted(por_dispositivo.values(), key=lambda m: m['ponto'])
+
+    def _medir(self, ponto: str) -> Optional[Dict[str, Any]]:
+        try:
+            if not hasattr(os, 'statvfs'):
+                uso = psutil.disk_usage(ponto)
+                return _montar_medida(uso.total, uso.used, uso.free, 0, 0)
+
+            st = os.statvfs(ponto)
+        except OSError:
+            return None
+
+        total = st.f_blocks * st.f_frsize
+        usado = (st.f_blocks - st.f_bfree) * st.f_frsize
+        livre = st.f_bavail * st.f_frsize
+        return _montar_medida(total, usado, livre, st.f_files, st.f_files - st.f_ffree)
+
+    def fechar(self) -> None:
+        """Libera o descritor mantido aberto para /proc/self/mountinfo"""
+        if self._arquivo is not None:
+            self._poll.unregister(self._arquivo.fileno())
+            self._arquivo.close()
+            self._arquivo = None
+            self._poll = None
+
+
+def _montar_medida(total: int, usado: int, livre: int, inodes: int, inodes_usados: int) -> Dict[str, Any]:
+    # Mesmo cálculo de psutil.disk_usage: percentual sobre o espaço disponível ao usuário
+    base = usado + livre
+    return {
+        'total_gb': round(total / (1024 ** 3), 2),
+        'usado_gb': round(usado / (1024 ** 3), 2),
+        'livre_gb': round(livre / (1024 ** 3), 2),
+        'uso_percent': round(usado / base * 100, 1) if base else 0.0,
+        'inodes_total': inodes,
+        'inodes_usados': inodes_usados,
+        'uso_inodes_percent': round(inodes_usados / inodes * 100, 1) if inodes else 0.0,
+    }
+
+
+def _decodificar(campo: str) -> str:
+    """Decodifica os escapes octais de mountinfo (ex.: \\040 para espaço)"""
+    if '\\' not in campo:
+        return campo
+    return campo.encode().decode('unicode_escape').encode('latin-1').decode('utf-8', 'replace')
+
+
+def sistema_raiz(sistemas: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Retorna a montagem raiz ('/' ou a unidade do sistema), ou a primeira encontrada"""
+    for sistema in sistemas:
+        if sistema['ponto'] in ('/', '\\', 'C:\\'):
+            return sistema
+    return sistemas[0] if sistemas else None
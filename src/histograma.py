@@ -0,0 +1,149 @@
+from array import array
+from typing import Dict, Any, Optional
+import math
+import threading
+import time
+
+
+# Bits de sub-bucket por potência de 2: 16 sub-buckets lineares, erro relativo < 6,25%
+BITS_SUB_BUCKET = 4
+SUB_BUCKETS = 1 << BITS_SUB_BUCKET
+
+# Maior magnitude registrada (2^36 ns ~ 68 s); valores acima caem no último bucket
+MAGNITUDE_MAXIMA = 35
+N_BUCKETS = (MAGNITUDE_MAXIMA - BITS_SUB_BUCKET + 2) * SUB_BUCKETS
+
+
+def _indice(valor: int) -> int:
+    """Bucket de um valor em ns (escala logarítmica com sub-buckets lineares)"""
+    if valor < SUB_BUCKETS:
+        return max(valor, 0)
+    magnitude = valor.bit_length() - 1
+    if magnitude > MAGNITUDE_MAXIMA:
+        return N_BUCKETS - 1
+    deslocamento = magnitude - BITS_SUB_BUCKET
+    return (deslocamento + 1) * SUB_BUCKETS + ((valor >> deslocamento) & (SUB_BUCKETS - 1))
+
+
+def _valor_representativo(indice: int) -> int:
+    """Ponto médio do intervalo de valores de um bucket"""
+    if indice < SUB_BUCKETS:
+        return indice
+    deslocamento = indice // SUB_BUCKETS - 1
+    sub = indice % SUB_BUCKETS
+    inferior = (SUB_BUCKETS + sub) << deslocamento
+    return inferior + (1 << deslocamento) // 2
+
+
+class HistogramaLatencia:
+    """
+    Histograma de latências com memória fixa, no estilo HDR
+
+    Cada potência de 2 (em ns) é dividida em 16 sub-buckets lineares, o que
+    cobre de 1 ns a ~68 s em 528 contadores inteiros com erro relativo
+    abaixo de 6,25%, independentemente do número de amostras.
+    """
+
+    __slots__ = ('contagens', 'total', 'maximo_ns', 'soma_ns')
+
+    def __init__(self):
+        self.contagens = array('q', bytes(8 * N_BUCKETS))
+        self.total = 0
+        self.maximo_ns = 0
+        self.soma_ns = 0
+
+    def registrar(self, valor_ns: int) -> None:
+        """Registra uma amostra em nanossegundos"""
+        self.contagens[_indice(valor_ns)] += 1
+        self.total += 1
+        self.soma_ns += valor_ns
+        if valor_ns > self.maximo_ns:
+            self.maximo_ns = valor_ns
+
+    def mesclar(self, outro: 'HistogramaLatencia') -> None:
+        """Soma as contagens de outro histograma a este"""
+        for i, contagem in enumerate(outro.contagens):
+            if contagem:
+                self.contagens[i] += contagem
+        self.total += outro.total
+        self.soma_ns += outro.soma_ns
+        self.maximo_ns = max(self.maximo_ns, outro.maximo_ns)
+
+    def percentil(self, p: float) -> Optional[int]:
+        """
+        Valor (ns) abaixo do qual estão p% das amostras
+
+        Args:
+            p: Percentil entre 0 e 100
+
+        Returns:
+            Valor representativo do bucket, limitado ao máximo observado,
+            ou None sem amostras
+        """
+        if not self.total:
+            return None
+        alvo = max(math.ceil(p / 100 * self.total), 1)
+        acumulado = 0
+        for i, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return min(_valor_representativo(i), self.maximo_ns)
+        return self.maximo_ns
+
+    def resumo_ms(self) -> Dict[str, Any]:
+        """Percentis p50/p95/p99, máximo e média em milissegundos"""
+        def _ms(valor: Optional[int]) -> Optional[float]:
+            return round(valor / 1_000_000, 3) if valor is not None else None
+
+        return {
+            'p50_ms': _ms(self.percentil(50)),
+            'p95_ms': _ms(self.percentil(95)),
+            'p99_ms': _ms(self.percentil(99)),
+            'max_ms': _ms(self.maximo_ns if self.total else None),
+            'media_ms': _ms(self.soma_ns // self.total if self.total else None),
+            'amostras': self.total,
+        }
+
+
+class JanelaLatencia:
+    """
+    Histograma deslizante: percentis das últimas `janela` a 2x`janela` segundos
+
+    Mantém o histograma atual e o da janela anterior; ao virar a janela o
+    anterior é descartado, sem guardar amostras individuais.
+    """
+
+    def __init__(self, janela: float = 60.0):
+        """
+        Args:
+            janela: Duração de cada histograma em segundos
+        """
+        self.janela = janela
+        self._lock = threading.Lock()
+        self._atual = HistogramaLatencia()
+        self._anterior = HistogramaLatencia()
+        self._inicio = time.monotonic()
+
+    def registrar(self, valor_ns: int) -> None:
+        """Registra uma amostra em nanossegundos"""
+        with self._lock:
+            self._girar()
+            self._atual.registrar(valor_ns)
+
+    def resumo_ms(self) -> Dict[str, Any]:
+        """Percentis combinados das duas janelas, em milissegundos"""
+        with self._lock:
+            self._girar()
+            combinado = HistogramaLatencia()
+            combinado.mesclar(self._anterior)
+            combinado.mesclar(self._atual)
+        return combinado.resumo_ms()
+
+    def _girar(self) -> None:
+        agora = time.monotonic()
+        if agora - self._inicio < self.janela:
+            return
+        # Se passou mais de duas janelas sem amostras, as duas ficam vazias
+        self._anterior = self._atual if agora - self._inicio < 2 * self.janela else HistogramaLatencia()
+        self._atual = HistogramaLatencia()
+        self._inicio = agora
@@ -0,0 +1,218 @@
+from typing import Dict, Any, Optional
+from contextlib import contextmanager
+import functools
+import os
+import threading
+import time
+import tracemalloc
+
+import psutil
+
+
+# A cada quantas chamadas de uma etapa as alocações são medidas com tracemalloc
+AMOSTRAGEM_ALOCACOES = 10
+
+_lock = threading.Lock()
+_lock_tracemalloc = threading.Lock()
+_etapas: Dict[str, Dict[str, Any]] = {}
+# Etapas medidas em andamento (em qualquer thread) e total de etapas iniciadas
+_ativas = 0
+_inicios = 0
+_custo_syscalls: Optional[int] = None
+
+
+def instrumentar(nome: str):
+    """
+    Decorador que mede o custo de uma etapa do próprio monitor
+
+    Args:
+        nome: Nome da etapa nas estatísticas
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            with medir_etapa(nome):
+                return funcao(*args, **kwargs)
+
+        return envoltorio
+    return decorador
+
+
+@contextmanager
+def medir_etapa(nome: str):
+    """
+    Mede o custo do bloco como uma etapa do próprio monitor
+
+    Registra tempo de parede, tempo de CPU da thread, syscalls de
+    leitura/escrita (Linux) e, por amostragem, as alocações via tracemalloc.
+    O tracemalloc conta as alocações de todo o processo: a amostra só é
+    feita quando nenhuma outra etapa medida está em andamento e é
+    descartada se outra começar no meio, mas threads não instrumentadas
+    ainda entram na conta, por isso o valor é publicado como do processo.
+
+    Args:
+        nome: Nome da etapa nas estatísticas
+    """
+    global _ativas, _inicios
+    with _lock:
+        estatistica = _etapas.setdefault(nome, _nova_estatistica())
+        estatistica['chamadas'] += 1
+        amostrar = estatistica['chamadas'] % AMOSTRAGEM_ALOCACOES == 1 and _ativas == 0
+        _ativas += 1
+        _inicios += 1
+        inicio_etapa = _inicios
+
+    # Nunca interfere se outra ferramenta já estiver rastreando
+    rastreando = amostrar and not tracemalloc.is_tracing() and _lock_tracemalloc.acquire(blocking=False)
+    if rastreando:
+        tracemalloc.start()
+
+    syscalls_inicio = _syscalls_thread()
+    cpu_inicio = time.thread_time()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        parede_ms = (time.perf_counter() - inicio) * 1000
+        cpu_ms = (time.thread_time() - cpu_inicio) * 1000
+        syscalls_fim = _syscalls_thread()
+        alocacoes = None
+        if rastreando:
+            alocacoes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            _lock_tracemalloc.release()
+
+        with _lock:
+            _ativas -= 1
+            estatistica['ultimo_ms'] = round(parede_ms, 3)
+            estatistica['total_ms'] += parede_ms
+            estatistica['ultimo_cpu_ms'] = round(cpu_ms, 3)
+            estatistica['total_cpu_ms'] += cpu_ms
+            if syscalls_inicio is not None and syscalls_fim is not None:
+                estatistica['ultimo_syscalls'] = max(syscalls_fim - syscalls_inicio - _custo_medicao_syscalls(), 0)
+            # Outra etapa medida começou durante a amostra: as alocações dela se misturariam
+            if alocacoes is not None and _inicios == inicio_etapa:
+                estatistica['alocado_processo_kb'] = round(alocacoes[0] / 1024, 1)
+                estatistica['pico_alocado_processo_kb'] = round(alocacoes[1] / 1024, 1)
+
+
+def _nova_estatistica() -> Dict[str, Any]:
+    return {
+        'chamadas': 0,
+        'ultimo_ms': 0.0,
+        'total_ms': 0.0,
+        'ultimo_cpu_ms': 0.0,
+        'total_cpu_ms': 0.0,
+        'ultimo_syscalls': None,
+        'alocado_processo_kb': None,
+        'pico_alocado_processo_kb': None,
+    }
+
+
+def _syscalls_thread() -> Optional[int]:
+    """Syscalls de leitura + escrita da thread atual (syscr/syscw do Linux)"""
+    try:
+        with open('/proc/thread-self/io', 'rb') as arquivo:
+            conteudo = arquivo.read()
+    except OSError:
+        return None
+
+    total = 0
+    for linha in conteudo.splitlines():
+        if linha.startswith((b'syscr:', b'syscw:')):
+            total += int(linha.split()[1])
+    return total
+
+
+def _custo_medicao_syscalls() -> int:
+    """Syscalls contadas pela própria leitura de /proc/thread-self/io (calibrado uma vez)"""
+    global _custo_syscalls
+    if _custo_syscalls is None:
+        inicio = _syscalls_thread()
+        fim = _syscalls_thread()
+        _custo_syscalls = fim - inicio if inicio is not None and fim is not None else 0
+    return _custo_syscalls
+
+
+def estatisticas_etapas() -> Dict[str, Dict[str, Any]]:
+    """
+    Retorna o custo acumulado de cada etapa instrumentada
+
+    Returns:
+        Dicionário etapa -> chamadas, último/médio tempo de parede e de CPU,
+        syscalls da última chamada e alocações do processo na última amostra
+    """
+    with _lock:
+        resultado = {}
+        for nome, estatistica in _etapas.items():
+            chamadas = estatistica['chamadas'] or 1
+            resultado[nome] = {
+                'chamadas': estatistica['chamadas'],
+                'ultimo_ms': estatistica['ultimo_ms'],
+                'medio_ms': round(estatistica['total_ms'] / chamadas, 3),
+                'ultimo_cpu_ms': estatistica['ultimo_cpu_ms'],
+                'medio_cpu_ms': round(estatistica['total_cpu_ms'] / chamadas, 3),
+                'ultimo_syscalls': estatistica['ultimo_syscalls'],
+                'alocado_processo_kb': estatistica['alocado_processo_kb'],
+                'pico_alocado_processo_kb': estatistica['pico_alocado_processo_kb'],
+            }
+        return resultado
+
+
+class MonitorProprio:
+    """
+    Métricas do processo do próprio monitor
+
+    Calcula o uso de CPU do processo pela diferença de os.times() entre
+    chamadas e, quando há orçamento definido, ajusta o fator global do
+    agendador para recuar enquanto o monitor estiver acima dele.
+    """
+
+    def __init__(self, agendador=None, orcamento_cpu_percent: Optional[float] = None):
+        """
+        Args:
+            agendador: AgendadorColetores cujo ritmo é reduzido acima do orçamento
+            orcamento_cpu_percent: Uso máximo de CPU do monitor (% de um núcleo)
+        """
+        self.agendador = agendador
+        self.orcamento_cpu_percent = orcamento_cpu_percent
+        self._processo = psutil.Process()
+        self._anterior: Optional[tuple] = None
+
+    def coletar(self) -> Dict[str, Any]:
+        """
+        Lê o custo atual do monitor
+
+        Returns:
+            Dicionário 'monitor' com CPU, memória, threads, custo por etapa
+            e por coletor
+        """
+        agora = time.monotonic()
+        tempos = os.times()
+        cpu_total = tempos.user + tempos.system
+        anterior, self._anterior = self._anterior, (agora, cpu_total)
+
+        cpu_percent = None
+        if anterior is not None and agora > anterior[0]:
+            cpu_percent = round(max(cpu_total - anterior[1], 0.0) / (agora - anterior[0]) * 100, 2)
+
+        monitor = {
+            'cpu_percent': cpu_percent,
+            'rss_mb': round(self._processo.memory_info().rss / (1024 ** 2), 1),
+            'threads': threading.active_count(),
+            'etapas': estatisticas_etapas(),
+            'coletores': self.agendador.estatisticas() if self.agendador is not None else [],
+            'orcamento_cpu_percent': self.orcamento_cpu_percent,
+            'fator_recuo': 1,
+        }
+
+        if self.agendador is not None and self.orcamento_cpu_percent is not None and cpu_percent is not None:
+            fator = self.agendador.fator_global
+            if cpu_percent > self.orcamento_cpu_percent:
+                fator = min(fator * 2, self.agendador.FATOR_GLOBAL_MAXIMO)
+            elif fator > 1 and cpu_percent < self.orcamento_cpu_percent / 2:
+                fator //= 2
+            self.agendador.definir_fator_global(fator)
+            monitor['fator_recuo'] = fator
+
+        return {'monitor': monitor}
@@ -0,0 +1,96 @@
+import psutil
+from typing import Dict, Any, Optional
+import time
+
+from src.proc_rapido import abrir_leitor, ler_chave_valor
+
+
+CHAVES_MEMINFO = frozenset((b'MemTotal', b'MemFree', b'MemAvailable', b'SwapTotal', b'SwapFree'))
+
+# Páginas trocadas com o swap e faltas de página que exigiram leitura de disco
+CHAVES_VMSTAT = frozenset((b'pswpin', b'pswpout', b'pgmajfault'))
+
+
+class ColetorMemoria:
+    """
+    Coletor de memória RAM e swap
+
+    No Linux lê /proc/meminfo e /proc/vmstat por descritores persistentes
+    (LeitorProc), com os mesmos cálculos de psutil.virtual_memory (usada =
+    total - MemAvailable) e psutil.swap_memory, e acrescenta as taxas de swap-in/out e de faltas
+    de página maiores. Nos demais sistemas usa psutil.
+    """
+
+    def __init__(self):
+        self._meminfo = abrir_leitor('/proc/meminfo')
+        self._vmstat = abrir_leitor('/proc/vmstat')
+        self._vmstat_anterior: Optional[tuple] = None
+
+    def coletar(self) -> Dict[str, Any]:
+        """
+        Lê o uso atual de memória e swap
+
+        Returns:
+            Dicionário com percentuais, totais em GB e taxas de paginação
+        """
+        if self._meminfo is None:
+            return _coletar_psutil()
+
+        info = ler_chave_valor(self._meminfo.ler(), CHAVES_MEMINFO)
+        total = info[b'MemTotal'] * 1024
+        disponivel = info.get(b'MemAvailable', info[b'MemFree']) * 1024
+        # Mesma conta de psutil.virtual_memory().used: tudo o que não está disponível
+        usado = total - disponivel
+
+        swap_total = info.get(b'SwapTotal', 0) * 1024
+        swap_usado = swap_total - info.get(b'SwapFree', 0) * 1024
+
+        metricas = {
+            'uso_memoria': round((total - disponivel) / total * 100, 1) if total else 0.0,
+            'uso_swap': round(swap_usado / swap_total * 100, 1) if swap_total else 0.0,
+            'memoria_total_gb': round(total / (1024 ** 3), 2),
+            'memoria_usada_gb': round(usado / (1024 ** 3), 2),
+        }
+        if self._vmstat is not None:
+            metricas.update(self._calcular_paginacao())
+        return metricas
+
+    def _calcular_paginacao(self) -> Dict[str, Any]:
+        agora = time.monotonic()
+        atual = ler_chave_valor(self._vmstat.ler(), CHAVES_VMSTAT)
+        anterior, self._vmstat_anterior = self._vmstat_anterior, (agora, atual)
+        if anterior is None:
+            return {}
+
+        inicio, base = anterior
+        duracao = agora - inicio
+        if duracao <= 0:
+            return {}
+
+        def _taxa(chave: bytes) -> float:
+            return round(max(atual.get(chave, 0) - base.get(chave, 0), 0) / duracao, 1)
+
+        return {
+            'swap_in_paginas_s': _taxa(b'pswpin'),
+            'swap_out_paginas_s': _taxa(b'pswpout'),
+            'faltas_pagina_maiores_s': _taxa(b'pgmajfault'),
+        }
+
+
+def _coletar_psutil() -> Dict[str, Any]:
+    # Métricas básicas
+    memoria = psutil.virtual_memory()
+    uso_memoria = memoria.percent
+
+    # Memória de troca (Swap)
+    swap = psutil.swap_memory()
+    uso_swap = swap.percent
+
+    metricas = {
+        'uso_memoria': uso_memoria,
+        'uso_swap': uso_swap,
+        'memoria_total_gb': round(memoria.total / (1024 ** 3), 2),
+        'memoria_usada_gb': round(memoria.used / (1024 ** 3), 2),
+    }
+
+    return metricas
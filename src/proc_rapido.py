@@ -0,0 +1,90 @@
+from functools import lru_cache
+from typing import Dict, Optional
+import os
+import re
+
+
+class LeitorProc:
+    """
+    Leitor de um arquivo do /proc com descritor persistente
+
+    Mantém o arquivo aberto e relê o conteúdo com os.preadv a partir do
+    offset 0 para dentro de um buffer pré-alocado, evitando open/close e
+    a criação de objetos de arquivo a cada tick. O buffer dobra de
+    tamanho quando o conteúdo não cabe.
+    """
+
+    def __init__(self, caminho: str, tamanho_inicial: int = 16384):
+        """
+        Args:
+            caminho: Caminho do arquivo no /proc
+            tamanho_inicial: Tamanho inicial do buffer em bytes
+
+        Raises:
+            OSError: Se o arquivo não puder ser aberto
+        """
+        self.caminho = caminho
+        self._fd = -1
+        self._fd = os.open(caminho, os.O_RDONLY)
+        self._buffer = bytearray(tamanho_inicial)
+
+    def ler(self) -> memoryview:
+        """
+        Relê o arquivo inteiro
+
+        Returns:
+            View sobre a parte preenchida do buffer (válida até a próxima leitura)
+        """
+        while True:
+            lidos = os.preadv(self._fd, [self._buffer], 0)
+            if lidos < len(self._buffer):
+                return memoryview(self._buffer)[:lidos]
+            # Conteúdo pode ter sido truncado; aumenta o buffer e relê
+            self._buffer = bytearray(len(self._buffer) * 2)
+
+    def fechar(self) -> None:
+        """Fecha o descritor persistente"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self):
+        self.fechar()
+
+
+def proc_rapido_disponivel() -> bool:
+    """Indica se o caminho rápido (Linux com os.preadv e /proc) pode ser usado"""
+    return hasattr(os, 'preadv') and os.path.exists('/proc/stat')
+
+
+def abrir_leitor(caminho: str) -> Optional[LeitorProc]:
+    """Abre um LeitorProc ou retorna None quando o caminho rápido não se aplica"""
+    if not proc_rapido_disponivel():
+        return None
+    try:
+        return LeitorProc(caminho)
+    except OSError:
+        return None
+
+
+def ler_chave_valor(conteudo: memoryview, chaves: frozenset) -> Dict[bytes, int]:
+    """
+    Extrai campos "chave valor" (meminfo, vmstat) diretamente dos bytes
+
+    A busca roda sobre o próprio buffer, sem copiá-lo nem dividi-lo em
+    linhas: só as linhas das chaves pedidas geram objetos.
+
+    Args:
+        conteudo: Conteúdo lido pelo LeitorProc
+        chaves: Chaves de interesse, em bytes e sem o ':' final
+
+    Returns:
+        Dicionário chave -> valor inteiro (kB no caso do meminfo)
+    """
+    return {chave: int(valor) for chave, valor in _padrao_chaves(chaves).findall(conteudo)}
+
+
+@lru_cache(maxsize=None)
+def _padrao_chaves(chaves: frozenset) -> re.Pattern:
+    alternativas = b'|'.join(re.escape(chave) for chave in sorted(chaves))
+    return re.compile(rb'^(' + alternativas + rb'):? +(\d+)', re.MULTILINE)
@@ -0,0 +1,182 @@
+import psutil
+import heapq
+from collections import deque
+from typing import Dict, Any, List, Optional
+import time
+
+
+class _EntradaProcesso:
+    """Estado de um processo mantido entre ticks"""
+
+    __slots__ = ('processo', 'nome', 'cpu_anterior', 'io_anterior', 'ts_anterior',
+                 'cpu_percent', 'rss', 'io_bytes_s')
+
+    def __init__(self, processo: psutil.Process, nome: str):
+        self.processo = processo
+        self.nome = nome
+        self.cpu_anterior: Optional[float] = None
+        self.io_anterior: Optional[int] = None
+        self.ts_anterior = 0.0
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.io_bytes_s = 0.0
+
+
+class ColetorProcessos:
+    """
+    Coletor incremental dos processos que mais consomem recursos
+
+    Mantém os objetos psutil.Process em cache entre ticks e calcula o uso
+    de CPU e I/O pela diferença dos contadores de cada processo, sem sleep.
+    A cada tick só novos PIDs e PIDs encerrados alteram o cache: no
+    máximo `limite_novos` PIDs novos são abertos (os demais esperam os
+    ticks seguintes) e no máximo `orcamento` processos são relidos (em
+    rodízio), o que limita o custo em hosts com milhares de PIDs, inclusive
+    no primeiro tick e em rajadas de fork. Antes de montar os rankings os
+    candidatos ao topo são relidos, para que nenhum valor publicado venha
+    de uma leitura antiga do rodízio.
+    """
+
+    def __init__(self, top_n: int = 5, orcamento: int = 500, limite_novos: int = 200):
+        """
+        Args:
+            top_n: Quantidade de processos publicados em cada ranking
+            orcamento: Máximo de processos relidos por tick além do topo
+            limite_novos: Máximo de PIDs novos abertos por tick
+        """
+        self.top_n = top_n
+        self.orcamento = orcamento
+        self.limite_novos = limite_novos
+        self._cache: Dict[int, _EntradaProcesso] = {}
+        self._fila = deque()
+        self._novos = deque()
+        self._pendentes: set = set()
+
+    def coletar(self) -> Dict[str, Any]:
+        """
+        Atualiza o cache e publica os rankings de CPU, memória e I/O
+
+        Returns:
+            Dicionário com o total de processos e os rankings
+        """
+        total = self._sincronizar_pids()
+
+        atualizados = set()
+        for _ in range(min(self.orcamento, len(self._fila))):
+            pid = self._fila.popleft()
+            if pid not in self._cache:
+                continue
+            self._fila.append(pid)
+            if self._atualizar(pid):
+                atualizados.add(pid)
+
+        # Candidatos ao topo pelos valores em cache são relidos antes do ranking
+        chaves = (lambda e: e.cpu_percent, lambda e: e.rss, lambda e: e.io_bytes_s)
+        candidatos = set()
+        for chave in chaves:
+            candidatos.update(pid for pid, _ in heapq.nlargest(self.top_n * 2, self._cache.items(),
+                                                               key=lambda item: chave(item[1])))
+        for pid in candidatos - atualizados:
+            self._atualizar(pid)
+
+        entradas = list(self._cache.items())
+        top_cpu, top_memoria, top_io = (self._ranking(entradas, chave) for chave in chaves)
+
+        return {
+            'total_processos': total,
+            'top_processos_cpu': top_cpu,
+            'top_processos_memoria': top_memoria,
+            'top_processos_io': top_io,
+        }
+
+    def _sincronizar_pids(self) -> int:
+        """Remove PIDs encerrados e abre até `limite_novos` PIDs novos; retorna o total de PIDs"""
+        pids = set(psutil.pids())
+        atuais = self._cache.keys()
+
+        for pid in atuais - pids:
+            del self._cache[pid]
+
+        for pid in pids - atuais - self._pendentes:
+            self._novos.append(pid)
+            self._pendentes.add(pid)
+
+        abertos = 0
+        while self._novos and abertos < self.limite_novos:
+            pid = self._novos.popleft()
+            self._pendentes.discard(pid)
+            if pid not in pids:
+                continue
+            abertos += 1
+            try:
+                processo = psutil.Process(pid)
+                self._cache[pid] = _EntradaProcesso(processo, processo.name())
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            # Novos processos são lidos logo para estabelecer a base dos deltas
+            self._fila.appendleft(pid)
+        return len(pids)
+
+    def _atualizar(self, pid: int) -> bool:
+        entrada = self._cache.get(pid)
+        if entrada is None:
+            return False
+
+        try:
+            with entrada.processo.oneshot():
+                tempos = entrada.processo.cpu_times()
+                entrada.rss = entrada.processo.memory_info().rss
+                try:
+                    io = entrada.processo.io_counters()
+                    io_total = io.read_bytes + io.write_bytes
+                except (psutil.AccessDenied, AttributeError):
+                    io_total = None
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            # PID encerrado ou reutilizado; some do cache no próximo tick
+            del self._cache[pid]
+            return False
+        except psutil.AccessDenied:
+            return False
+
+        agora = time.monotonic()
+        cpu_total = tempos.user + tempos.system
+        decorrido = agora - entrada.ts_anterior
+
+        if entrada.cpu_anterior is not None and decorrido > 0:
+            entrada.cpu_percent = round(max(cpu_total - entrada.cpu_anterior, 0.0) / decorrido * 100, 1)
+            if io_total is not None and entrada.io_anterior is not None:
+                entrada.io_bytes_s = max(io_total - entrada.io_anterior, 0) / decorrido
+
+        entrada.cpu_anterior = cpu_total
+        entrada.io_anterior = io_total
+        entrada.ts_anterior = agora
+        return True
+
+    def _ranking(self, entradas: list, chave) -> List[Dict[str, Any]]:
+        maiores = heapq.nlargest(self.top_n, entradas, key=lambda item: chave(item[1]))
+        return [
+            {
+                'pid': pid,
+                'nome': entrada.nome,
+                'cpu_percent': entrada.cpu_percent,
+                'rss_mb': round(entrada.rss / (1024 ** 2), 1),
+                'io_mb_s': round(entrada.io_bytes_s / (1024 ** 2), 2),
+            }
+            for pid, entrada in maiores
+            if chave(entrada) > 0
+        ]
+
+
+def formatar_processos(processos: List[Dict[str, Any]], campo: str, unidade: str) -> str:
+    """
+    Formata uma lista de processos para uso em alertas e recomendações
+
+    Args:
+        processos: Ranking de processos
+        campo: Campo exibido ao lado de cada processo
+        unidade: Unidade do campo exibido
+
+    Returns:
+        Texto no formato "nome [pid] valor unidade, ..."
+    """
+    return ", ".join(f"{p['nome']} [{p['pid']}] {p[campo]}{unidade}" for p in processos)
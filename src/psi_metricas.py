@@ -0,0 +1,165 @@
+from typing import Dict, Any, List, Optional
+import os
+import select
+import time
+
+
+# Recursos expostos pelo Pressure Stall Information do kernel
+RECURSOS_PSI = ('cpu', 'memory', 'io')
+
+# Gatilhos padrão: tempo de stall (µs) dentro de uma janela (µs). Janelas
+# múltiplas de 2 s permitem registrar o gatilho sem privilégios
+GATILHOS_PADRAO = {
+    'memory': 'some 200000 2000000',
+    'io': 'full 500000 2000000',
+}
+
+
+class ColetorPSI:
+    """
+    Coletor de Pressure Stall Information (/proc/pressure)
+
+    Além das médias avg10/avg60 calculadas pelo kernel, mede a fração do
+    intervalo em que tarefas ficaram realmente paradas, pela diferença do
+    contador total de stall (µs) entre chamadas.
+    """
+
+    def __init__(self, diretorio: str = '/proc/pressure'):
+        """
+        Args:
+            diretorio: Diretório com os arquivos de pressão do kernel
+        """
+        self.diretorio = diretorio
+        self.disponivel = os.path.isdir(diretorio)
+        self._anterior: Optional[tuple] = None
+
+    def coletar(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Lê a pressão atual de CPU, memória e I/O
+
+        Returns:
+            Dicionário por recurso com avg10/avg60 e percentual de stall
+            do intervalo para as linhas "some" e "full"
+        """
+        if not self.disponivel:
+            return {}
+
+        agora = time.monotonic()
+        atual = {recurso: self._ler(recurso) for recurso in RECURSOS_PSI}
+        anterior, self._anterior = self._anterior, (agora, atual)
+
+        pressao = {}
+        for recurso, linhas in atual.items():
+            if linhas is None:
+                continue
+            pressao[recurso] = {}
+            for tipo, valores in linhas.items():
+                pressao[recurso][f'{tipo}_avg10'] = valores['avg10']
+                pressao[recurso][f'{tipo}_avg60'] = valores['avg60']
+                pressao[recurso][f'{tipo}_stall_percent'] = _percentual_stall(anterior, agora, recurso, tipo, valores['total'])
+        return pressao
+
+    def _ler(self, recurso: str) -> Optional[Dict[str, Dict[str, float]]]:
+        try:
+            with open(os.path.join(self.diretorio, recurso)) as arquivo:
+                conteudo = arquivo.read()
+        except OSError:
+            return None
+
+        # Formato: "some avg10=0.00 avg60=0.00 avg300=0.00 total=12345"
+        linhas = {}
+        for linha in conteudo.splitlines():
+            tipo, *campos = linha.split()
+            valores = dict(campo.split('=') for campo in campos)
+            linhas[tipo] = {
+                'avg10': float(valores['avg10']),
+                'avg60': float(valores['avg60']),
+                'total': int(valores['total']),
+            }
+        return linhas
+
+
+def _percentual_stall(anterior: Optional[tuple], agora: float, recurso: str, tipo: str, total: int) -> Optional[float]:
+    if anterior is None:
+        return None
+
+    inicio, linhas_anteriores = anterior
+    base = (linhas_anteriores.get(recurso) or {}).get(tipo)
+    duracao_us = (agora - inicio) * 1_000_000
+    if base is None or duracao_us <= 0:
+        return None
+
+    return round(min(max(total - base['total'], 0) / duracao_us * 100, 100.0), 2)
+
+
+class GatilhoPSI:
+    """
+    Gatilhos de PSI registrados no kernel e aguardados via poll()
+
+    Quando o stall de memória ou I/O ultrapassa o limite configurado, o
+    kernel acorda o poll imediatamente, permitindo que o amostrador faça
+    um tick antecipado em vez de esperar o próximo intervalo.
+    """
+
+    def __init__(self, gatilhos: Optional[Dict[str, str]] = None, diretorio: str = '/proc/pressure'):
+        """
+        Args:
+            gatilhos: Recurso -> definição do gatilho ("some|full <stall µs> <janela µs>")
+            diretorio: Diretório com os arquivos de pressão do kernel
+
+        Raises:
+            OSError: Se o kernel não suportar ou não permitir os gatilhos
+        """
+        self._poll = select.poll()
+        self._fds: Dict[int, str] = {}
+
+        # Pipe interno para acordar o poll ao encerrar
+        self._leitura, self._escrita = os.pipe()
+        os.set_blocking(self._leitura, False)
+        self._poll.register(self._leitura, select.POLLIN)
+
+        try:
+            for recurso, definicao in (gatilhos or GATILHOS_PADRAO).items():
+                fd = os.open(os.path.join(diretorio, recurso), os.O_RDWR | os.O_NONBLOCK)
+                self._fds[fd] = recurso
+                os.write(fd, definicao.encode() + b'\0')
+                self._poll.register(fd, select.POLLPRI)
+        except OSError:
+            self.fechar()
+            raise
+
+    def aguardar(self, timeout: float) -> List[str]:
+        """
+        Aguarda até o timeout ou até algum gatilho disparar
+
+        Args:
+            timeout: Tempo máximo de espera em segundos
+
+        Returns:
+            Lista dos recursos cujo gatilho disparou
+        """
+        disparados = []
+        for fd, evento in self._poll.poll(timeout * 1000):
+            if fd == self._leitura:
+                try:
+                    os.read(self._leitura, 64)
+                except BlockingIOError:
+                    pass
+            elif evento & select.POLLPRI:
+                disparados.append(self._fds[fd])
+        return disparados
+
+    def despertar(self) -> None:
+        """Interrompe uma espera em andamento"""
+        if self._escrita >= 0:
+            os.write(self._escrita, b'\0')
+
+    def fechar(self) -> None:
+        """Remove os gatilhos e fecha os descritores"""
+        for fd in list(self._fds):
+            os.close(fd)
+        self._fds.clear()
+        if self._leitura >= 0:
+            os.close(self._leitura)
+            os.close(self._escrita)
+            self._leitura = self._escrita = -1
@@ -0,0 +1,159 @@
+import psutil
+from typing import Dict, Any, List, Optional
+import os
+import time
+
+
+# Contadores TCP lidos de /proc/net/snmp (Tcp:) e /proc/net/netstat (TcpExt:)
+CONTADORES_TCP = {
+    ('Tcp', 'OutSegs'): 'segmentos_enviados',
+    ('Tcp', 'RetransSegs'): 'retransmissoes',
+    ('TcpExt', 'ListenOverflows'): 'listen_overflows',
+}
+
+# Interfaces ignoradas por não representarem tráfego externo
+INTERFACES_IGNORADAS = ('lo',)
+
+
+class ColetorRede:
+    """
+    Coletor de vazão, erros e retransmissões de rede
+
+    Calcula taxas por interface (bytes, pacotes, erros e descartes por
+    segundo) e as taxas de retransmissão TCP e de estouro da fila de
+    listen a partir da diferença dos contadores entre chamadas. Não faz
+    sleep: é chamado no mesmo tick do amostrador do SO.
+    """
+
+    def __init__(self, intervalo_velocidade: float = 60.0):
+        """
+        Args:
+            intervalo_velocidade: Intervalo de releitura da velocidade de link, em segundos
+        """
+        self.intervalo_velocidade = intervalo_velocidade
+        self._usar_proc = os.path.exists('/proc/net/dev')
+        self._anterior: Optional[tuple] = None
+        self._velocidades: Dict[str, int] = {}
+        self._velocidades_em = 0.0
+
+    def coletar(self) -> Dict[str, Any]:
+        """
+        Registra um novo snapshot e calcula as taxas desde o anterior
+
+        Returns:
+            Dicionário com as interfaces e as taxas TCP
+        """
+        agora = time.monotonic()
+        interfaces = self._ler_interfaces()
+        tcp = _ler_tcp() if self._usar_proc else {}
+        anterior, self._anterior = self._anterior, (agora, interfaces, tcp)
+
+        if agora - self._velocidades_em >= self.intervalo_velocidade:
+            self._velocidades = _ler_velocidades()
+            self._velocidades_em = agora
+
+        if anterior is None:
+            return {}
+
+        inicio, interfaces_anteriores, tcp_anterior = anterior
+        duracao = agora - inicio
+        if duracao <= 0:
+            return {}
+
+        return {
+            'interfaces_rede': self._calcular_interfaces(interfaces_anteriores, interfaces, duracao),
+            **_calcular_tcp(tcp_anterior, tcp, duracao),
+        }
+
+    def _ler_interfaces(self) -> Dict[str, tuple]:
+        interfaces = {}
+        if not self._usar_proc:
+            for nome, io in psutil.net_io_counters(pernic=True).items():
+                if nome not in INTERFACES_IGNORADAS:
+                    interfaces[nome] = (io.bytes_recv, io.packets_recv, io.errin, io.dropin,
+                                        io.bytes_sent, io.packets_sent, io.errout, io.dropout)
+            return interfaces
+
+        with open('/proc/net/dev') as arquivo:
+            # As duas primeiras linhas são cabeçalho
+            for linha in arquivo.readlines()[2:]:
+                nome, _, valores = linha.partition(':')
+                nome = nome.strip()
+                if nome in INTERFACES_IGNORADAS:
+                    continue
+                campos = valores.split()
+                # rx: bytes, pacotes, erros, descartes | tx: bytes, pacotes, erros, descartes
+                interfaces[nome] = (int(campos[0]), int(campos[1]), int(campos[2]), int(campos[3]),
+                                    int(campos[8]), int(campos[9]), int(campos[10]), int(campos[11]))
+        return interfaces
+
+    def _calcular_interfaces(self, base: Dict[str, tuple], atual: Dict[str, tuple], duracao: float) -> List[Dict[str, Any]]:
+        resultado = []
+        for nome, valores in atual.items():
+            anterior = base.get(nome)
+            if anterior is None:
+                continue
+
+            deltas = [v - a for v, a in zip(valores, anterior)]
+            # Contadores zerados (interface recriada) invalidam o intervalo
+            if min(deltas) < 0:
+                continue
+
+            rx_bytes, rx_pacotes, rx_erros, rx_descartes, tx_bytes, tx_pacotes, tx_erros, tx_descartes = deltas
+            velocidade = self._velocidades.get(nome, 0)
+            # Velocidade em Mbit/s; o sentido mais carregado define a ocupação
+            uso = max(rx_bytes, tx_bytes) * 8 / duracao / (velocidade * 1_000_000) * 100 if velocidade else None
+
+            resultado.append({
+                'interface': nome,
+                'rx_mb_s': round(rx_bytes / duracao / (1024 ** 2), 3),
+                'tx_mb_s': round(tx_bytes / duracao / (1024 ** 2), 3),
+                'rx_pacotes_s': round(rx_pacotes / duracao, 1),
+                'tx_pacotes_s': round(tx_pacotes / duracao, 1),
+                'erros_s': round((rx_erros + tx_erros) / duracao, 2),
+                'descartes_s': round((rx_descartes + tx_descartes) / duracao, 2),
+                'velocidade_mbps': velocidade or None,
+                'uso_percent': round(min(uso, 100.0), 1) if uso is not None else None,
+            })
+
+        return sorted(resultado, key=lambda i: i['interface'])
+
+
+def _ler_tcp() -> Dict[str, int]:
+    contadores = {}
+    for caminho in ('/proc/net/snmp', '/proc/net/netstat'):
+        try:
+            with open(caminho) as arquivo:
+                linhas = arquivo.read().splitlines()
+        except OSError:
+            continue
+
+        # Cada protocolo ocupa duas linhas: nomes e valores
+        for nomes, valores in zip(linhas[::2], linhas[1::2]):
+            protocolo, _, nomes = nomes.partition(':')
+            for nome, valor in zip(nomes.split(), valores.partition(':')[2].split()):
+                chave = CONTADORES_TCP.get((protocolo, nome))
+                if chave is not None:
+                    contadores[chave] = int(valor)
+    return contadores
+
+
+def _calcular_tcp(base: Dict[str, int], atual: Dict[str, int], duracao: float) -> Dict[str, Any]:
+    deltas = {chave: atual[chave] - base[chave] for chave in atual if chave in base}
+    if not deltas or min(deltas.values()) < 0:
+        return {}
+
+    enviados = deltas.get('segmentos_enviados', 0)
+    retransmissoes = deltas.get('retransmissoes', 0)
+    return {
+        'tcp_retransmissoes_s': round(retransmissoes / duracao, 2),
+        'tcp_retransmissao_percent': round(retransmissoes / enviados * 100, 2) if enviados else 0.0,
+        'tcp_listen_overflows_s': round(deltas.get('listen_overflows', 0) / duracao, 2),
+    }
+
+
+def _ler_velocidades() -> Dict[str, int]:
+    try:
+        return {nome: stats.speed for nome, stats in psutil.net_if_stats().items() if stats.speed > 0}
+    except Exception:
+        return {}
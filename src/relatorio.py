@@ -1,8 +1,13 @@
 import psutil
 from datetime import datetime
-from typing import Dict, Any
+from html import escape
+from typing import Dict, Any, Optional
 
+from src.db_servidores import por_servidor
+from src.instrumentacao import instrumentar
 
+
+@instrumentar('formatar_relatorio')
 def formatar_relatorio(analise: Dict[str, Any]) -> str:
     try:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -28,37 +33,140 @@ def formatar_relatorio(analise: Dict[str, Any]) -> str:
         relatorio_texto += f"Memória RAM:              {dados_so.get('uso_memoria', 0):.2f}%\n"
         relatorio_texto += f"Memória em Uso (GB):      {dados_so.get('memoria_usada_gb', 0):.2f} / {dados_so.get('memoria_total_gb', 0):.2f} GB\n"
         relatorio_texto += f"Memória de Troca (Swap):  {dados_so.get('uso_swap', 0):.2f}%\n"
-        relatorio_texto += f"Disco:                    {dados_so.get('uso_disco', 0):.2f}%\n"
-        relatorio_texto += f"Disco em Uso (GB):        {dados_so.get('disco_usado_gb', 0):.2f} / {dados_so.get('disco_total_gb', 0):.2f} GB\n"
-        relatorio_texto += f"Latência do Disco (ms):   {dados_so.get('latencia_disco_ms', 0):.2f}\n"
-        relatorio_texto += f"CPU Cores:                {dados_so.get('cpu_cores', 'N/A')}\n\n"
-
+        if _coleta_pendente(dados_so, 'sistemas_arquivos'):
+            relatorio_texto += "Disco:                    coleta em andamento\n"
+        else:
+            relatorio_texto += f"Disco:                    {dados_so.get('uso_disco', 0):.2f}%\n"
+            relatorio_texto += f"Disco em Uso (GB):        {dados_so.get('disco_usado_gb', 0):.2f} / {dados_so.get('disco_total_gb', 0):.2f} GB\n"
+        relatorio_texto += f"Latência do Disco (ms):   {_formatar_latencia_disco(dados_so)}\n"
+        relatorio_texto += f"CPU Cores:                {dados_so.get('cpu_cores', 'N/A')}\n"
+        relatorio_texto += f"CPU por Modo (%):         user {dados_so.get('cpu_user', 0):.1f} | system {dados_so.get('cpu_system', 0):.1f} | iowait {dados_so.get('cpu_iowait', 0):.1f} | steal {dados_so.get('cpu_steal', 0):.1f} | irq {dados_so.get('cpu_irq', 0):.1f} | softirq {dados_so.get('cpu_softirq', 0):.1f}\n"
+        relatorio_texto += f"Núcleo Mais Ocupado:      cpu{dados_so.get('nucleo_mais_quente', '-')} ({dados_so.get('uso_nucleo_max', 0):.1f}%)\n\n"
+
+        # Limites do container (cgroup v2)
+        cgroup = dados_so.get('cgroup', {})
+        if cgroup:
+            relatorio_texto += "-" * 80 + "\n"
+            relatorio_texto += f"CONTAINER (CGROUP V2: {cgroup.get('caminho')})\n"
+            relatorio_texto += "-" * 80 + "\n"
+            relatorio_texto += (f"CPU:     {_valor_ou_na(cgroup.get('cpus_usadas'))} de {_valor_ou_na(cgroup.get('limite_cpus') or 'sem limite')} CPUs "
+                                f"({_percentual_ou_na(cgroup.get('uso_cpu_percent'))}) | "
+                                f"Estrangulado em {_percentual_ou_na(cgroup.get('periodos_estrangulados_percent'))} dos períodos "
+                                f"({_valor_ou_na(cgroup.get('estrangulado_ms_s'))} ms/s)\n")
+            relatorio_texto += (f"Memória: {_valor_ou_na(cgroup.get('memoria_working_set_mb'))} MB em uso "
+                                f"({_valor_ou_na(cgroup.get('memoria_atual_mb'))} MB com cache) de {_valor_ou_na(cgroup.get('memoria_limite_mb') or 'sem limite')} MB "
+                                f"({_percentual_ou_na(cgroup.get('uso_memoria_percent'))}) | OOM kills {cgroup.get('oom_kill_total', 0)}\n")
+            relatorio_texto += (f"I/O:     {_valor_ou_na(cgroup.get('io_leitura_mb_s'))} MB/s lidos, {_valor_ou_na(cgroup.get('io_escrita_mb_s'))} MB/s escritos | "
+                                f"IOPS {_valor_ou_na(cgroup.get('io_iops'))}\n\n")
+
+        # Sistemas de arquivos por ponto de montagem
+        sistemas_arquivos = dados_so.get('sistemas_arquivos', [])
+        if sistemas_arquivos:
+            relatorio_texto += "-" * 80 + "\n"
+            relatorio_texto += "SISTEMAS DE ARQUIVOS\n"
+            relatorio_texto += "-" * 80 + "\n"
+            for sistema in sistemas_arquivos:
+                relatorio_texto += (f"{sistema.get('ponto')} ({sistema.get('tipo')}, {sistema.get('dispositivo')}): "
+                                    f"{sistema.get('uso_percent', 0):.1f}% | {sistema.get('usado_gb', 0):.2f} / {sistema.get('total_gb', 0):.2f} GB | "
+                                    f"Inodes {sistema.get('uso_inodes_percent', 0):.1f}%\n")
+            relatorio_texto += "\n"
+
+        # Discos por dispositivo
+        discos = dados_so.get('discos', [])
+        if discos:
+            relatorio_texto += "-" * 80 + "\n"
+            relatorio_texto += "DISCOS POR DISPOSITIVO\n"
+            relatorio_texto += "-" * 80 + "\n"
+            for disco in discos:
+                if disco.get('sem_dados'):
+                    relatorio_texto += f"{disco.get('dispositivo')}: sem I/O na janela | Em andamento: {disco.get('em_andamento', 0)}\n"
+                    continue
+                relatorio_texto += (f"{disco.get('dispositivo')}: Latência {disco.get('latencia_ms')} ms "
+                                    f"(leitura {_valor_ou_na(disco.get('latencia_leitura_ms'))} / escrita {_valor_ou_na(disco.get('latencia_escrita_ms'))}) | "
+                                    f"IOPS {disco.get('iops', 0)} | "
+                                    f"{disco.get('leitura_mb_s', 0)} MB/s lidos, {disco.get('escrita_mb_s', 0)} MB/s escritos | "
+                                    f"Fila {disco.get('fila_media', 0)} | Utilização {disco.get('utilizacao', 0)}%\n")
+            relatorio_texto += "\n"
+
+        # Pressão (PSI)
+        pressao = dados_so.get('pressao', {})
+        if pressao:
+            relatorio_texto += "-" * 80 + "\n"
+            relatorio_texto += "PRESSÃO DE RECURSOS (PSI - % DO TEMPO COM TAREFAS PARADAS)\n"
+            relatorio_texto += "-" * 80 + "\n"
+            for recurso, valores in pressao.items():
+                relatorio_texto += (f"{recurso:<8}: some avg10 {valores.get('some_avg10', 0):.2f} / avg60 {valores.get('some_avg60', 0):.2f} "
+                                    f"(intervalo {_percentual_ou_na(valores.get('some_stall_percent'))}) | "
+                                    f"full avg10 {valores.get('full_avg10', 0):.2f} / avg60 {valores.get('full_avg60', 0):.2f} "
+                                    f"(intervalo {_percentual_ou_na(valores.get('full_stall_percent'))})\n")
+            relatorio_texto += "\n"
+
+        # Rede
+        interfaces_rede = dados_so.get('interfaces_rede', [])
+        if interfaces_rede or 'tcp_retransmissao_percent' in dados_so:
+            relatorio_texto += "-" * 80 + "\n"
+            relatorio_texto += "REDE\n"
+            relatorio_texto += "-" * 80 + "\n"
+            for interface in interfaces_rede:
+                relatorio_texto += (f"{interface.get('interface')}: RX {interface.get('rx_mb_s', 0)} MB/s ({interface.get('rx_pacotes_s', 0)} pct/s) | "
+                                    f"TX {interface.get('tx_mb_s', 0)} MB/s ({interface.get('tx_pacotes_s', 0)} pct/s) | "
+                                    f"Uso {_percentual_ou_na(interface.get('uso_percent'))} | "
+                                    f"Erros {interface.get('erros_s', 0)}/s | Descartes {interface.get('descartes_s', 0)}/s\n")
+            relatorio_texto += (f"TCP: Retransmissões {dados_so.get('tcp_retransmissoes_s', 0)}/s ({dados_so.get('tcp_retransmissao_percent', 0)}%) | "
+                                f"Listen overflows {dados_so.get('tcp_listen_overflows_s', 0)}/s\n\n")
+
+        # Processos com maior consumo
         relatorio_texto += "-" * 80 + "\n"
-        relatorio_texto += "MÉTRICAS DO BANCO DE DADOS\n"
+        relatorio_texto += f"PROCESSOS COM MAIOR CONSUMO ({dados_so.get('total_processos', 0)} em execução)\n"
         relatorio_texto += "-" * 80 + "\n"
+        for titulo, chave in (('CPU', 'top_processos_cpu'), ('Memória', 'top_processos_memoria'), ('I/O', 'top_processos_io')):
+            if _coleta_pendente(dados_so, 'processos'):
+                relatorio_texto += "Coleta em andamento\n"
+                break
+            relatorio_texto += f"{titulo}:\n"
+            processos = dados_so.get(chave, [])
+            if not processos:
+                relatorio_texto += "   Nenhum processo com consumo mensurável\n"
+            for processo in processos:
+                relatorio_texto += (f"   {processo.get('nome')} [{processo.get('pid')}] | CPU {processo.get('cpu_percent', 0)}% | "
+                                    f"RSS {processo.get('rss_mb', 0)} MB | I/O {processo.get('io_mb_s', 0)} MB/s\n")
+        relatorio_texto += "\n"
+
+        # Custo do próprio monitor
+        monitor = dados_so.get('monitor', {})
+        if monitor:
+            relatorio_texto += "-" * 80 + "\n"
+            relatorio_texto += "CUSTO DO PRÓPRIO MONITOR\n"
+            relatorio_texto += "-" * 80 + "\n"
+            relatorio_texto += (f"Processo: CPU {_percentual_ou_na(monitor.get('cpu_percent'))} | RSS {monitor.get('rss_mb', 0)} MB | "
+                                f"Threads {monitor.get('threads', 0)} | Orçamento {_percentual_ou_na(monitor.get('orcamento_cpu_percent'))} | "
+                                f"Recuo {monitor.get('fator_recuo', 1)}x\n")
+            for nome, etapa in monitor.get('etapas', {}).items():
+                relatorio_texto += (f"{nome}: {etapa.get('chamadas', 0)} chamadas | parede {etapa.get('ultimo_ms', 0)} ms (média {etapa.get('medio_ms', 0)}) | "
+                                    f"CPU {etapa.get('ultimo_cpu_ms', 0)} ms (média {etapa.get('medio_cpu_ms', 0)}) | "
+                                    f"syscalls {_valor_ou_na(etapa.get('ultimo_syscalls'))} | alocado no processo {_valor_ou_na(etapa.get('alocado_processo_kb'))} KB "
+                                    f"(pico {_valor_ou_na(etapa.get('pico_alocado_processo_kb'))} KB)\n")
+            for coletor in monitor.get('coletores', []):
+                relatorio_texto += (f"coletor {coletor.get('nome')}: {coletor.get('ultimo_custo_ms', 0)} ms a cada {coletor.get('intervalo_efetivo', 0)} s | "
+                                    f"{coletor.get('execucoes', 0)} execuções, {coletor.get('falhas', 0)} falhas\n")
+            relatorio_texto += "\n"
+
         dados_db = analise.get('dados_db', {})
-        relatorio_texto += f"Status:                   {dados_db.get('status', '--')}\n"
-        relatorio_texto += f"Versão:                   {dados_db.get('versao', '--')}\n"
-        relatorio_texto += f"Conexões Ativas:          {dados_db.get('conexoes_ativas', 0)}\n"
-        relatorio_texto += f"Tempo de Resposta (ms):   {dados_db.get('tempo_resposta', 0)}\n"
-        relatorio_texto += f"Uptime:                   {_formatar_uptime(dados_db.get('uptime', 0))}\n"
-        relatorio_texto += f"Tabelas:                  {dados_db.get('tabelas', 0)}\n"
-        relatorio_texto += f"Tamanho do Banco:         {dados_db.get('tamanho_db', '0 MB')}\n\n"
-
-        # Consultas Lentas
-        queries_lentas = dados_db.get('queries_lentas', [])
-        relatorio_texto += "-" * 80 + "\n"
-        relatorio_texto += "CONSULTAS LENTAS DETECTADAS\n"
-        relatorio_texto += "-" * 80 + "\n"
-        if queries_lentas:
-            for idx, query in enumerate(queries_lentas, 1):
-                if isinstance(query, dict):
-                    relatorio_texto += f"\n{idx}. Tempo: {query.get('tempo_segundos', 0)}s | Usuário: {query.get('usuario', 'N/A')}\n"
-                    relatorio_texto += f"   Banco: {query.get('banco', 'N/A')} | Comando: {query.get('comando', 'N/A')}\n"
-                    relatorio_texto += f"   Estado: {query.get('estado', 'N/A')}\n"
-                    relatorio_texto += f"   Query: {query.get('query', 'N/A')}\n"
-        else:
-            relatorio_texto += "Nenhuma query lenta detectada\n\n"
+        servidores = por_servidor(dados_db)
+        if not servidores or len(servidores) > 1 or servidores[0][0] is not None:
+            relatorio_texto += "-" * 80 + "\n"
+            relatorio_texto += f"SERVIDORES DE BANCO DE DADOS (COLETA EM {_valor_ou_na(dados_db.get('duracao_coleta_ms'))} ms)\n"
+            relatorio_texto += "-" * 80 + "\n"
+            if not servidores:
+                # Todos os servidores removidos antes da coleta
+                relatorio_texto += "Nenhum servidor monitorado\n"
+            for nome, dados_servidor in servidores:
+                relatorio_texto += (f"{nome:<30} {dados_servidor.get('status', '--'):<13} p95 {_valor_ou_na((dados_servidor.get('latencia') or {}).get('p95_ms'))} ms | "
+                                    f"QPS {_valor_ou_na((dados_servidor.get('taxas') or {}).get('qps'))} | atraso {_atraso_replicacao(dados_servidor)} | "
+                                    f"{dados_servidor.get('conexoes_ativas', 0)} conexões | coleta {_valor_ou_na(dados_servidor.get('duracao_coleta_ms'))} ms\n")
+            relatorio_texto += "\n"
+        for nome, dados_servidor in servidores:
+            relatorio_texto += _secao_banco_texto(dados_servidor, nome)
 
         relatorio_texto += "\n" + "-" * 80 + "\n"
         relatorio_texto += "ALERTAS DETECTADOS\n"
@@ -84,6 +192,7 @@ def formatar_relatorio(analise: Dict[str, Any]) -> str:
         raise Exception(f"Erro ao formatar relatório: {str(e)}")
 
 
+@instrumentar('formatar_relatorio_html')
 def formatar_relatorio_html(analise: Dict[str, Any]) -> str:
     """
     Gera um relatório em formato HTML com estilo
@@ -338,69 +447,75 @@ def formatar_relatorio_html(analise: Dict[str, Any]) -> str:
 
                     <div class="metric-card">
                         <h3>Latência do Disco</h3>
-                        <div class="metric-value">{dados_so.get('latencia_disco_ms', 0):.2f} ms</div>
+                        <div class="metric-value">{_formatar_latencia_disco(dados_so)}</div>
                     </div>
 
                     <div class="metric-card">
                         <h3>CPU Cores</h3>
                         <div class="metric-value">{dados_so.get('cpu_cores', 'N/A')}</div>
                     </div>
-                </div>
-            </div>
 
-            <!-- Métricas BD -->
-            <div class="section">
-                <h2>🗄️ Métricas do Banco de Dados</h2>
-                <div class="metrics-grid">
                     <div class="metric-card">
-                        <h3>Status</h3>
-                        <div class="metric-value" style="font-size: 18px;">{dados_db.get('status', '--')}</div>
+                        <h3>Núcleo Mais Ocupado</h3>
+                        <div class="metric-value">cpu{dados_so.get('nucleo_mais_quente', '-')}: {dados_so.get('uso_nucleo_max', 0):.1f}%</div>
+                        <p style="font-size: 12px; margin-top: 5px;">iowait {dados_so.get('cpu_iowait', 0):.1f}% | steal {dados_so.get('cpu_steal', 0):.1f}% | softirq {dados_so.get('cpu_softirq', 0):.1f}%</p>
                     </div>
+                </div>
+            </div>
 
-                    <div class="metric-card">
-                        <h3>Versão</h3>
-                        <div class="metric-value" style="font-size: 18px;">{dados_db.get('versao', '--')}</div>
-                    </div>
+            <!-- Container (cgroup v2) -->
+            {_gerar_secao_cgroup_html(dados_so.get('cgroup', {}))}
 
-                    <div class="metric-card">
-                        <h3>Conexões Ativas</h3>
-                        <div class="metric-value">{dados_db.get('conexoes_ativas', 0)}</div>
-                    </div>
+            <!-- Sistemas de arquivos -->
+            <div class="section">
+                <h2>📁 Sistemas de Arquivos</h2>
+                {_gerar_tabela_sistemas_arquivos_html(dados_so.get('sistemas_arquivos', []), _coleta_pendente(dados_so, 'sistemas_arquivos'))}
+            </div>
 
-                    <div class="metric-card">
-                        <h3>Tempo de Resposta</h3>
-                        <div class="metric-value">{dados_db.get('tempo_resposta', 0)} ms</div>
-                    </div>
+            <!-- Discos por dispositivo -->
+            <div class="section">
+                <h2>💽 Discos por Dispositivo</h2>
+                {_gerar_tabela_discos_html(dados_so.get('discos', []))}
+            </div>
 
-                    <div class="metric-card">
-                        <h3>Tabelas</h3>
-                        <div class="metric-value">{dados_db.get('tabelas', 0)}</div>
-                    </div>
+            <!-- Pressão (PSI) -->
+            <div class="section">
+                <h2>⏱️ Pressão de Recursos (PSI)</h2>
+                {_gerar_tabela_pressao_html(dados_so.get('pressao', {}))}
+            </div>
 
-                    <div class="metric-card">
-                        <h3>Tamanho</h3>
-                        <div class="metric-value" style="font-size: 18px;">{dados_db.get('tamanho_db', '0 MB')}</div>
-                    </div>
-                </div>
+            <!-- Rede -->
+            <div class="section">
+                <h2>🌐 Rede</h2>
+                {_gerar_tabela_rede_html(dados_so)}
             </div>
 
-            <!-- Queries Lentas -->
+            <!-- Processos -->
             <div class="section">
-                <h2>⚠️ Consultas Lentas Detectadas</h2>
-                {_gerar_tabela_queries_html(dados_db.get('queries_lentas', []))}
+                <h2>⚙️ Processos com Maior Consumo ({dados_so.get('total_processos', 0)} em execução)</h2>
+                {_gerar_tabela_processos_html(dados_so)}
             </div>
 
+            <!-- Custo do próprio monitor -->
+            <div class="section">
+                <h2>🩺 Custo do Próprio Monitor</h2>
+                {_gerar_tabela_monitor_html(dados_so.get('monitor', {}))}
+            </div>
+
+            {_gerar_tabela_servidores_html(dados_db)}
+            {''.join(_secao_banco_html(dados_servidor, nome) for nome, dados_servidor in por_servidor(dados_db))}
+
             <!-- Alertas -->
             <div class="section">
                 <h2>🔔 Alertas</h2>
-                {''.join([f'<div class="alert-item{"critico" if "🔴" in alert else ""}">{alert}</div>'
+                {''.join([f'<div class="alert-item{"critico" if "🔴" in alert else ""}">{escape(alert)}</div>'
                          for alert in analise.get('alertas', [])])}
             </div>
 
             <!-- Recomendações -->
             <div class="section">
                 <h2>💡 Recomendações</h2>
-                {''.join([f'<div class="recommendation-item">✓ {rec}</div>'
+                {''.join([f'<div class="recommendation-item">✓ {escape(rec)}</div>'
                          for rec in analise.get('recomendacoes', [])])}
             </div>
         </div>
@@ -418,30 +533,701 @@ def formatar_relatorio_html(analise: Dict[str, Any]) -> str:
         raise Exception(f"Erro ao formatar relatório HTML: {str(e)}")
 
 
-def _gerar_tabela_queries_html(queries_lentas: list) -> str:
-    """Gera tabela HTML com queries lentas"""
-    if not queries_lentas:
+def _secao_banco_texto(dados_db: Dict[str, Any], nome: Optional[str] = None) -> str:
+    """Seções de texto com as métricas de um servidor de banco de dados"""
+    sufixo = f" - {nome}" if nome else ""
+    texto = ""
+    texto += "-" * 80 + "\n"
+    texto += f"MÉTRICAS DO BANCO DE DADOS{sufixo}\n"
+    texto += "-" * 80 + "\n"
+    texto += f"Status:                   {dados_db.get('status', '--')}\n"
+    if dados_db.get('erro'):
+        texto += f"Erro:                     {dados_db['erro']}\n"
+    texto += f"Versão:                   {dados_db.get('versao', '--')}\n"
+    texto += f"Conexões Ativas:          {dados_db.get('conexoes_ativas', 0)}\n"
+    texto += f"Tempo de Resposta (ms):   {_formatar_latencia_db(dados_db)}\n"
+    texto += f"Uptime:                   {_formatar_uptime(dados_db.get('uptime', 0))}\n"
+    texto += f"Tabelas:                  {dados_db.get('tabelas', 0)}\n"
+    texto += f"Tamanho do Banco:         {dados_db.get('tamanho_db', '0 MB')}\n"
+    texto += f"Idade (tabelas/tamanho):  {_formatar_idade_cache(dados_db.get('idade_cache_tabelas_s'))}\n\n"
+
+    # Throughput do servidor
+    taxas = dados_db.get('taxas', {})
+    if taxas:
+        texto += "-" * 80 + "\n"
+        texto += f"THROUGHPUT DO BANCO{sufixo} (ÚLTIMOS {taxas.get('intervalo_s', 0)}s)\n"
+        texto += "-" * 80 + "\n"
+        texto += (f"QPS {taxas.get('qps', 0)} | TPS {taxas.get('tps', 0)} | SELECT {taxas.get('selects_s', 0)}/s | INSERT {taxas.get('inserts_s', 0)}/s | "
+                  f"UPDATE {taxas.get('updates_s', 0)}/s | DELETE {taxas.get('deletes_s', 0)}/s\n")
+        texto += (f"Linhas InnoDB/s: lidas {taxas.get('linhas_lidas_s', 0)} | inseridas {taxas.get('linhas_inseridas_s', 0)} | "
+                  f"atualizadas {taxas.get('linhas_atualizadas_s', 0)} | removidas {taxas.get('linhas_removidas_s', 0)}\n")
+        texto += (f"Leituras sequenciais {taxas.get('leituras_sequenciais_s', 0)}/s (média {taxas.get('leituras_sequenciais_media_s', 0)}) | "
+                  f"Varreduras {taxas.get('varreduras_completas_s', 0)}/s | Joins sem índice {taxas.get('joins_sem_indice_s', 0)}/s\n")
+        texto += (f"Tabelas temporárias {taxas.get('tmp_tabelas_s', 0)}/s ({taxas.get('tmp_disco_percent', 0)}% em disco) | "
+                  f"Rede {taxas.get('rede_recebida_kb_s', 0)} KB/s recebidos, {taxas.get('rede_enviada_kb_s', 0)} KB/s enviados\n\n")
+
+    # InnoDB
+    innodb = dados_db.get('innodb', {})
+    if innodb:
+        texto += "-" * 80 + "\n"
+        texto += f"INNODB{sufixo}\n"
+        texto += "-" * 80 + "\n"
+        texto += (f"Buffer pool: {_valor_ou_na(innodb.get('buffer_pool_mb'))} MB | acerto {_percentual_ou_na(innodb.get('buffer_pool_acerto_percent'))} | "
+                  f"{_valor_ou_na(innodb.get('leituras_disco_s'))} leituras de disco/s | sujas {_percentual_ou_na(innodb.get('paginas_sujas_percent'))} | "
+                  f"livres {_percentual_ou_na(innodb.get('paginas_livres_percent'))}\n")
+        texto += (f"I/O pendente: {innodb.get('leituras_pendentes', 0)} leituras, {innodb.get('escritas_pendentes', 0)} escritas | "
+                  f"Esperas por página livre: {_valor_ou_na(innodb.get('espera_pagina_livre_s'))}/s\n")
+        texto += (f"Locks de linha: {innodb.get('esperas_lock_atuais', 0)} esperando agora | {_valor_ou_na(innodb.get('esperas_lock_s'))} esperas/s | "
+                  f"média {_valor_ou_na(innodb.get('espera_lock_media_ms'))} ms\n")
+        texto += (f"Checkpoint: {_valor_ou_na(innodb.get('checkpoint_idade_mb'))} MB de {_valor_ou_na(innodb.get('redo_capacidade_mb'))} MB do redo "
+                  f"({_percentual_ou_na(innodb.get('checkpoint_idade_percent'))}) | History list: {_valor_ou_na(innodb.get('historico_undo'))}\n")
+        for bloqueio in innodb.get('bloqueios', []):
+            texto += (f"   Thread {bloqueio['thread_bloqueadora']} bloqueia {bloqueio['thread_bloqueada']} há {bloqueio['espera_s']}s em "
+                      f"{bloqueio['tabela']} ({bloqueio['indice']}, {bloqueio['modo']})\n")
+            texto += f"      Bloqueadora: {bloqueio['query_bloqueadora']}\n"
+            texto += f"      Bloqueada:   {bloqueio['query_bloqueada']}\n"
+        texto += "\n"
+
+    # Replicação
+    canais = (dados_db.get('replicacao') or {}).get('canais', [])
+    if canais:
+        texto += "-" * 80 + "\n"
+        texto += f"REPLICAÇÃO{sufixo}\n"
+        texto += "-" * 80 + "\n"
+        for canal in canais:
+            texto += (f"Canal {canal['canal']} <- {canal.get('origem')} | atraso {_valor_ou_na(canal.get('atraso_s'))}s | "
+                      f"tendência {canal.get('tendencia') or 'N/A'} ({_valor_ou_na(canal.get('variacao_atraso_s_min'))} s/min) | "
+                      f"IO {canal.get('io_thread')} / SQL {canal.get('sql_thread')} | relay log {canal.get('relay_log_mb', 0)} MB "
+                      f"({_valor_ou_na(canal.get('relay_log_variacao_mb_min'))} MB/min)\n")
+            if canal.get('previsao_alcance_s'):
+                texto += f"   Previsão para alcançar o primário: {canal['previsao_alcance_s']}s\n"
+            for rotulo, erro in (('Erro IO', canal.get('erro_io')), ('Erro SQL', canal.get('erro_sql'))):
+                if erro:
+                    texto += f"   {rotulo}: {erro}\n"
+        texto += "\n"
+
+    # I/O por tabela e índice
+    indices = dados_db.get('indices') or {}
+    if indices.get('tabelas_quentes') or indices.get('varreduras_sem_indice') or indices.get('indices_nao_usados'):
+        texto += "-" * 80 + "\n"
+        texto += f"TABELAS E ÍNDICES (I/O){sufixo}\n"
+        texto += "-" * 80 + "\n"
+        texto += f"Janela: {_valor_ou_na(indices.get('janela_s'))}s | análise de {_valor_ou_na(indices.get('idade_cache_s'))}s atrás\n"
+        for quente in indices.get('tabelas_quentes', []):
+            texto += (f"Quente: {quente['tabela']} | {quente['percentual_latencia']}% da latência | "
+                      f"{quente['leituras']} leituras ({quente['latencia_leitura_ms']} ms) | "
+                      f"{quente['escritas']} escritas ({quente['latencia_escrita_ms']} ms)\n")
+        for varredura in indices.get('varreduras_sem_indice', []):
+            texto += (f"Sem índice: {varredura['tabela']} | {varredura['linhas_lidas']} linhas lidas ({varredura['latencia_ms']} ms, "
+                      f"{varredura['percentual_leituras']}% das leituras)\n")
+        for indice in indices.get('indices_nao_usados', []):
+            texto += (f"Nunca usado: {indice['tabela']}.{indice['indice']} | {indice['escritas_tabela']} escritas na tabela "
+                      f"({indice['latencia_escrita_tabela_ms']} ms)\n")
+        texto += "\n"
+
+    # Instruções por tempo total (digests do performance_schema)
+    top_digests = dados_db.get('top_digests', [])
+    if top_digests:
+        texto += "-" * 80 + "\n"
+        texto += f"INSTRUÇÕES POR TEMPO TOTAL NO BANCO{sufixo} (ÚLTIMOS {dados_db.get('janela_digests_s', 0):.0f}s, {dados_db.get('tempo_total_db_ms', 0)} ms)\n"
+        texto += "-" * 80 + "\n"
+        for idx, digest in enumerate(top_digests, 1):
+            texto += (f"{idx}. {digest.get('percentual_tempo', 0)}% do tempo | {digest.get('chamadas', 0)} chamadas ({_valor_ou_na(digest.get('chamadas_s'))}/s) | "
+                      f"média {digest.get('latencia_media_ms', 0)} ms | total {digest.get('tempo_total_ms', 0)} ms\n")
+            texto += (f"   Linhas examinadas/enviadas: {digest.get('linhas_examinadas', 0)}/{digest.get('linhas_enviadas', 0)} "
+                      f"(razão {_valor_ou_na(digest.get('examinadas_por_enviada'))}) | Tmp em disco: {digest.get('tmp_disco', 0)} | "
+                      f"Sem índice: {digest.get('sem_indice', 0)} | Banco: {digest.get('schema', 'N/A')}\n")
+            texto += f"   {digest.get('texto', '')}\n"
+        texto += "\n"
+
+    # Instruções longas concluídas
+    instrucoes = dados_db.get('instrucoes_longas', {})
+    if instrucoes.get('concluidas'):
+        texto += "-" * 80 + "\n"
+        texto += (f"INSTRUÇÕES LONGAS CONCLUÍDAS{sufixo} (>= {instrucoes.get('limite_s')}s, "
+                  f"amostras a cada {instrucoes.get('intervalo_amostragem_s')}s)\n")
+        texto += "-" * 80 + "\n"
+        for idx, ofensor in enumerate(instrucoes.get('ofensores', []), 1):
+            texto += (f"{idx}. {ofensor['ocorrencias']}x | média {ofensor['duracao_media_s']}s | máx {ofensor['duracao_maxima_s']}s | "
+                      f"total {ofensor['tempo_total_s']}s | Banco: {ofensor['banco']}\n")
+            texto += f"   {ofensor['query']}\n"
+        texto += "Mais recentes:\n"
+        for evento in instrucoes['concluidas'][:5]:
+            texto += (f"   {datetime.fromtimestamp(evento['inicio']).strftime('%H:%M:%S')} | {evento['duracao_s']}-{evento['duracao_maxima_s']}s | "
+                      f"conexão {evento['id']} ({evento['usuario']}) | {evento['query'][:60]}\n")
+        texto += "\n"
+
+    # Consultas Lentas, agrupadas por fingerprint
+    grupos = dados_db.get('queries_lentas_agrupadas', [])
+    texto += "-" * 80 + "\n"
+    texto += f"CONSULTAS LENTAS DETECTADAS{sufixo}\n"
+    texto += "-" * 80 + "\n"
+    if grupos:
+        for idx, grupo in enumerate(grupos, 1):
+            texto += (f"\n{idx}. {grupo['ocorrencias']} ocorrência(s) | Tempo total: {grupo['tempo_total_s']}s | Máximo: {grupo['tempo_maximo_s']}s\n")
+            texto += f"   Usuários: {', '.join(grupo['usuarios']) or 'N/A'} | Bancos: {', '.join(map(str, grupo['bancos'])) or 'N/A'}\n"
+            texto += f"   Padrão ({grupo['fingerprint']}): {grupo['consulta_normalizada']}\n"
+            texto += f"   Exemplo: {grupo.get('exemplo') or 'N/A'}\n"
+            if grupo.get('plano'):
+                texto += f"   Plano: {_resumo_plano(grupo['plano'])}\n"
+        texto += "\n"
+    else:
+        texto += "Nenhuma query lenta detectada\n\n"
+    return texto
+
+
+def _secao_banco_html(dados_db: Dict[str, Any], nome: Optional[str] = None) -> str:
+    """Seções HTML com as métricas de um servidor de banco de dados"""
+    sufixo = f" - {escape(nome)}" if nome else ""
+    return f"""
+    <!-- Métricas BD -->
+    <div class="section">
+        <h2>🗄️ Métricas do Banco de Dados{sufixo}</h2>
+        <div class="metrics-grid">
+            <div class="metric-card">
+                <h3>Status</h3>
+                <div class="metric-value" style="font-size: 18px;">{dados_db.get('status', '--')}</div>
+                <div style="font-size: 11px; color: #666;">{escape(dados_db.get('erro') or '')}</div>
+            </div>
+
+            <div class="metric-card">
+                <h3>Versão</h3>
+                <div class="metric-value" style="font-size: 18px;">{dados_db.get('versao', '--')}</div>
+            </div>
+
+            <div class="metric-card">
+                <h3>Conexões Ativas</h3>
+                <div class="metric-value">{dados_db.get('conexoes_ativas', 0)}</div>
+            </div>
+
+            <div class="metric-card">
+                <h3>Tempo de Resposta</h3>
+                <div class="metric-value">{dados_db.get('tempo_resposta', 0)} ms</div>
+                <div style="font-size: 11px; color: #666;">{_formatar_latencia_db(dados_db)}</div>
+            </div>
+
+            <div class="metric-card">
+                <h3>Tabelas</h3>
+                <div class="metric-value">{dados_db.get('tabelas', 0)}</div>
+            </div>
+
+            <div class="metric-card">
+                <h3>Tamanho</h3>
+                <div class="metric-value" style="font-size: 18px;">{dados_db.get('tamanho_db', '0 MB')}</div>
+                <div style="font-size: 11px; color: #666;">Atualizado {_formatar_idade_cache(dados_db.get('idade_cache_tabelas_s'))}</div>
+            </div>
+        </div>
+    </div>
+
+    <!-- Throughput -->
+    <div class="section">
+        <h2>📈 Throughput do Banco{sufixo}</h2>
+        {_gerar_tabela_taxas_html(dados_db.get('taxas', {}))}
+    </div>
+
+    <!-- InnoDB -->
+    <div class="section">
+        <h2>🧮 InnoDB{sufixo}</h2>
+        {_gerar_secao_innodb_html(dados_db.get('innodb', {}))}
+    </div>
+
+    <!-- Replicação -->
+    <div class="section">
+        <h2>🔁 Replicação{sufixo}</h2>
+        {_gerar_tabela_replicacao_html(dados_db.get('replicacao') or {})}
+    </div>
+
+    <!-- Tabelas e índices -->
+    <div class="section">
+        <h2>🗂️ Tabelas e Índices (I/O){sufixo}</h2>
+        {_gerar_secao_indices_html(dados_db.get('indices') or {})}
+    </div>
+
+    <!-- Instruções por tempo total -->
+    <div class="section">
+        <h2>⏲️ Instruções por Tempo Total no Banco{sufixo}</h2>
+        {_gerar_tabela_digests_html(dados_db)}
+    </div>
+
+    <!-- Instruções longas concluídas -->
+    <div class="section">
+        <h2>⏱️ Instruções Longas Concluídas{sufixo}</h2>
+        {_gerar_tabela_instrucoes_html(dados_db.get('instrucoes_longas', {}))}
+    </div>
+
+    <!-- Queries Lentas -->
+    <div class="section">
+        <h2>⚠️ Consultas Lentas Detectadas{sufixo}</h2>
+        {_gerar_tabela_queries_html(dados_db.get('queries_lentas_agrupadas', []))}
+    </div>
+"""
+
+
+def _gerar_tabela_servidores_html(dados_db: Dict[str, Any]) -> str:
+    """Resumo dos servidores monitorados (vazio com um único servidor sem nome)"""
+    servidores = por_servidor(dados_db)
+    if len(servidores) == 1 and servidores[0][0] is None:
+        return ''
+
+    html = ('<div class="section"><h2>🗄️ Servidores de Banco de Dados</h2>'
+            f'<p style="font-size: 12px;">Coleta concorrente em {_valor_ou_na(dados_db.get("duracao_coleta_ms"))} ms</p>'
+            '<table class="queries-table"><thead><tr><th>Servidor</th><th>Status</th><th>p95 (ms)</th>'
+            '<th>QPS</th><th>Atraso réplica</th><th>Conexões</th><th>Coleta (ms)</th></tr></thead><tbody>')
+    if not servidores:
+        html += '<tr><td colspan="7" style="color: #666;">Nenhum servidor monitorado</td></tr>'
+    for nome, dados_servidor in servidores:
+        html += (f'<tr><td>{escape(nome)}</td><td>{dados_servidor.get("status", "--")}</td>'
+                 f'<td>{_valor_ou_na((dados_servidor.get("latencia") or {}).get("p95_ms"))}</td>'
+                 f'<td>{_valor_ou_na((dados_servidor.get("taxas") or {}).get("qps"))}</td>'
+                 f'<td>{_atraso_replicacao(dados_servidor)}</td>'
+                 f'<td>{dados_servidor.get("conexoes_ativas", 0)}</td>'
+                 f'<td>{_valor_ou_na(dados_servidor.get("duracao_coleta_ms"))}</td></tr>')
+    html += '</tbody></table></div>'
+    return html
+
+
+def _gerar_tabela_queries_html(grupos: list) -> str:
+    """Gera tabela HTML com queries lentas agrupadas por fingerprint"""
+    if not grupos:
         return '<p style="color: #666;">Nenhuma query lenta detectada</p>'
 
     html = '<table class="queries-table"><thead><tr>'
-    html += '<th>Tempo (s)</th><th>Usuário</th><th>Banco</th><th>Comando</th><th>Estado</th><th>Query</th>'
+    html += '<th>Ocorrências</th><th>Tempo total (s)</th><th>Máximo (s)</th><th>Usuários</th><th>Bancos</th><th>Padrão</th>'
     html += '</tr></thead><tbody>'
 
-    for query in queries_lentas:
-        if isinstance(query, dict):
-            html += f'<tr>'
-            html += f'<td><strong>{query.get("tempo_segundos", 0)}s</strong></td>'
-            html += f'<td>{query.get("usuario", "N/A")}</td>'
-            html += f'<td>{query.get("banco", "N/A")}</td>'
-            html += f'<td>{query.get("comando", "N/A")}</td>'
-            html += f'<td>{query.get("estado", "N/A")}</td>'
-            html += f'<td style="font-size: 12px; color: #666;">{query.get("query", "N/A")}</td>'
-            html += '</tr>'
+    for grupo in grupos:
+        html += f'<tr>'
+        html += f'<td><strong>{grupo["ocorrencias"]}</strong></td>'
+        html += f'<td>{grupo["tempo_total_s"]}</td>'
+        html += f'<td>{grupo["tempo_maximo_s"]}</td>'
+        html += f'<td>{escape(", ".join(grupo["usuarios"]))}</td>'
+        html += f'<td>{escape(", ".join(map(str, grupo["bancos"])))}</td>'
+        html += (f'<td style="font-size: 12px; color: #666;"><code>{escape(grupo["consulta_normalizada"])}</code>'
+                 f'<br>Exemplo: {escape(grupo.get("exemplo") or "N/A")}')
+        if grupo.get('plano'):
+            html += f'<br><strong>Plano:</strong> {escape(_resumo_plano(grupo["plano"]))}'
+        html += '</td>'
+        html += '</tr>'
+
+    html += '</tbody></table>'
+    return html
+
+
+def _resumo_plano(plano: Dict[str, Any]) -> str:
+    """Uma linha com o caminho de acesso de cada tabela do plano de execução"""
+    if plano.get('erro'):
+        return f"EXPLAIN indisponível ({plano['erro'][:80]})"
+
+    partes = []
+    for tabela in plano['tabelas']:
+        acesso = f"{tabela['tabela']}: {tabela['acesso']}"
+        acesso += f" via {tabela['indice']}" if tabela['indice'] else " sem índice"
+        partes.append(f"{acesso} (~{tabela['linhas']} linhas)")
+    if plano['filesort']:
+        partes.append("filesort")
+    if plano['tabela_temporaria']:
+        partes.append("tabela temporária")
+    if plano.get('custo') is not None:
+        partes.append(f"custo {plano['custo']}")
+    return ' | '.join(partes) or 'N/A'
+
+
+def _gerar_secao_cgroup_html(cgroup: Dict[str, Any]) -> str:
+    """Gera a seção HTML com uso e limites do cgroup (vazia fora de container v2)"""
+    if not cgroup:
+        return ''
+
+    html = '<div class="section">'
+    html += f'<h2>📦 Container (cgroup v2)</h2><p style="font-size: 12px; color: #666;">{escape(str(cgroup.get("caminho")))}</p>'
+    html += '<table class="queries-table"><thead><tr>'
+    html += '<th>Recurso</th><th>Uso</th><th>Limite</th><th>% do limite</th><th>Detalhe</th>'
+    html += '</tr></thead><tbody>'
+    html += (f'<tr><td><strong>CPU</strong></td><td>{_valor_ou_na(cgroup.get("cpus_usadas"))} CPUs</td>'
+             f'<td>{_valor_ou_na(cgroup.get("limite_cpus") or "sem limite")}</td>'
+             f'<td>{_percentual_ou_na(cgroup.get("uso_cpu_percent"))}</td>'
+             f'<td>Estrangulado em {_percentual_ou_na(cgroup.get("periodos_estrangulados_percent"))} dos períodos</td></tr>')
+    html += (f'<tr><td><strong>Memória</strong></td><td>{_valor_ou_na(cgroup.get("memoria_working_set_mb"))} MB</td>'
+             f'<td>{_valor_ou_na(cgroup.get("memoria_limite_mb") or "sem limite")}</td>'
+             f'<td>{_percentual_ou_na(cgroup.get("uso_memoria_percent"))}</td>'
+             f'<td>OOM kills: {cgroup.get("oom_kill_total", 0)}</td></tr>')
+    html += (f'<tr><td><strong>I/O</strong></td><td>{_valor_ou_na(cgroup.get("io_leitura_mb_s"))} / {_valor_ou_na(cgroup.get("io_escrita_mb_s"))} MB/s</td>'
+             f'<td>-</td><td>-</td><td>IOPS {_valor_ou_na(cgroup.get("io_iops"))}</td></tr>')
+    html += '</tbody></table></div>'
+    return html
+
 
+def _gerar_tabela_taxas_html(taxas: Dict[str, Any]) -> str:
+    """Gera tabela HTML com as taxas por segundo dos contadores do servidor"""
+    if not taxas:
+        return '<p style="color: #666;">Taxas disponíveis a partir da segunda coleta</p>'
+
+    linhas = (
+        ('Consultas (QPS)', taxas.get('qps')), ('Transações (TPS)', taxas.get('tps')),
+        ('SELECT', taxas.get('selects_s')), ('INSERT', taxas.get('inserts_s')),
+        ('UPDATE', taxas.get('updates_s')), ('DELETE', taxas.get('deletes_s')),
+        ('Linhas InnoDB lidas', taxas.get('linhas_lidas_s')),
+        ('Linhas InnoDB escritas', round(taxas.get('linhas_inseridas_s', 0) + taxas.get('linhas_atualizadas_s', 0) + taxas.get('linhas_removidas_s', 0), 1)),
+        ('Leituras sequenciais (rnd_next)', taxas.get('leituras_sequenciais_s')),
+        ('Varreduras completas', taxas.get('varreduras_completas_s')),
+        ('Joins sem índice', taxas.get('joins_sem_indice_s')),
+        ('Tabelas temporárias', f"{taxas.get('tmp_tabelas_s', 0)} ({taxas.get('tmp_disco_percent', 0)}% em disco)"),
+        ('Rede recebida / enviada (KB)', f"{taxas.get('rede_recebida_kb_s', 0)} / {taxas.get('rede_enviada_kb_s', 0)}"),
+    )
+
+    html = '<table class="queries-table"><thead><tr><th>Contador</th><th>Por segundo</th></tr></thead><tbody>'
+    for nome, valor in linhas:
+        html += f'<tr><td>{nome}</td><td>{_valor_ou_na(valor)}</td></tr>'
     html += '</tbody></table>'
     return html
 
 
+def _gerar_secao_innodb_html(innodb: Dict[str, Any]) -> str:
+    """Gera tabela HTML do buffer pool, locks e redo do InnoDB, com os pares de bloqueio"""
+    if not innodb:
+        return '<p style="color: #666;">Métricas do InnoDB indisponíveis</p>'
+
+    linhas = (
+        ('Buffer pool', f"{_valor_ou_na(innodb.get('buffer_pool_mb'))} MB"),
+        ('Taxa de acerto', _percentual_ou_na(innodb.get('buffer_pool_acerto_percent'))),
+        ('Leituras de disco/s', _valor_ou_na(innodb.get('leituras_disco_s'))),
+        ('Páginas sujas / livres', f"{_percentual_ou_na(innodb.get('paginas_sujas_percent'))} / {_percentual_ou_na(innodb.get('paginas_livres_percent'))}"),
+        ('I/O pendente (leituras / escritas)', f"{innodb.get('leituras_pendentes', 0)} / {innodb.get('escritas_pendentes', 0)}"),
+        ('Esperas por lock (agora / por s / média ms)',
+         f"{innodb.get('esperas_lock_atuais', 0)} / {_valor_ou_na(innodb.get('esperas_lock_s'))} / {_valor_ou_na(innodb.get('espera_lock_media_ms'))}"),
+        ('Idade do checkpoint', f"{_valor_ou_na(innodb.get('checkpoint_idade_mb'))} MB ({_percentual_ou_na(innodb.get('checkpoint_idade_percent'))} do redo)"),
+        ('History list length', _valor_ou_na(innodb.get('historico_undo'))),
+    )
+    html = '<table class="queries-table"><thead><tr><th>Métrica</th><th>Valor</th></tr></thead><tbody>'
+    for nome, valor in linhas:
+        html += f'<tr><td>{nome}</td><td>{valor}</td></tr>'
+    html += '</tbody></table>'
+
+    bloqueios = innodb.get('bloqueios', [])
+    if bloqueios:
+        html += ('<table class="queries-table"><thead><tr><th>Bloqueadora</th><th>Bloqueada</th><th>Espera</th>'
+                 '<th>Tabela / Índice</th><th>Query bloqueadora</th><th>Query bloqueada</th></tr></thead><tbody>')
+        for bloqueio in bloqueios:
+            html += (f'<tr><td>{bloqueio["thread_bloqueadora"]}</td><td>{bloqueio["thread_bloqueada"]}</td><td>{bloqueio["espera_s"]}s</td>'
+                     f'<td>{escape(bloqueio["tabela"])} / {escape(bloqueio["indice"])}</td>'
+                     f'<td><code>{escape(bloqueio["query_bloqueadora"])}</code></td><td><code>{escape(bloqueio["query_bloqueada"])}</code></td></tr>')
+        html += '</tbody></table>'
+    return html
+
+
+def _gerar_secao_indices_html(indices: Dict[str, Any]) -> str:
+    """Gera tabelas HTML com tabelas quentes, leituras sem índice e índices nunca lidos"""
+    quentes = indices.get('tabelas_quentes', [])
+    varreduras = indices.get('varreduras_sem_indice', [])
+    nao_usados = indices.get('indices_nao_usados', [])
+    if not (quentes or varreduras or nao_usados):
+        return '<p style="color: #666;">Sem dados de I/O por tabela (performance_schema indisponível ou primeira análise)</p>'
+
+    html = f'<p style="font-size: 12px; color: #666;">Janela de {_valor_ou_na(indices.get("janela_s"))}s</p>'
+    if quentes:
+        html += ('<table class="queries-table"><thead><tr><th>Tabela quente</th><th>% da latência</th><th>Leituras</th>'
+                 '<th>Latência leitura (ms)</th><th>Escritas</th><th>Latência escrita (ms)</th></tr></thead><tbody>')
+        for quente in quentes:
+            html += (f'<tr><td>{escape(quente["tabela"])}</td><td>{quente["percentual_latencia"]}%</td>'
+                     f'<td>{quente["leituras"]}</td><td>{quente["latencia_leitura_ms"]}</td>'
+                     f'<td>{quente["escritas"]}</td><td>{quente["latencia_escrita_ms"]}</td></tr>')
+        html += '</tbody></table>'
+    if varreduras:
+        html += ('<table class="queries-table"><thead><tr><th>Lida sem índice</th><th>Linhas</th><th>Latência (ms)</th>'
+                 '<th>% das leituras</th></tr></thead><tbody>')
+        for varredura in varreduras:
+            html += (f'<tr><td>{escape(varredura["tabela"])}</td><td>{varredura["linhas_lidas"]}</td>'
+                     f'<td>{varredura["latencia_ms"]}</td><td>{varredura["percentual_leituras"]}%</td></tr>')
+        html += '</tbody></table>'
+    if nao_usados:
+        html += ('<table class="queries-table"><thead><tr><th>Índice nunca usado</th><th>Escritas na tabela</th>'
+                 '<th>Latência de escrita da tabela (ms)</th></tr></thead><tbody>')
+        for indice in nao_usados:
+            html += (f'<tr><td>{escape(indice["tabela"])}.{escape(indice["indice"])}</td><td>{indice["escritas_tabela"]}</td>'
+                     f'<td>{indice["latencia_escrita_tabela_ms"]}</td></tr>')
+        html += '</tbody></table>'
+    return html
+
+
+def _gerar_tabela_replicacao_html(replicacao: Dict[str, Any]) -> str:
+    """Gera tabela HTML com o estado de cada canal de replicação"""
+    canais = replicacao.get('canais', [])
+    if not canais:
+        return '<p style="color: #666;">Servidor não é réplica</p>'
+
+    html = ('<table class="queries-table"><thead><tr><th>Canal</th><th>Origem</th><th>Atraso (s)</th><th>Tendência</th>'
+            '<th>IO / SQL</th><th>Relay log (MB)</th><th>Último erro</th></tr></thead><tbody>')
+    for canal in canais:
+        tendencia = canal.get('tendencia') or 'N/A'
+        if canal.get('variacao_atraso_s_min') is not None:
+            tendencia += f" ({canal['variacao_atraso_s_min']:+} s/min)"
+        erro = canal.get('erro_sql') or canal.get('erro_io') or ''
+        html += (f'<tr><td>{escape(canal["canal"])}</td><td>{escape(canal.get("origem", ""))}</td>'
+                 f'<td>{_valor_ou_na(canal.get("atraso_s"))}</td><td>{tendencia}</td>'
+                 f'<td>{canal.get("io_thread")} / {canal.get("sql_thread")}</td><td>{canal.get("relay_log_mb", 0)}</td>'
+                 f'<td>{escape(erro)}</td></tr>')
+    html += '</tbody></table>'
+    return html
+
+
+def _gerar_tabela_instrucoes_html(instrucoes: Dict[str, Any]) -> str:
+    """Gera tabela HTML das instruções longas concluídas, agrupadas por fingerprint"""
+    if not instrucoes:
+        return '<p style="color: #666;">Amostrador indisponível (sem pool ou sem performance_schema)</p>'
+    if not instrucoes.get('ofensores'):
+        return f'<p style="color: #28a745;">✓ Nenhuma instrução de {instrucoes.get("limite_s")}s ou mais concluída</p>'
+
+    html = (f'<p style="font-size: 12px;">{instrucoes.get("amostras", 0)} amostras a cada {instrucoes.get("intervalo_amostragem_s")}s</p>'
+            '<table class="queries-table"><thead><tr><th>Ocorrências</th><th>Média (s)</th><th>Máx (s)</th><th>Total (s)</th>'
+            '<th>Banco</th><th>Query</th></tr></thead><tbody>')
+    for ofensor in instrucoes['ofensores']:
+        html += (f'<tr><td>{ofensor["ocorrencias"]}</td><td>{ofensor["duracao_media_s"]}</td><td>{ofensor["duracao_maxima_s"]}</td>'
+                 f'<td>{ofensor["tempo_total_s"]}</td><td>{escape(str(ofensor["banco"]))}</td>'
+                 f'<td><code>{escape(ofensor["query"])}</code></td></tr>')
+    html += '</tbody></table>'
+    return html
+
+
+def _gerar_tabela_digests_html(dados_db: Dict[str, Any]) -> str:
+    """Gera tabela HTML com o ranking de instruções por tempo total (digests)"""
+    top_digests = dados_db.get('top_digests', [])
+    if not top_digests:
+        return '<p style="color: #666;">Sem dados de digest no intervalo (performance_schema indisponível ou primeira coleta)</p>'
+
+    html = (f'<p style="font-size: 12px;">Últimos {dados_db.get("janela_digests_s", 0):.0f}s - '
+            f'{dados_db.get("tempo_total_db_ms", 0)} ms de tempo total no banco</p>')
+    html += '<table class="queries-table"><thead><tr>'
+    html += '<th>% Tempo</th><th>Chamadas</th><th>Média (ms)</th><th>Examinadas / Enviadas</th><th>Tmp Disco</th><th>Instrução</th>'
+    html += '</tr></thead><tbody>'
+
+    for digest in top_digests:
+        html += '<tr>'
+        html += f'<td><strong>{digest.get("percentual_tempo", 0)}%</strong></td>'
+        html += f'<td>{digest.get("chamadas", 0)} ({_valor_ou_na(digest.get("chamadas_s"))}/s)</td>'
+        html += f'<td>{digest.get("latencia_media_ms", 0)}</td>'
+        html += f'<td>{digest.get("linhas_examinadas", 0)} / {digest.get("linhas_enviadas", 0)}</td>'
+        html += f'<td>{digest.get("tmp_disco", 0)}</td>'
+        html += f'<td><code>{escape(digest.get("texto", ""))}</code></td>'
+        html += '</tr>'
+
+    html += '</tbody></table>'
+    return html
+
+
+def _gerar_tabela_sistemas_arquivos_html(sistemas: list, pendente: bool = False) -> str:
+    """Gera tabela HTML com o uso de cada ponto de montagem"""
+    if pendente:
+        return '<p style="color: #666;">Coleta em andamento</p>'
+    if not sistemas:
+        return '<p style="color: #666;">Nenhum sistema de arquivos encontrado</p>'
+
+    html = '<table class="queries-table"><thead><tr>'
+    html += '<th>Montagem</th><th>Tipo</th><th>Dispositivo</th><th>Uso</th><th>Usado / Total (GB)</th><th>Inodes</th>'
+    html += '</tr></thead><tbody>'
+
+    for sistema in sistemas:
+        html += '<tr>'
+        html += f'<td><strong>{escape(str(sistema.get("ponto")))}</strong></td>'
+        html += f'<td>{escape(str(sistema.get("tipo")))}</td>'
+        html += f'<td>{escape(str(sistema.get("dispositivo")))}</td>'
+        html += f'<td>{sistema.get("uso_percent", 0):.1f}%</td>'
+        html += f'<td>{sistema.get("usado_gb", 0):.2f} / {sistema.get("total_gb", 0):.2f}</td>'
+        html += f'<td>{sistema.get("uso_inodes_percent", 0):.1f}%</td>'
+        html += '</tr>'
+
+    html += '</tbody></table>'
+    return html
+
+
+def _gerar_tabela_discos_html(discos: list) -> str:
+    """Gera tabela HTML com as métricas de cada disco"""
+    if not discos:
+        return '<p style="color: #666;">Nenhum dispositivo de disco encontrado</p>'
+
+    html = '<table class="queries-table"><thead><tr>'
+    html += '<th>Dispositivo</th><th>Latência (ms)</th><th>Leitura / Escrita (ms)</th><th>IOPS</th><th>MB/s (L / E)</th><th>Fila</th><th>Utilização</th>'
+    html += '</tr></thead><tbody>'
+
+    for disco in discos:
+        html += '<tr>'
+        html += f'<td><strong>{escape(str(disco.get("dispositivo")))}</strong></td>'
+        if disco.get('sem_dados'):
+            html += '<td colspan="6" style="color: #666;">Sem I/O na janela</td>'
+        else:
+            html += f'<td>{disco.get("latencia_ms")}</td>'
+            html += f'<td>{_valor_ou_na(disco.get("latencia_leitura_ms"))} / {_valor_ou_na(disco.get("latencia_escrita_ms"))}</td>'
+            html += f'<td>{disco.get("iops", 0)}</td>'
+            html += f'<td>{disco.get("leitura_mb_s", 0)} / {disco.get("escrita_mb_s", 0)}</td>'
+            html += f'<td>{disco.get("fila_media", 0)}</td>'
+            html += f'<td>{disco.get("utilizacao", 0)}%</td>'
+        html += '</tr>'
+
+    html += '</tbody></table>'
+    return html
+
+
+def _gerar_tabela_pressao_html(pressao: Dict[str, Any]) -> str:
+    """Gera tabela HTML com a pressão (PSI) de cada recurso"""
+    if not pressao:
+        return '<p style="color: #666;">PSI indisponível neste sistema</p>'
+
+    html = '<table class="queries-table"><thead><tr>'
+    html += '<th>Recurso</th><th>Some avg10 / avg60</th><th>Some no intervalo</th><th>Full avg10 / avg60</th><th>Full no intervalo</th>'
+    html += '</tr></thead><tbody>'
+
+    for recurso, valores in pressao.items():
+        html += '<tr>'
+        html += f'<td><strong>{recurso}</strong></td>'
+        html += f'<td>{valores.get("some_avg10", 0):.2f} / {valores.get("some_avg60", 0):.2f}</td>'
+        html += f'<td>{_percentual_ou_na(valores.get("some_stall_percent"))}</td>'
+        html += f'<td>{valores.get("full_avg10", 0):.2f} / {valores.get("full_avg60", 0):.2f}</td>'
+        html += f'<td>{_percentual_ou_na(valores.get("full_stall_percent"))}</td>'
+        html += '</tr>'
+
+    html += '</tbody></table>'
+    return html
+
+
+def _gerar_tabela_rede_html(dados_so: Dict[str, Any]) -> str:
+    """Gera tabela HTML com as taxas de cada interface de rede e do TCP"""
+    interfaces = dados_so.get('interfaces_rede', [])
+    if not interfaces:
+        return '<p style="color: #666;">Nenhuma interface de rede medida</p>'
+
+    html = '<table class="queries-table"><thead><tr>'
+    html += '<th>Interface</th><th>RX (MB/s)</th><th>TX (MB/s)</th><th>Pacotes/s (RX / TX)</th><th>Uso</th><th>Erros/s</th><th>Descartes/s</th>'
+    html += '</tr></thead><tbody>'
+
+    for interface in interfaces:
+        html += '<tr>'
+        html += f'<td><strong>{escape(str(interface.get("interface")))}</strong></td>'
+        html += f'<td>{interface.get("rx_mb_s", 0)}</td>'
+        html += f'<td>{interface.get("tx_mb_s", 0)}</td>'
+        html += f'<td>{interface.get("rx_pacotes_s", 0)} / {interface.get("tx_pacotes_s", 0)}</td>'
+        html += f'<td>{_percentual_ou_na(interface.get("uso_percent"))}</td>'
+        html += f'<td>{interface.get("erros_s", 0)}</td>'
+        html += f'<td>{interface.get("descartes_s", 0)}</td>'
+        html += '</tr>'
+
+    html += '</tbody></table>'
+    html += (f'<p style="font-size: 12px; margin-top: 10px;">TCP: retransmissões {dados_so.get("tcp_retransmissoes_s", 0)}/s '
+             f'({dados_so.get("tcp_retransmissao_percent", 0)}%) | listen overflows {dados_so.get("tcp_listen_overflows_s", 0)}/s</p>')
+    return html
+
+
+def _gerar_tabela_processos_html(dados_so: Dict[str, Any]) -> str:
+    """Gera tabela HTML com os processos de maior consumo"""
+    if _coleta_pendente(dados_so, 'processos'):
+        return '<p style="color: #666;">Coleta em andamento</p>'
+
+    linhas = []
+    for titulo, chave in (('CPU', 'top_processos_cpu'), ('Memória', 'top_processos_memoria'), ('I/O', 'top_processos_io')):
+        for processo in dados_so.get(chave, []):
+            linhas.append((titulo, processo))
+
+    if not linhas:
+        return '<p style="color: #666;">Nenhum processo com consumo mensurável</p>'
+
+    html = '<table class="queries-table"><thead><tr>'
+    html += '<th>Ranking</th><th>Processo</th><th>PID</th><th>CPU (%)</th><th>RSS (MB)</th><th>I/O (MB/s)</th>'
+    html += '</tr></thead><tbody>'
+
+    for titulo, processo in linhas:
+        html += '<tr>'
+        html += f'<td>{titulo}</td>'
+        html += f'<td><strong>{escape(str(processo.get("nome")))}</strong></td>'
+        html += f'<td>{processo.get("pid")}</td>'
+        html += f'<td>{processo.get("cpu_percent", 0)}</td>'
+        html += f'<td>{processo.get("rss_mb", 0)}</td>'
+        html += f'<td>{processo.get("io_mb_s", 0)}</td>'
+        html += '</tr>'
+
+    html += '</tbody></table>'
+    return html
+
+
+def _gerar_tabela_monitor_html(monitor: Dict[str, Any]) -> str:
+    """Gera tabela HTML com o custo de cada etapa e coletor do próprio monitor"""
+    if not monitor:
+        return '<p style="color: #666;">Custo do monitor ainda não medido</p>'
+
+    html = (f'<p style="font-size: 12px;">Processo: CPU {_percentual_ou_na(monitor.get("cpu_percent"))} | RSS {monitor.get("rss_mb", 0)} MB | '
+            f'Threads {monitor.get("threads", 0)} | Orçamento {_percentual_ou_na(monitor.get("orcamento_cpu_percent"))} | '
+            f'Recuo {monitor.get("fator_recuo", 1)}x</p>')
+    html += '<table class="queries-table"><thead><tr>'
+    html += '<th>Etapa</th><th>Chamadas</th><th>Parede (ms, última / média)</th><th>CPU (ms, última / média)</th><th>Syscalls</th><th>Alocado no processo (KB, pico)</th>'
+    html += '</tr></thead><tbody>'
+
+    for nome, etapa in monitor.get('etapas', {}).items():
+        html += '<tr>'
+        html += f'<td><strong>{nome}</strong></td>'
+        html += f'<td>{etapa.get("chamadas", 0)}</td>'
+        html += f'<td>{etapa.get("ultimo_ms", 0)} / {etapa.get("medio_ms", 0)}</td>'
+        html += f'<td>{etapa.get("ultimo_cpu_ms", 0)} / {etapa.get("medio_cpu_ms", 0)}</td>'
+        html += f'<td>{_valor_ou_na(etapa.get("ultimo_syscalls"))}</td>'
+        html += f'<td>{_valor_ou_na(etapa.get("alocado_processo_kb"))} ({_valor_ou_na(etapa.get("pico_alocado_processo_kb"))})</td>'
+        html += '</tr>'
+
+    for coletor in monitor.get('coletores', []):
+        html += '<tr>'
+        html += f'<td>coletor {coletor.get("nome")}</td>'
+        html += f'<td>{coletor.get("execucoes", 0)}</td>'
+        html += f'<td>{coletor.get("ultimo_custo_ms", 0)} (a cada {coletor.get("intervalo_efetivo", 0)} s)</td>'
+        html += '<td>-</td><td>-</td><td>-</td>'
+        html += '</tr>'
+
+    html += '</tbody></table>'
+    return html
+
+
+def _formatar_latencia_disco(dados_so: Dict[str, Any]) -> str:
+    """Formata a latência do disco mais lento ou indica ausência de I/O"""
+    if dados_so.get('latencia_disco_sem_dados'):
+        return "sem I/O na janela"
+    latencia = f"{dados_so.get('latencia_disco_ms', 0):.2f} ms"
+    if dados_so.get('disco_mais_lento'):
+        latencia += f" ({dados_so['disco_mais_lento']})"
+    return latencia
+
+
+def _coleta_pendente(dados_so: Dict[str, Any], coletor: str) -> bool:
+    """Indica se o coletor do SO ainda não produziu a primeira amostra"""
+    return coletor in dados_so.get('coletas_pendentes', [])
+
+
+def _valor_ou_na(valor) -> str:
+    """Retorna o valor formatado ou N/A quando ausente"""
+    return 'N/A' if valor is None else str(valor)
+
+
+def _percentual_ou_na(valor) -> str:
+    """Retorna o percentual formatado ou N/A quando ausente"""
+    return 'N/A' if valor is None else f"{valor}%"
+
+
+def _formatar_latencia_db(dados_db: Dict[str, Any]) -> str:
+    """Formata os percentis das sondas de latência do banco"""
+    latencia = dados_db.get('latencia') or {}
+    if not latencia.get('amostras'):
+        return str(dados_db.get('tempo_resposta', 0))
+    return (f"p50 {latencia.get('p50_ms')} | p95 {latencia.get('p95_ms')} | p99 {latencia.get('p99_ms')} | "
+            f"máx {latencia.get('max_ms')} ({latencia.get('amostras')} sondas"
+            f"{', baixa confiança' if latencia.get('baixa_confianca') else ''})")
+
+
+def _atraso_replicacao(dados_db: Dict[str, Any]) -> str:
+    """Maior atraso entre os canais de replicação, ou '-' se o servidor não for réplica"""
+    canais = (dados_db.get('replicacao') or {}).get('canais', [])
+    if not canais:
+        return '-'
+    atrasos = [canal['atraso_s'] for canal in canais if canal.get('atraso_s') is not None]
+    return f"{max(atrasos)}s" if len(atrasos) == len(canais) else 'parada'
+
+
+def _formatar_idade_cache(idade) -> str:
+    """Formata a idade de um valor em cache"""
+    return 'N/A' if idade is None else f"há {idade:.0f}s"
+
+
 def _formatar_uptime(segundos: int) -> str:
     """Formata uptime em formato legível"""
     dias = segundos // 86400
@@ -1,86 +1,175 @@
 import psutil
-from typing import Dict
-import platform
-import time
-
+from typing import Dict, Any, Optional
+import threading
+
+from src.cgroup_metricas import ColetorCgroup
+from src.coletores import AgendadorColetores
+from src.cpu_metricas import ColetorCPU, DistribuicaoCPU
+from src.disco_metricas import ColetorDisco, resumir_discos
+from src.fs_metricas import ColetorSistemaArquivos, sistema_raiz
+from src.instrumentacao import MonitorProprio
+from src.memoria_metricas import ColetorMemoria
+from src.processos_metricas import ColetorProcessos
+from src.psi_metricas import ColetorPSI, GatilhoPSI
+from src.rede_metricas import ColetorRede
+
+
+class AmostradorSO:
+    """
+    Amostrador em segundo plano das métricas do SO
+
+    Registra cada coletor do SO no agendador com a própria cadência
+    (contadores baratos a cada tick, processos e montagens com menos
+    frequência). Os coletores mantêm os snapshots anteriores e calculam
+    as diferenças, de modo que a leitura da última amostra não precise
+    esperar (sem sleep no chamador). A varredura de processos e a de
+    montagens executam a primeira vez já na thread; até lá aparecem em
+    'coletas_pendentes' e a primeira amostra sai só com os contadores do /proc.
+    """
 
-def coletar_metricas_so() -> Dict[str, float]:
-    try:
-        # Métricas básicas
-        uso_cpu = psutil.cpu_percent(interval=1)
-        memoria = psutil.virtual_memory()
-        uso_memoria = memoria.percent
-
-        # Determinar raiz do disco baseado no SO
-        disco_raiz = '\\' if platform.system() == 'Windows' else '/'
-        uso_disco = psutil.disk_usage(disco_raiz).percent
-
-        # Memória de troca (Swap)
-        swap = psutil.swap_memory()
-        uso_swap = swap.percent
-
-        # Métricas de I/O do disco
-        latencia_disco = _calcular_latencia_disco()
-
-        metricas = {
-            'uso_cpu': uso_cpu,
-            'uso_memoria': uso_memoria,
-            'uso_disco': uso_disco,
-            'uso_swap': uso_swap,
-            'latencia_disco_ms': latencia_disco,
-            'cpu_cores': psutil.cpu_count(),
-            'memoria_total_gb': round(memoria.total / (1024 ** 3), 2),
-            'memoria_usada_gb': round(memoria.used / (1024 ** 3), 2),
-            'disco_total_gb': round(psutil.disk_usage(disco_raiz).total / (1024 ** 3), 2),
-            'disco_usado_gb': round(psutil.disk_usage(disco_raiz).used / (1024 ** 3), 2),
-        }
+    def __init__(self, intervalo: float = 1.0, janela_disco: float = 5.0, gatilhos_psi: bool = False,
+                 orcamento_cpu_percent: Optional[float] = None):
+        """
+        Args:
+            intervalo: Intervalo base entre amostras em segundos
+            janela_disco: Janela de cálculo das métricas de disco em segundos
+            gatilhos_psi: Registrar gatilhos de PSI para antecipar o tick quando
+                houver stall de memória ou I/O
+            orcamento_cpu_percent: Uso máximo de CPU do próprio monitor (% de um
+                núcleo); acima dele todos os coletores recuam
+        """
+        self.intervalo = intervalo
+        self._coletor_cpu = ColetorCPU()
+        # Distribuição completa por núcleo/modo; a amostra só leva os números resumidos
+        self.distribuicao_cpu: Optional[DistribuicaoCPU] = None
+        self._coletor_memoria = ColetorMemoria()
+        self._coletor_disco = ColetorDisco(janela=janela_disco)
+        self._coletor_processos = ColetorProcessos()
+        self._coletor_fs = ColetorSistemaArquivos()
+        self._coletor_rede = ColetorRede()
+        self._coletor_psi = ColetorPSI()
+        self._coletor_cgroup = ColetorCgroup()
+        self._disparados: list = []
+
+        self._gatilho_psi: Optional[GatilhoPSI] = None
+        if gatilhos_psi and self._coletor_psi.disponivel:
+            try:
+                self._gatilho_psi = GatilhoPSI()
+            except OSError:
+                # Kernel sem suporte ou sem permissão: segue só com o tick fixo
+                self._gatilho_psi = None
+
+        if self._gatilho_psi is not None:
+            self.agendador = AgendadorColetores(
+                "AmostradorSO",
+                espera=self._gatilho_psi.aguardar,
+                ao_evento=self._ao_disparo_psi,
+                despertar=self._gatilho_psi.despertar
+            )
+        else:
+            self.agendador = AgendadorColetores("AmostradorSO")
+
+        self.agendador.registrar('cpu', self._coletar_cpu, intervalo)
+        self.agendador.registrar('memoria', self._coletor_memoria.coletar, intervalo)
+        self.agendador.registrar('disco', self._coletar_disco, intervalo)
+        self.agendador.registrar('rede', self._coletor_rede.coletar, intervalo)
+        self.agendador.registrar('psi', self._coletar_psi, intervalo)
+        if self._coletor_cgroup.disponivel:
+            self.agendador.registrar('cgroup', self._coletor_cgroup.coletar, intervalo)
+        self.agendador.registrar('processos', self._coletor_processos.coletar, intervalo * 2, orcamento_ms=200,
+                                 adiado=True)
+        self.agendador.registrar('sistemas_arquivos', self._coletar_sistemas_arquivos, intervalo * 10, orcamento_ms=100,
+                                 adiado=True)
+
+        self._monitor = MonitorProprio(self.agendador, orcamento_cpu_percent)
+        self.agendador.registrar('monitor', self._monitor.coletar, intervalo * 5)
+
+    def registrar(self, nome: str, funcao, intervalo: float, orcamento_ms: Optional[float] = None) -> None:
+        """Registra um coletor adicional cujo resultado é mesclado na amostra"""
+        self.agendador.registrar(nome, funcao, intervalo, orcamento_ms)
+
+    def iniciar(self) -> None:
+        """Inicia a thread de amostragem (idempotente)"""
+        self.agendador.iniciar()
+
+    def parar(self) -> None:
+        """Sinaliza a thread de amostragem para encerrar"""
+        self.agendador.parar(timeout=self.intervalo * 2)
+
+    def ultima_amostra(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Retorna a última amostra calculada
+
+        Args:
+            timeout: Tempo máximo de espera pela primeira amostra
+
+        Returns:
+            Cópia do dicionário com as métricas mais recentes e os coletores
+            ainda sem resultado em 'coletas_pendentes'
+        """
+        if not self.agendador.aguardar_pronto(timeout):
+            raise Exception("Nenhuma amostra disponível ainda")
+        amostra = self.agendador.snapshot()
+        amostra['coletas_pendentes'] = self.agendador.pendentes()
+        return amostra
+
+    def _ao_disparo_psi(self, recursos: list) -> None:
+        # Gatilho do kernel antecipa os coletores que explicam o stall
+        self._disparados = recursos
+        self.agendador.antecipar(['cpu', 'memoria', 'disco', 'psi'])
+
+    def _coletar_cpu(self) -> Dict[str, Any]:
+        distribuicao = self._coletor_cpu.coletar()
+        if distribuicao is None:
+            return {'uso_cpu': 0.0, 'cpu_cores': psutil.cpu_count()}
+        self.distribuicao_cpu = distribuicao
+        metricas = distribuicao.resumo()
+        metricas['cpu_cores'] = psutil.cpu_count()
+        return metricas
 
+    def _coletar_disco(self) -> Dict[str, Any]:
+        discos = self._coletor_disco.coletar()
+        metricas = {'discos': discos}
+        metricas.update(resumir_discos(discos))
         return metricas
-    except Exception as e:
-        raise Exception(f"Erro ao coletar métricas do SO: {str(e)}")
 
+    def _coletar_psi(self) -> Dict[str, Any]:
+        disparados, self._disparados = self._disparados, []
+        return {'pressao': self._coletor_psi.coletar(), 'pressao_disparada': disparados}
 
-def _calcular_latencia_disco() -> float:
-    """
-    Calcula latência do disco através de duas leituras de I/O counters
-    A diferença entre as duas leituras simula a latência real do disco
-    """
+    def _coletar_sistemas_arquivos(self) -> Dict[str, Any]:
+        return _resumir_sistemas_arquivos(self._coletor_fs.coletar())
+
+
+_amostrador: Optional[AmostradorSO] = None
+_amostrador_lock = threading.Lock()
+
+
+def obter_amostrador() -> AmostradorSO:
+    """Retorna o amostrador global, iniciando-o na primeira chamada"""
+    global _amostrador
+    with _amostrador_lock:
+        if _amostrador is None:
+            _amostrador = AmostradorSO()
+        _amostrador.iniciar()
+        return _amostrador
+
+
+def coletar_metricas_so() -> Dict[str, Any]:
     try:
-        # Primeira leitura
-        io1 = psutil.disk_io_counters()
-        if not io1:
-            return 0.0
-
-        # Espera pequeno
-        time.sleep(0.1)
-
-        # Segunda leitura
-        io2 = psutil.disk_io_counters()
-        if not io2:
-            return 0.0
-
-        # Calcula diferenças
-        read_count_delta = io2.read_count - io1.read_count
-        read_time_delta = io2.read_time - io1.read_time
-        write_count_delta = io2.write_count - io1.write_count
-        write_time_delta = io2.write_time - io1.write_time
-
-        total_operations = read_count_delta + write_count_delta
-        total_time = read_time_delta + write_time_delta
-
-        # Se houve operações, calcula latência média
-        if total_operations > 0 and total_time > 0:
-            latencia = total_time / total_operations
-            return round(latencia, 2)
-
-        # Fallback: tenta com dados cumulativos
-        total_ops = io2.read_count + io2.write_count
-        total_tm = io2.read_time + io2.write_time
-
-        if total_ops > 0 and total_tm > 0:
-            latencia = total_tm / total_ops
-            return round(latencia, 2)
-
-        return 0.0
+        # A primeira chamada aguarda um tick; as demais retornam imediatamente
+        amostrador = obter_amostrador()
+        return amostrador.ultima_amostra(timeout=amostrador.intervalo * 3)
     except Exception as e:
-        return 0.0
\ No newline at end of file
+        raise Exception(f"Erro ao coletar métricas do SO: {str(e)}")
+
+
+def _resumir_sistemas_arquivos(sistemas: list) -> Dict[str, Any]:
+    # Campos agregados de disco continuam refletindo a montagem raiz
+    raiz = sistema_raiz(sistemas) or {}
+    return {
+        'sistemas_arquivos': sistemas,
+        'uso_disco': raiz.get('uso_percent', 0.0),
+        'disco_total_gb': raiz.get('total_gb', 0.0),
+        'disco_usado_gb': raiz.get('usado_gb', 0.0),
+    }
@@ -0,0 +1,96 @@
+import pytest
+
+from src.cgroup_metricas import ColetorCgroup
+
+MB = 1024 ** 2
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr('src.cgroup_metricas.time.monotonic', lambda: agora[0])
+    return agora
+
+
+def _escrever(diretorio, **arquivos):
+    for nome, conteudo in arquivos.items():
+        (diretorio / nome.replace('_', '.', 1)).write_text(conteudo)
+
+
+def _cpu_stat(uso_us, periodos, estrangulados, estrangulado_us):
+    return (f"usage_usec {uso_us}\nuser_usec 0\nsystem_usec 0\nnr_periods {periodos}\n"
+            f"nr_throttled {estrangulados}\nthrottled_usec {estrangulado_us}\n")
+
+
+def test_sem_limites_max_vira_none(tmp_path, relogio):
+    _escrever(tmp_path, cpu_max="max 100000\n", cpu_stat=_cpu_stat(0, 0, 0, 0),
+              memory_current=f"{512 * MB}\n", memory_max="max\n",
+              memory_stat="anon 100\nfile 200\ninactive_file 0\n", memory_events="low 0\nhigh 0\nmax 0\noom 0\noom_kill 0\n")
+
+    cgroup = ColetorCgroup(str(tmp_path)).coletar()['cgroup']
+
+    assert cgroup['limite_cpus'] is None
+    assert cgroup['memoria_limite_mb'] is None
+    assert cgroup['uso_memoria_percent'] is None
+    assert cgroup['memoria_atual_mb'] == 512.0
+
+
+def test_cota_de_cpu_e_estrangulamento(tmp_path, relogio):
+    _escrever(tmp_path, cpu_max="150000 100000\n", cpu_stat=_cpu_stat(0, 100, 0, 0))
+    coletor = ColetorCgroup(str(tmp_path))
+    assert coletor.coletar()['cgroup'] == {'caminho': str(tmp_path), 'limite_cpus': 1.5}
+
+    relogio[0] += 2
+    # 1,5 s de CPU em 2 s, 10 de 20 períodos estrangulados somando 0,2 s
+    _escrever(tmp_path, cpu_stat=_cpu_stat(1_500_000, 120, 10, 200_000))
+    cgroup = coletor.coletar()['cgroup']
+
+    assert cgroup['cpus_usadas'] == 0.75
+    assert cgroup['uso_cpu_percent'] == 50.0
+    assert cgroup['periodos_estrangulados_percent'] == 50.0
+    assert cgroup['estrangulado_ms_s'] == 100.0
+
+
+def test_working_set_desconta_o_cache_inativo(tmp_path, relogio):
+    _escrever(tmp_path, memory_current=f"{800 * MB}\n", memory_max=f"{1024 * MB}\n",
+              memory_stat=f"anon {300 * MB}\nfile {500 * MB}\ninactive_file {288 * MB}\n",
+              memory_events="low 0\nhigh 4\nmax 9\noom 1\noom_kill 1\n")
+    coletor = ColetorCgroup(str(tmp_path))
+    cgroup = coletor.coletar()['cgroup']
+
+    assert cgroup['memoria_working_set_mb'] == 512.0
+    assert cgroup['uso_memoria_percent'] == 50.0
+    assert cgroup['oom_kill_total'] == 1
+    assert cgroup['eventos_memoria_max'] == 9
+    assert 'oom_kill_novos' not in cgroup
+
+    relogio[0] += 1
+    _escrever(tmp_path, memory_events="low 0\nhigh 6\nmax 9\noom 3\noom_kill 3\n")
+    cgroup = coletor.coletar()['cgroup']
+
+    assert cgroup['oom_kill_novos'] == 2
+    assert cgroup['eventos_memoria_high_novos'] == 2
+
+
+def test_io_somado_entre_dispositivos(tmp_path, relogio):
+    _escrever(tmp_path, io_stat="8:0 rbytes=0 wbytes=0 rios=0 wios=0 dbytes=0 dios=0\n"
+                                "253:0 rbytes=0 wbytes=0 rios=0 wios=0\n")
+    coletor = ColetorCgroup(str(tmp_path))
+    assert 'io_iops' not in coletor.coletar()['cgroup']
+
+    relogio[0] += 2
+    _escrever(tmp_path, io_stat=f"8:0 rbytes={2 * MB} wbytes={4 * MB} rios=100 wios=50 dbytes=0 dios=0\n"
+                                f"253:0 rbytes={2 * MB} wbytes=0 rios=30 wios=20\n"
+                                f"259:0 rbytes={MB} wbytes=0 rios=10 wios=0\n")
+    cgroup = coletor.coletar()['cgroup']
+
+    assert cgroup['io_leitura_mb_s'] == 2.5
+    assert cgroup['io_escrita_mb_s'] == 2.0
+    assert cgroup['io_iops'] == 105.0
+
+
+def test_sem_cgroup_v2(tmp_path):
+    coletor = ColetorCgroup(str(tmp_path))
+
+    assert coletor.disponivel is False
+    assert coletor.coletar() == {}
@@ -0,0 +1,147 @@
+import mysql.connector
+
+from src.db_amostrador import AmostradorInstrucoes, queries_lentas_da_amostra
+from src.histograma import JanelaLatencia
+
+PS_POR_S = 1_000_000_000_000
+
+
+def _linha(thread, evento, decorrido_s, texto='SELECT * FROM pedidos WHERE id = 1'):
+    return (thread, evento, thread + 100, 'app', 'loja', 'Query', 'executing', int(decorrido_s * PS_POR_S),
+            texto, texto)
+
+
+def test_instrucao_emitida_ao_sumir_com_duracao_observada():
+    amostrador = AmostradorInstrucoes(intervalo=0.5, limite_s=1.0)
+    amostrador._registrar_amostra([_linha(1, 7, 0.6)], 100.0)
+    amostrador._registrar_amostra([_linha(1, 7, 2.1)], 101.5)
+    amostrador._registrar_amostra([], 102.0)
+
+    concluida, = amostrador._concluidas
+    assert concluida['duracao_s'] == 2.1
+    assert concluida['duracao_maxima_s'] == 2.6
+    assert concluida['fim'] == 102.0
+    assert 'texto_completo' not in concluida
+
+
+def test_limite_aplicado_a_duracao_observada_e_nao_ao_limite_superior():
+    amostrador = AmostradorInstrucoes(intervalo=0.5, limite_s=1.0)
+    # Vista com 0,8 s e sumida 0,5 s depois: pode ter durado até 1,3 s, mas só 0,8 s foi observado
+    amostrador._registrar_amostra([_linha(1, 1, 0.8)], 100.0)
+    amostrador._registrar_amostra([], 100.5)
+
+    assert list(amostrador._concluidas) == []
+
+
+def test_mesma_thread_com_evento_novo_e_outra_instrucao():
+    amostrador = AmostradorInstrucoes(intervalo=0.5, limite_s=1.0)
+    amostrador._registrar_amostra([_linha(1, 1, 1.5)], 100.0)
+    amostrador._registrar_amostra([_linha(1, 2, 1.2)], 101.0)
+
+    assert len(amostrador._concluidas) == 1
+    assert [r['duracao_s'] for r in amostrador._em_execucao] == [1.2]
+
+
+def test_ofensores_e_queries_lentas_da_amostra():
+    amostrador = AmostradorInstrucoes(intervalo=0.5, limite_s=1.0)
+    for rodada in range(3):
+        inicio = 100.0 + rodada * 10
+        amostrador._registrar_amostra([_linha(1, rodada, 2.0, 'SELECT * FROM t WHERE id = 5')], inicio)
+        amostrador._registrar_amostra([], inicio + 0.5)
+    amostrador._registrar_amostra([_linha(2, 9, 8.0, 'UPDATE grande SET x = 1')], 200.0)
+    amostrador._agendador = object()
+
+    amostra = amostrador.obter(pool=None)
+
+    ofensor, = amostra['ofensores']
+    assert ofensor['ocorrencias'] == 3
+    assert ofensor['query'] == 'select * from t where id = ?'
+    assert ofensor['tempo_total_s'] == 6.0
+    lenta, = queries_lentas_da_amostra(amostra)
+    assert lenta['id'] == 102 and lenta['tempo_segundos'] == 8
+
+
+class CursorFalso:
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def execute(self, consulta, parametros=()):
+        self.conexao.consultas.append(consulta.split()[0])
+        if self.conexao.erro is not None:
+            raise self.conexao.erro
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class ConexaoFalsa:
+    def __init__(self, erro=None):
+        self.erro = erro
+        self.consultas = []
+
+    def cursor(self):
+        return CursorFalso(self)
+
+
+class PoolFalso:
+    def __init__(self, erro=None):
+        self.erro = erro
+        self.emprestimos = 0
+        self.devolucoes = []
+        self.ganchos = []
+
+    def emprestar(self, timeout=None):
+        self.emprestimos += 1
+        return ConexaoFalsa(self.erro)
+
+    def devolver(self, conexao, descartar=False):
+        self.devolucoes.append(descartar)
+
+    def ao_fechar(self, callback):
+        self.ganchos.append(callback)
+
+
+def test_conexao_propria_mantida_entre_amostras_e_sonda_de_latencia():
+    janela = JanelaLatencia()
+    amostrador = AmostradorInstrucoes(janela_latencia=janela)
+    pool = PoolFalso()
+    amostrador._pool = pool
+
+    amostrador._amostrar(pool, agendador=None)
+    amostrador._amostrar(pool, agendador=None)
+
+    assert pool.emprestimos == 1
+    assert janela.resumo_ms()['amostras'] == 2
+
+    amostrador.parar()
+    assert pool.devolucoes == [True]
+
+
+def test_sem_performance_schema_desativa_e_devolve_a_conexao():
+    class AgendadorFalso:
+        removidos = []
+
+        def remover(self, nome):
+            self.removidos.append(nome)
+
+    amostrador = AmostradorInstrucoes()
+    pool = PoolFalso(erro=mysql.connector.ProgrammingError("sem privilégio"))
+    agendador = AgendadorFalso()
+
+    assert amostrador._amostrar(pool, agendador) == {}
+    assert amostrador.disponivel is False
+    assert agendador.removidos == ['instrucoes']
+    assert pool.devolucoes == [False]
+    assert amostrador.obter(pool) is None
+
+
+def test_sem_performance_schema_na_primeira_amostra_nao_mantem_o_agendador():
+    amostrador = AmostradorInstrucoes()
+    pool = PoolFalso(erro=mysql.connector.ProgrammingError("sem privilégio"))
+
+    assert amostrador.obter(pool) is None
+    assert amostrador._agendador is None
+    assert pool.ganchos == []
@@ -0,0 +1,88 @@
+import mysql.connector
+
+from src.db_digest import ColetorDigest
+
+PS_POR_MS = 1_000_000_000
+
+
+class CursorFalso:
+    """Cursor que devolve linhas pré-definidas e guarda as consultas executadas"""
+
+    def __init__(self, linhas=None, erro=None):
+        self.linhas = linhas or []
+        self.erro = erro
+        self.consultas = []
+
+    def execute(self, consulta, parametros=()):
+        self.consultas.append((consulta, parametros))
+        if self.erro is not None:
+            raise self.erro
+
+    def fetchall(self):
+        return self.linhas
+
+
+def _linha(digest, chamadas, tempo_ms, examinadas=0, enviadas=0, visto='2026-01-01 00:00:00'):
+    return (visto, 'loja', digest, f"SELECT {digest}", chamadas, tempo_ms * PS_POR_MS, examinadas, enviadas, 0, 0)
+
+
+def test_primeira_coleta_so_forma_a_base():
+    coletor = ColetorDigest()
+
+    assert coletor.coletar(CursorFalso([_linha('a', 10, 100)])) == {}
+
+
+def test_ranking_usa_diferencas_entre_coletas():
+    coletor = ColetorDigest()
+    coletor.coletar(CursorFalso([_linha('a', 10, 100), _linha('b', 5, 1000)]))
+
+    resultado = coletor.coletar(CursorFalso([_linha('a', 110, 2100, examinadas=500, enviadas=100),
+                                             _linha('b', 6, 1200)]))
+
+    primeiro, segundo = resultado['top_digests']
+    assert primeiro['digest'] == 'a'
+    assert primeiro['chamadas'] == 100
+    assert primeiro['tempo_total_ms'] == 2000
+    assert primeiro['latencia_media_ms'] == 20
+    assert primeiro['examinadas_por_enviada'] == 5
+    assert segundo['digest'] == 'b' and segundo['chamadas'] == 1
+    assert resultado['tempo_total_db_ms'] == 2200
+
+
+def test_digest_novo_e_tabela_truncada_usam_o_acumulado():
+    coletor = ColetorDigest()
+    coletor.coletar(CursorFalso([_linha('a', 100, 1000)]))
+
+    resultado = coletor.coletar(CursorFalso([_linha('a', 3, 30), _linha('novo', 2, 50)]))
+
+    por_digest = {item['digest']: item for item in resultado['top_digests']}
+    assert por_digest['a']['chamadas'] == 3
+    assert por_digest['novo']['chamadas'] == 2
+
+
+def test_digest_sem_novas_chamadas_fica_fora_do_ranking():
+    coletor = ColetorDigest()
+    coletor.coletar(CursorFalso([_linha('a', 10, 100), _linha('b', 5, 50)]))
+
+    resultado = coletor.coletar(CursorFalso([_linha('a', 10, 100), _linha('b', 7, 70)]))
+
+    assert [item['digest'] for item in resultado['top_digests']] == ['b']
+
+
+def test_leitura_incremental_depois_da_primeira_carga():
+    coletor = ColetorDigest()
+    coletor.coletar(CursorFalso([_linha('a', 10, 100, visto='2026-01-01 00:00:05')]))
+
+    cursor = CursorFalso([_linha('a', 12, 120)])
+    coletor.coletar(cursor)
+
+    consulta, parametros = cursor.consultas[0]
+    assert 'LAST_SEEN >= %s' in consulta
+    assert parametros == ('2026-01-01 00:00:05',)
+
+
+def test_sem_performance_schema_desativa_o_coletor():
+    coletor = ColetorDigest()
+
+    assert coletor.coletar(CursorFalso(erro=mysql.connector.ProgrammingError("sem privilégio"))) == {}
+    assert coletor.disponivel is False
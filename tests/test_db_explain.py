@@ -0,0 +1,177 @@
+import json
+
+import mysql.connector
+
+from src.db_explain import CachePlanos, _explicar, explicavel, resumir_plano
+
+PLANO_JUNCAO = {
+    "query_block": {
+        "select_id": 1,
+        "cost_info": {"query_cost": "1520.75"},
+        "ordering_operation": {
+            "using_filesort": True,
+            "grouping_operation": {
+                "using_temporary_table": True,
+                "nested_loop": [
+                    {"table": {"table_name": "p", "access_type": "ALL", "possible_keys": ["idx_status"],
+                               "rows_examined_per_scan": 10000, "attached_condition": "(`loja`.`p`.`status` = 'novo')"}},
+                    {"table": {"table_name": "c", "access_type": "eq_ref", "key": "PRIMARY",
+                               "possible_keys": ["PRIMARY"], "rows_examined_per_scan": 1}},
+                ],
+            },
+        },
+    }
+}
+
+PLANO_SUBCONSULTA = {
+    "query_block": {
+        "cost_info": {"query_cost": "40.10"},
+        "table": {
+            "table_name": "<derived2>",
+            "access_type": "ALL",
+            "rows_examined_per_scan": "2.5e2",
+            "materialized_from_subquery": {
+                "query_block": {"table": {"table_name": "itens", "access_type": "index", "key": "idx_pedido"}}
+            },
+        },
+    }
+}
+
+
+def test_resumo_de_juncao_com_filesort_e_temporaria():
+    resumo = resumir_plano(PLANO_JUNCAO)
+
+    assert resumo['custo'] == 1520.75
+    assert resumo['filesort'] is True and resumo['tabela_temporaria'] is True
+    assert [(t['tabela'], t['acesso'], t['indice'], t['linhas']) for t in resumo['tabelas']] == [
+        ('p', 'ALL', None, 10000), ('c', 'eq_ref', 'PRIMARY', 1)]
+    varredura, = resumo['varreduras_completas']
+    assert varredura['tabela'] == 'p'
+    assert varredura['descricao'] == 'varredura completa da tabela'
+    assert varredura['condicao'].startswith('(`loja`.`p`.`status`')
+
+
+def test_subconsulta_materializada_dentro_da_tabela():
+    resumo = resumir_plano(PLANO_SUBCONSULTA)
+
+    assert [(t['tabela'], t['acesso'], t['linhas']) for t in resumo['tabelas']] == [
+        ('<derived2>', 'ALL', 250), ('itens', 'index', 0)]
+    assert [v['descricao'] for v in resumo['varreduras_completas']] == [
+        'varredura completa da tabela', 'varredura completa do índice']
+    assert resumo['filesort'] is False
+
+
+def test_plano_sem_bloco_de_consulta():
+    assert resumir_plano({}) == {'custo': None, 'tabelas': [], 'varreduras_completas': [],
+                                 'filesort': False, 'tabela_temporaria': False}
+
+
+def test_so_leituras_sao_explicaveis():
+    assert explicavel('select * from t where id = ?')
+    assert explicavel('with x as (select ?) select * from x')
+    assert not explicavel('update t set a = ?')
+
+
+class CursorExplain:
+    def __init__(self, banco_atual='app', plano=PLANO_JUNCAO, erro_explain=None, erro_restaurar=False):
+        self.banco_atual = banco_atual
+        self.plano = plano
+        self.erro_explain = erro_explain
+        self.erro_restaurar = erro_restaurar
+        self.comandos = []
+        self._linha = None
+
+    def execute(self, comando, parametros=()):
+        self.comandos.append(comando)
+        if comando == "SELECT DATABASE()":
+            self._linha = (self.banco_atual,)
+        elif comando.startswith("EXPLAIN"):
+            if self.erro_explain is not None:
+                raise self.erro_explain
+            self._linha = (json.dumps(self.plano),)
+        elif comando.endswith("= DEFAULT") and self.erro_restaurar:
+            raise mysql.connector.OperationalError("conexão perdida")
+
+    def fetchone(self):
+        return self._linha
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class ConexaoExplain:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+def test_explain_no_banco_da_consulta_e_sessao_restaurada():
+    cursor = CursorExplain(banco_atual='app')
+
+    plano, restaurada = _explicar(ConexaoExplain(cursor), "SELECT * FROM p", 'loja', 2)
+
+    assert plano['custo'] == 1520.75
+    assert restaurada is True
+    assert cursor.comandos == ["SELECT DATABASE()", "SET SESSION lock_wait_timeout = %s", "USE `loja`",
+                               "EXPLAIN FORMAT=JSON SELECT * FROM p",
+                               "SET SESSION lock_wait_timeout = DEFAULT", "USE `app`"]
+
+
+def test_troca_de_banco_sem_banco_original_nao_e_restauravel():
+    plano, restaurada = _explicar(ConexaoExplain(CursorExplain(banco_atual=None)), "SELECT 1", 'loja', 2)
+
+    assert 'erro' not in plano
+    assert restaurada is False
+
+
+def test_erro_no_explain_vira_erro_do_plano():
+    cursor = CursorExplain(erro_explain=mysql.connector.ProgrammingError("SELECT command denied"))
+
+    plano, restaurada = _explicar(ConexaoExplain(cursor), "SELECT * FROM p", None, 2)
+
+    assert 'SELECT command denied' in plano['erro']
+    assert restaurada is True
+
+
+def test_falha_ao_restaurar_descarta_a_conexao_emprestada():
+    class PoolFalso:
+        devolucoes = []
+
+        def emprestar(self, timeout=None):
+            return ConexaoExplain(CursorExplain(erro_restaurar=True))
+
+        def devolver(self, conexao, descartar=False):
+            self.devolucoes.append(descartar)
+
+    cache, pool = CachePlanos(), PoolFalso()
+    cache._explicar_pelo_pool(pool, 'fp', "SELECT * FROM p", None)
+
+    assert pool.devolucoes == [True]
+    assert cache._planos['fp'][1]['custo'] == 1520.75
+
+
+def test_cache_por_fingerprint_com_ttl_e_limite(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr('src.db_explain.time.monotonic', lambda: agora[0])
+    cursor = CursorExplain()
+    conexao = ConexaoExplain(cursor)
+    cache = CachePlanos(ttl=60, maximo=2)
+
+    cache.obter(conexao, 'a', "SELECT a", None)
+    agora[0] += 10
+    plano = cache.obter(conexao, 'a', "SELECT a", None)
+    assert plano['idade_s'] == 10.0
+    assert cursor.comandos.count("EXPLAIN FORMAT=JSON SELECT a") == 1
+
+    agora[0] += 60
+    cache.obter(conexao, 'a', "SELECT a", None)
+    assert cursor.comandos.count("EXPLAIN FORMAT=JSON SELECT a") == 2
+
+    cache.obter(conexao, 'b', "SELECT b", None)
+    cache.obter(conexao, 'c', "SELECT c", None)
+    assert list(cache._planos) == ['b', 'c']
@@ -0,0 +1,68 @@
+import pytest
+
+from src.db_fingerprint import TAMANHO_MAXIMO, agrupar_por_fingerprint, normalizar_consulta
+
+
+@pytest.mark.parametrize('a, b', [
+    ("SELECT * FROM t WHERE id=5", "select *  from t where id = 42"),
+    ("SELECT * FROM t WHERE nome = 'ana'", 'SELECT * FROM t WHERE nome = "joão"'),
+    ("SELECT * FROM t WHERE x IN (1, 2, 3)", "SELECT * FROM t WHERE x IN (4)"),
+    ("INSERT INTO t (a, b) VALUES (1, 2), (3, 4)", "INSERT INTO t (a,b) VALUES (5,6)"),
+    ("SELECT * FROM t WHERE id = 1 /* app */;", "SELECT * FROM t -- rota\nWHERE id = 2"),
+    ("SELECT * FROM t WHERE v = 0x1F", "SELECT * FROM t WHERE v = -3.5e10"),
+])
+def test_mesma_instrucao_com_valores_diferentes_tem_o_mesmo_fingerprint(a, b):
+    assert normalizar_consulta(a) == normalizar_consulta(b)
+
+
+@pytest.mark.parametrize('a, b', [
+    # Dígitos em identificadores não são literais
+    ("SELECT * FROM t1 WHERE id = 1", "SELECT * FROM t2 WHERE id = 1"),
+    ("SELECT col1 FROM t", "SELECT col2 FROM t"),
+    ("SELECT * FROM `pedidos_2025` WHERE id = 1", "SELECT * FROM `pedidos_2026` WHERE id = 1"),
+    ("SELECT * FROM t WHERE a = 1 AND b = 2", "SELECT * FROM t WHERE a = 1 OR b = 2"),
+    ("SELECT * FROM t WHERE a < 1", "SELECT * FROM t WHERE a <= 1"),
+    ("SELECT * FROM t WHERE a IN (1)", "SELECT * FROM t WHERE a = 1"),
+])
+def test_instrucoes_diferentes_nao_colidem(a, b):
+    assert normalizar_consulta(a)[0] != normalizar_consulta(b)[0]
+
+
+def test_comentario_dentro_de_literal_nao_corta_a_instrucao():
+    _, normalizada = normalizar_consulta("SELECT '-- nao e comentario', a FROM t WHERE b = 1")
+
+    assert normalizada == "select ?, a from t where b = ?"
+
+
+def test_formato_do_resultado():
+    fingerprint, normalizada = normalizar_consulta("SELECT * FROM t WHERE id IN (1,2)")
+
+    assert len(fingerprint) == 16
+    int(fingerprint, 16)
+    assert normalizada == "select * from t where id in (?+)"
+
+
+def test_texto_vazio_e_instrucao_enorme():
+    assert normalizar_consulta(None) == normalizar_consulta('')
+
+    base = "INSERT INTO t (a) VALUES " + ", ".join(["(1)"] * 5000)
+    assert normalizar_consulta(base) == normalizar_consulta(base[:TAMANHO_MAXIMO] + "(2)")
+
+
+def test_agrupar_por_fingerprint():
+    queries = []
+    for query_id, (tempo, texto) in enumerate([(10, "SELECT * FROM t WHERE id = 1"),
+                                               (30, "SELECT * FROM t WHERE id = 2"),
+                                               (5, "UPDATE t SET a = 1")]):
+        fingerprint, normalizada = normalizar_consulta(texto)
+        queries.append({'id': query_id, 'tempo_segundos': tempo, 'query': texto, 'fingerprint': fingerprint,
+                        'consulta_normalizada': normalizada, 'usuario': 'app', 'banco': 'loja'})
+
+    grupos = agrupar_por_fingerprint(queries)
+
+    assert len(grupos) == 2
+    assert grupos[0]['consulta_normalizada'] == "select * from t where id = ?"
+    assert grupos[0]['ocorrencias'] == 2
+    assert grupos[0]['tempo_total_s'] == 40
+    assert grupos[0]['tempo_maximo_s'] == 30
+    assert grupos[0]['usuarios'] == ['app']
@@ -0,0 +1,106 @@
+import mysql.connector
+import pytest
+
+from src.db_indices import ColetorIndices, _deltas
+
+PS_POR_MS = 1_000_000_000
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr('src.db_indices.time.monotonic', lambda: agora[0])
+    return agora
+
+
+class CursorFalso:
+    """Responde as leituras na ordem: por tabela, por índice e índices sem uso"""
+
+    def __init__(self, tabelas=(), indices=(), sem_uso=(), erro=None):
+        self.respostas = [list(tabelas), list(indices), list(sem_uso)]
+        self.erro = erro
+        self.consultas = []
+
+    def execute(self, consulta, parametros=()):
+        self.consultas.append(consulta)
+        if self.erro is not None:
+            raise self.erro
+
+    def fetchall(self):
+        return self.respostas[len(self.consultas) - 1]
+
+    def close(self):
+        pass
+
+
+class ConexaoFalsa:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+def _coletar(coletor, **leituras):
+    return coletor.coletar(ConexaoFalsa(CursorFalso(**leituras)))
+
+
+def _tabela(nome, leituras, tempo_leitura_ms, escritas=0, tempo_escrita_ms=0):
+    return ('loja', nome, leituras, tempo_leitura_ms * PS_POR_MS, escritas, tempo_escrita_ms * PS_POR_MS)
+
+
+def _indice(tabela, indice, leituras, tempo_leitura_ms=0):
+    return ('loja', tabela, indice, leituras, tempo_leitura_ms * PS_POR_MS, 0, 0)
+
+
+def test_deltas_por_chave_ignoram_chaves_paradas_e_recomecam_apos_truncate():
+    anterior = {('a',): (10, 100, 5, 50), ('b',): (10, 100, 5, 50), ('c',): (10, 100, 5, 50)}
+    atual = {('a',): (15, 160, 5, 50), ('b',): (10, 100, 5, 50), ('c',): (2, 20, 1, 10), ('d',): (3, 30, 0, 0)}
+
+    assert _deltas(atual, anterior) == {
+        ('a',): (5, 60, 0, 0),
+        # Contador menor que o anterior: TRUNCATE do resumo, vale o valor atual inteiro
+        ('c',): (2, 20, 1, 10),
+        # Chave nova: desde zero
+        ('d',): (3, 30, 0, 0),
+    }
+
+
+def test_primeira_execucao_so_tem_indices_nao_usados(relogio):
+    coletor = ColetorIndices()
+
+    resultado = _coletar(coletor, tabelas=[_tabela('pedidos', 10, 5, escritas=100, tempo_escrita_ms=40)],
+                         sem_uso=[('loja', 'pedidos', 'idx_status'), ('loja', 'arquivo', 'idx_data')])
+
+    assert resultado['tabelas_quentes'] == [] and resultado['janela_s'] is None
+    # 'arquivo' não recebe escritas: o índice não custa manutenção
+    assert resultado['indices_nao_usados'] == [{'tabela': 'loja.pedidos', 'indice': 'idx_status',
+                                                'escritas_tabela': 100, 'latencia_escrita_tabela_ms': 40.0}]
+
+
+def test_tabelas_quentes_e_leituras_sem_indice_no_intervalo(relogio):
+    coletor = ColetorIndices()
+    _coletar(coletor, tabelas=[_tabela('pedidos', 100, 100), _tabela('clientes', 100, 100)],
+             indices=[_indice('pedidos', None, 50, 80), _indice('pedidos', 'PRIMARY', 50, 20)])
+
+    relogio[0] += 30
+    resultado = _coletar(coletor,
+                         tabelas=[_tabela('pedidos', 1100, 400, escritas=10, tempo_escrita_ms=100),
+                                  _tabela('clientes', 200, 200)],
+                         indices=[_indice('pedidos', None, 850, 330), _indice('pedidos', 'PRIMARY', 250, 70)])
+
+    assert resultado['janela_s'] == 30.0
+    assert [(q['tabela'], q['percentual_latencia']) for q in resultado['tabelas_quentes']] == [
+        ('loja.pedidos', 80.0), ('loja.clientes', 20.0)]
+    varredura, = resultado['varreduras_sem_indice']
+    assert varredura == {'tabela': 'loja.pedidos', 'linhas_lidas': 800, 'latencia_ms': 250.0,
+                         'percentual_leituras': 80.0}
+
+
+def test_sem_performance_schema_desativa(relogio):
+    coletor = ColetorIndices()
+    erro = mysql.connector.ProgrammingError("SELECT command denied")
+
+    assert _coletar(coletor, erro=erro) == {}
+    assert coletor.disponivel is False
+    assert _coletar(coletor) == {}
@@ -0,0 +1,130 @@
+import mysql.connector
+import pytest
+
+from src.db_innodb import TTL_STATUS_ENGINE, ColetorInnoDB
+
+MB = 1024 * 1024
+
+STATUS_ENGINE = """
+=====================================
+2026-01-01 00:00:00 INNODB MONITOR OUTPUT
+---
+LOG
+---
+Log sequence number          {lsn}
+Log buffer assigned up to    {lsn}
+Log flushed up to            {lsn}
+Last checkpoint at           {checkpoint}
+"""
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr('src.db_innodb.time.monotonic', lambda: agora[0])
+    monkeypatch.setattr('src.db_taxas.time.monotonic', lambda: agora[0])
+    return agora
+
+
+class CursorInnoDB:
+    """Responde cada consulta do coletor conforme o servidor simulado"""
+
+    def __init__(self, variaveis=None, metricas=None, status_engine=None, sem_process=False):
+        self.variaveis = variaveis or {'innodb_buffer_pool_size': str(128 * MB), 'innodb_redo_log_capacity': str(100 * MB)}
+        self.metricas = metricas if metricas is not None else {}
+        self.status_engine = status_engine
+        self.sem_process = sem_process
+        self.comandos = []
+        self._linhas = []
+
+    def execute(self, comando, parametros=()):
+        self.comandos.append(comando.split()[0] if 'ENGINE' not in comando else comando)
+        if comando.startswith("SHOW GLOBAL VARIABLES"):
+            self._linhas = list(self.variaveis.items())
+        elif 'INNODB_METRICS' in comando:
+            self._linhas = [(nome, valor) for nome, valor in self.metricas.items() if nome in parametros]
+        elif comando == "SHOW ENGINE INNODB STATUS":
+            if self.sem_process:
+                raise mysql.connector.ProgrammingError("Access denied; you need the PROCESS privilege")
+            self._linhas = [('InnoDB', '', self.status_engine)]
+
+    def fetchall(self):
+        return self._linhas
+
+    def fetchone(self):
+        return self._linhas[0] if self._linhas else None
+
+
+def _status(requisicoes=0, leituras=0, uptime=100, esperas=0, tempo_espera_ms=0, esperas_atuais=0,
+            paginas_total=1000, paginas_sujas=100, paginas_livres=250):
+    return {
+        'uptime': str(uptime),
+        'innodb_buffer_pool_read_requests': str(requisicoes), 'innodb_buffer_pool_reads': str(leituras),
+        'innodb_buffer_pool_wait_free': '0',
+        'innodb_buffer_pool_pages_total': str(paginas_total), 'innodb_buffer_pool_pages_dirty': str(paginas_sujas),
+        'innodb_buffer_pool_pages_free': str(paginas_livres),
+        'innodb_row_lock_waits': str(esperas), 'innodb_row_lock_time': str(tempo_espera_ms),
+        'innodb_row_lock_current_waits': str(esperas_atuais),
+    }
+
+
+def test_acerto_do_buffer_pool_e_locks_pelas_diferencas(relogio):
+    coletor = ColetorInnoDB()
+    cursor = CursorInnoDB(metricas={'trx_rseg_history_len': 42, 'log_lsn_current': 60 * MB,
+                                    'log_lsn_last_checkpoint': 35 * MB})
+    # Acumulado desde o boot com 50% de acerto: a primeira coleta não tem taxas
+    primeira = coletor.coletar(cursor, _status(requisicoes=1000, leituras=500, uptime=100))
+    assert primeira['buffer_pool_acerto_percent'] is None
+
+    relogio[0] += 10
+    metricas = coletor.coletar(cursor, _status(requisicoes=11000, leituras=600, uptime=110,
+                                               esperas=20, tempo_espera_ms=1000))
+
+    assert metricas['buffer_pool_acerto_percent'] == 99.0
+    assert metricas['requisicoes_leitura_s'] == 1000.0
+    assert metricas['esperas_lock_s'] == 2.0
+    assert metricas['espera_lock_media_ms'] == 50.0
+    assert metricas['buffer_pool_mb'] == 128
+    assert metricas['paginas_sujas_percent'] == 10.0
+    assert metricas['historico_undo'] == 42
+    assert metricas['checkpoint_idade_mb'] == 25.0
+    assert metricas['checkpoint_idade_percent'] == 25.0
+    assert "SHOW ENGINE INNODB STATUS" not in cursor.comandos
+
+
+def test_capacidade_do_redo_antes_do_8_0_30(relogio):
+    cursor = CursorInnoDB(variaveis={'innodb_buffer_pool_size': str(64 * MB), 'innodb_log_file_size': str(48 * MB),
+                                     'innodb_log_files_in_group': '2'},
+                          metricas={'log_lsn_current': 30 * MB, 'log_lsn_last_checkpoint': 6 * MB})
+
+    metricas = ColetorInnoDB().coletar(cursor, _status())
+
+    assert metricas['redo_capacidade_mb'] == 96.0
+    assert metricas['checkpoint_idade_percent'] == 25.0
+
+
+def test_lsn_do_status_do_engine_lido_no_maximo_a_cada_ttl(relogio):
+    cursor = CursorInnoDB(status_engine=STATUS_ENGINE.format(lsn=90 * MB, checkpoint=40 * MB))
+    coletor = ColetorInnoDB()
+
+    assert coletor.coletar(cursor, _status())['checkpoint_idade_mb'] == 50.0
+
+    relogio[0] += TTL_STATUS_ENGINE / 2
+    cursor.status_engine = STATUS_ENGINE.format(lsn=95 * MB, checkpoint=85 * MB)
+    # Entre leituras vale o último par lido
+    assert coletor.coletar(cursor, _status())['checkpoint_idade_mb'] == 50.0
+
+    relogio[0] += TTL_STATUS_ENGINE / 2
+    assert coletor.coletar(cursor, _status())['checkpoint_idade_mb'] == 10.0
+    assert cursor.comandos.count("SHOW ENGINE INNODB STATUS") == 2
+
+
+def test_sem_privilegio_process_desiste_do_status_do_engine(relogio):
+    cursor = CursorInnoDB(sem_process=True)
+    coletor = ColetorInnoDB()
+
+    for _ in range(3):
+        relogio[0] += TTL_STATUS_ENGINE
+        assert coletor.coletar(cursor, _status())['checkpoint_idade_mb'] is None
+
+    assert cursor.comandos.count("SHOW ENGINE INNODB STATUS") == 1
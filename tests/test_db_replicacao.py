@@ -0,0 +1,104 @@
+from collections import deque
+
+import mysql.connector
+import pytest
+
+from src.db_replicacao import COLETAS_SEM_REPLICACAO, ColetorReplicacao, _inclinacao, _tendencia
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr('src.db_replicacao.time.monotonic', lambda: agora[0])
+    return agora
+
+
+class CursorReplica:
+    """Cursor que responde SHOW REPLICA/SLAVE STATUS com as linhas configuradas"""
+
+    def __init__(self, linhas=None, sintaxe_antiga=False):
+        self.linhas = linhas or []
+        self.sintaxe_antiga = sintaxe_antiga
+        self.comandos = []
+        self.column_names = ()
+
+    def execute(self, comando):
+        self.comandos.append(comando)
+        if self.sintaxe_antiga and 'REPLICA' in comando:
+            raise mysql.connector.ProgrammingError("sintaxe")
+        self.column_names = tuple(self.linhas[0]) if self.linhas else ()
+
+    def fetchall(self):
+        return [tuple(linha.values()) for linha in self.linhas]
+
+
+def _pontos(*valores, passo=10.0):
+    return deque((1000.0 + indice * passo, valor) for indice, valor in enumerate(valores))
+
+
+def test_inclinacao_de_minimos_quadrados():
+    assert _inclinacao(_pontos(0, 10, 20, 30)) == pytest.approx(1.0)
+    # Ruído de ±5 em torno da reta 100 - t
+    assert _inclinacao(_pontos(100, 95, 75, 65, 65, 50)) == pytest.approx(-1.0)
+
+
+def test_inclinacao_sem_pontos_suficientes_ou_sem_variacao_no_tempo():
+    assert _inclinacao(_pontos(5, 10)) is None
+    assert _inclinacao(deque([(1000.0, 1), (1000.0, 5), (1000.0, 9)])) is None
+
+
+def test_tendencia_alcancando_com_previsao():
+    # Atraso caindo 30 s por minuto (0,5 s/s): 120 s restantes levam 240 s
+    tendencia = _tendencia(_pontos(180, 175, 170, 165, 160, 155, 150, 145, 140, 135, 130, 125, 120), 120)
+
+    assert tendencia == {'tendencia': 'alcançando', 'variacao_atraso_s_min': -30.0, 'previsao_alcance_s': 240}
+
+
+def test_tendencia_divergindo_e_estavel():
+    assert _tendencia(_pontos(10, 20, 30), 30)['tendencia'] == 'divergindo'
+    assert _tendencia(_pontos(10, 10, 10.1), 10)['tendencia'] == 'estável'
+    assert _tendencia(_pontos(10, 20), 20)['tendencia'] is None
+
+
+def test_canal_com_nomes_antigos_e_tendencia_entre_coletas(relogio):
+    linha = {'Channel_Name': '', 'Master_Host': 'primario', 'Master_Port': 3306, 'Seconds_Behind_Master': 60,
+             'Slave_IO_Running': 'Yes', 'Slave_SQL_Running': 'Yes', 'Slave_SQL_Running_State': 'Reading event',
+             'Last_IO_Error': '', 'Last_SQL_Error': '', 'Relay_Log_Space': 10 * 1024 * 1024}
+    cursor = CursorReplica([linha], sintaxe_antiga=True)
+    coletor = ColetorReplicacao()
+
+    for atraso, relay_mb in ((60, 10), (90, 30), (120, 50)):
+        linha.update(Seconds_Behind_Master=atraso, Relay_Log_Space=relay_mb * 1024 * 1024)
+        canal, = coletor.coletar(cursor)['canais']
+        relogio[0] += 60
+
+    assert canal['canal'] == 'padrão'
+    assert canal['origem'] == 'primario:3306'
+    assert (canal['io_thread'], canal['sql_thread']) == ('Yes', 'Yes')
+    assert canal['erro_io'] is None
+    assert canal['tendencia'] == 'divergindo'
+    assert canal['variacao_atraso_s_min'] == 30.0
+    assert canal['relay_log_variacao_mb_min'] == 20.0
+    # A sintaxe que funcionou é lembrada
+    assert cursor.comandos.count("SHOW REPLICA STATUS") == 1
+
+
+def test_atraso_nulo_nao_entra_na_tendencia(relogio):
+    linha = {'Channel_Name': 'c1', 'Seconds_Behind_Source': None, 'Replica_IO_Running': 'Connecting',
+             'Replica_SQL_Running': 'Yes', 'Relay_Log_Space': 0}
+    coletor = ColetorReplicacao()
+
+    canal, = coletor.coletar(CursorReplica([linha]))['canais']
+
+    assert canal['atraso_s'] is None
+    assert len(coletor._historico['c1']) == 0
+
+
+def test_servidor_que_nao_e_replica_consultado_de_tempos_em_tempos():
+    cursor = CursorReplica()
+    coletor = ColetorReplicacao()
+
+    for _ in range(COLETAS_SEM_REPLICACAO + 1):
+        assert coletor.coletar(cursor) == {}
+
+    assert len(cursor.comandos) == 2
@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pytest
+
+from src.db_servidores import MonitorServidores
+
+
+class PoolFalso:
+    """Pool cuja 'coleta' devolve o status configurado, opcionalmente com atraso"""
+
+    def __init__(self, status='Conectado', atraso=0.0):
+        self.status = status
+        self.atraso = atraso
+        self.coletas = 0
+        self.fechado = False
+
+    def fechar(self):
+        self.fechado = True
+
+
+def _coletar_alvo(pool):
+    pool.coletas += 1
+    if pool.atraso:
+        time.sleep(pool.atraso)
+    if pool.status == 'Erro':
+        raise Exception("falha inesperada")
+    return {'status': pool.status, 'erro': None if pool.status == 'Conectado' else 'recusado',
+            'degradado': pool.status != 'Conectado'}
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monkeypatch.setattr(MonitorServidores, '_coletar_alvo', staticmethod(_coletar_alvo))
+    monitor = MonitorServidores(falhas_para_abrir=2, espera_circuito=0.3)
+    yield monitor
+    monitor.fechar()
+
+
+def test_servidores_saudaveis(monitor):
+    monitor.adicionar('primario', PoolFalso())
+    monitor.adicionar('replica', PoolFalso())
+
+    resultado = monitor.coletar()
+
+    assert resultado['degradado'] is False
+    assert {nome: m['status'] for nome, m in resultado['servidores'].items()} == {
+        'primario': 'Conectado', 'replica': 'Conectado'}
+
+
+def test_circuito_abre_apos_falhas_seguidas_e_fecha_apos_teste(monitor):
+    pool = PoolFalso(status='Desconectado')
+    monitor.adicionar('replica', pool)
+
+    monitor.coletar()
+    monitor.coletar()
+    aberto = monitor.coletar()['servidores']['replica']
+
+    assert pool.coletas == 2
+    assert aberto['erro'].startswith("Circuito aberto após 2 falha(s)")
+    assert aberto['status'] == 'Desconectado'
+
+    # Passada a espera, uma coleta de teste bem-sucedida fecha o circuito
+    time.sleep(0.35)
+    pool.status = 'Conectado'
+    assert monitor.coletar()['servidores']['replica']['status'] == 'Conectado'
+    assert pool.coletas == 3
+
+    pool.status = 'Desconectado'
+    monitor.coletar()
+    assert monitor.coletar()['servidores']['replica']['erro'] == 'recusado'
+    assert pool.coletas == 5
+
+
+def test_coleta_de_teste_com_falha_reabre_o_circuito(monitor):
+    pool = PoolFalso(status='Erro')
+    monitor.adicionar('replica', pool)
+    monitor.coletar()
+    monitor.coletar()
+
+    time.sleep(0.35)
+    assert monitor.coletar()['servidores']['replica']['erro'] == "falha inesperada"
+    assert 'Circuito aberto' in monitor.coletar()['servidores']['replica']['erro']
+    assert pool.coletas == 3
+
+
+def test_servidor_lento_degradado_sem_atrasar_os_demais(monitor):
+    lento, rapido = PoolFalso(atraso=0.5), PoolFalso()
+    monitor.adicionar('lento', lento)
+    monitor.adicionar('rapido', rapido)
+
+    inicio = time.monotonic()
+    resultado = monitor.coletar(orcamento_s=0.1)
+
+    assert time.monotonic() - inicio < 0.4
+    assert resultado['degradado'] is True
+    assert resultado['servidores']['lento']['status'] == 'Degradado'
+    assert resultado['servidores']['rapido']['status'] == 'Conectado'
+
+
+def test_servidor_travado_abre_o_circuito(monitor):
+    pool = PoolFalso(atraso=1.0)
+    monitor.adicionar('replica', pool, timeout=0.05)
+
+    assert monitor.coletar()['servidores']['replica']['erro'] == "Sem resposta em 0.05s"
+    time.sleep(0.06)
+    # A coleta anterior segue presa: a rodada conta como falha e, na segunda, o circuito abre
+    preso = monitor.coletar()['servidores']['replica']
+    assert preso['status'] == 'Degradado'
+    assert preso['erro'].startswith("Coleta anterior ainda em andamento")
+
+    aberto = monitor.coletar()['servidores']['replica']
+    assert aberto['erro'].startswith("Circuito aberto após 2 falha(s)")
+    assert aberto['status'] == 'Degradado'
+    assert pool.coletas == 1
+
+
+def test_chamadas_concorrentes_compartilham_a_coleta(monitor):
+    pool = PoolFalso(status='Desconectado', atraso=0.2)
+    monitor.adicionar('replica', pool)
+    resultados = []
+
+    threads = [threading.Thread(target=lambda: resultados.append(monitor.coletar())) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pool.coletas == 1
+    assert [r['servidores']['replica']['status'] for r in resultados] == ['Desconectado', 'Desconectado']
+    # Uma única coleta conta uma única falha no circuito
+    assert 'Circuito aberto' not in monitor.coletar()['servidores']['replica'].get('erro', '')
+
+
+def test_substituir_e_remover_fecham_o_pool(monitor):
+    antigo, novo = PoolFalso(), PoolFalso()
+    monitor.adicionar('primario', antigo)
+    monitor.adicionar('primario', novo)
+    assert antigo.fechado and not novo.fechado
+
+    monitor.remover('primario')
+    assert novo.fechado
+    assert monitor.nomes() == []
@@ -0,0 +1,71 @@
+import pytest
+
+from src.db_taxas import MotorTaxas
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr('src.db_taxas.time.monotonic', lambda: agora[0])
+    return agora
+
+
+def test_primeira_leitura_so_forma_a_base(relogio):
+    motor = MotorTaxas(('questions',))
+
+    assert motor.atualizar({'questions': 100}, 10) == {}
+
+
+def test_taxa_por_segundo_entre_leituras(relogio):
+    motor = MotorTaxas(('questions', 'com_select'))
+    motor.atualizar({'questions': 100, 'com_select': 50}, 10)
+
+    relogio[0] += 10
+    leitura = motor.atualizar({'questions': 600, 'com_select': '250'}, 20)
+
+    assert leitura['taxas'] == {'questions': 50.0, 'com_select': 20.0}
+    assert leitura['intervalo_s'] == 10
+
+
+def test_uptime_menor_indica_reinicio(relogio):
+    motor = MotorTaxas(('questions',))
+    motor.atualizar({'questions': 100}, 5000)
+
+    relogio[0] += 10
+    assert motor.atualizar({'questions': 200}, 3) == {}
+    assert motor.reinicios == 1
+
+    # A leitura após o reinício vira a nova base
+    relogio[0] += 10
+    assert motor.atualizar({'questions': 300}, 13)['taxas']['questions'] == 10.0
+
+
+def test_contador_que_volta_atras_indica_flush_status(relogio):
+    motor = MotorTaxas(('questions', 'com_select'))
+    motor.atualizar({'questions': 1000, 'com_select': 500}, 100)
+
+    relogio[0] += 10
+    assert motor.atualizar({'questions': 1100, 'com_select': 0}, 110) == {}
+    assert motor.reinicios == 1
+
+
+def test_media_movel_usa_a_referencia_anterior_a_leitura(relogio):
+    motor = MotorTaxas(('questions',), suavizacao=0.5)
+    motor.atualizar({'questions': 0}, 0)
+
+    relogio[0] += 1
+    primeira = motor.atualizar({'questions': 10}, 1)
+    relogio[0] += 1
+    segunda = motor.atualizar({'questions': 40}, 2)
+
+    assert primeira['medias']['questions'] == 10.0
+    assert segunda['taxas']['questions'] == 30.0
+    assert segunda['medias']['questions'] == 10.0
+
+
+def test_contador_ausente_conta_como_zero(relogio):
+    motor = MotorTaxas(('questions',))
+    motor.atualizar({}, 0)
+
+    relogio[0] += 2
+    assert motor.atualizar({'questions': None}, 2)['taxas']['questions'] == 0.0
@@ -0,0 +1,119 @@
+import pytest
+
+from src.disco_metricas import ColetorDisco, resumir_discos
+
+
+def _linha(nome, leituras=0, setores_lidos=0, ms_leitura=0, escritas=0, setores_escritos=0, ms_escrita=0,
+           em_andamento=0, io_ticks=0, ms_fila=0):
+    # Kernels 4.18+ acrescentam discard e 5.5+ flush depois dos 11 campos clássicos
+    return (f"   8       0 {nome} {leituras} 7 {setores_lidos} {ms_leitura} {escritas} 3 {setores_escritos} "
+            f"{ms_escrita} {em_andamento} {io_ticks} {ms_fila} 0 0 0 0 0 0\n")
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr('src.disco_metricas.time.monotonic', lambda: agora[0])
+    return agora
+
+
+@pytest.fixture
+def diskstats(tmp_path):
+    caminho = tmp_path / 'diskstats'
+    caminho.write_text('')
+    return caminho
+
+
+def _coletor(diskstats, relogio, dispositivos=('sda', 'nvme0n1'), janela=5.0):
+    coletor = ColetorDisco(janela=janela, caminho=str(diskstats))
+    coletor._dispositivos = set(dispositivos)
+    coletor._listado_em = relogio[0]
+    return coletor
+
+
+def test_primeira_leitura_so_forma_a_base(diskstats, relogio):
+    diskstats.write_text(_linha('sda', leituras=10))
+    coletor = _coletor(diskstats, relogio)
+
+    assert coletor.coletar() == []
+
+
+def test_metricas_da_janela_por_dispositivo(diskstats, relogio):
+    diskstats.write_text(_linha('sda', leituras=100, setores_lidos=2048, ms_leitura=50, escritas=10, io_ticks=100))
+    coletor = _coletor(diskstats, relogio)
+    coletor.coletar()
+
+    relogio[0] += 2
+    diskstats.write_text(_linha('sda', leituras=300, setores_lidos=6144, ms_leitura=450, escritas=110,
+                                setores_escritos=4096, ms_escrita=600, em_andamento=3, io_ticks=1100, ms_fila=3000))
+    disco, = coletor.coletar()
+
+    assert disco['dispositivo'] == 'sda'
+    assert disco['iops'] == 150.0
+    assert disco['leitura_mb_s'] == 1.0
+    assert disco['escrita_mb_s'] == 1.0
+    assert disco['latencia_leitura_ms'] == 2.0
+    assert disco['latencia_escrita_ms'] == 6.0
+    assert disco['latencia_ms'] == 3.33
+    assert disco['em_andamento'] == 3
+    assert disco['fila_media'] == 1.5
+    assert disco['utilizacao'] == 50.0
+
+
+def test_particoes_e_dispositivos_virtuais_ignorados(diskstats, relogio):
+    conteudo = _linha('loop0', leituras=5) + _linha('sda', leituras=5) + _linha('sda1', leituras=5)
+    diskstats.write_text(conteudo)
+    coletor = _coletor(diskstats, relogio)
+    coletor.coletar()
+
+    relogio[0] += 1
+    assert [d['dispositivo'] for d in coletor.coletar()] == ['sda']
+
+
+def test_janela_sem_io_marcada_sem_dados(diskstats, relogio):
+    diskstats.write_text(_linha('sda', leituras=100, ms_leitura=900, em_andamento=1))
+    coletor = _coletor(diskstats, relogio)
+    coletor.coletar()
+
+    relogio[0] += 1
+    disco, = coletor.coletar()
+
+    assert disco['sem_dados'] is True
+    assert disco['latencia_ms'] is None
+    assert resumir_discos([disco]) == {'latencia_disco_ms': 0.0, 'latencia_disco_sem_dados': True,
+                                       'disco_mais_lento': None}
+
+
+def test_contadores_zerados_descartam_o_dispositivo(diskstats, relogio):
+    diskstats.write_text(_linha('sda', leituras=500, ms_leitura=500) + _linha('nvme0n1', leituras=10, ms_leitura=5))
+    coletor = _coletor(diskstats, relogio)
+    coletor.coletar()
+
+    relogio[0] += 1
+    diskstats.write_text(_linha('sda', leituras=3, ms_leitura=1) + _linha('nvme0n1', leituras=20, ms_leitura=15))
+
+    assert [d['dispositivo'] for d in coletor.coletar()] == ['nvme0n1']
+
+
+def test_base_e_o_snapshot_mais_antigo_dentro_da_janela(diskstats, relogio):
+    coletor = _coletor(diskstats, relogio, janela=2.0)
+    # Ritmo de 100 leituras/s nos dois primeiros segundos e 300/s depois
+    for leituras in (0, 100, 200, 500, 800):
+        diskstats.write_text(_linha('sda', leituras=leituras))
+        discos = coletor.coletar()
+        relogio[0] += 1
+
+    # Janela de 2 s: só os dois últimos segundos entram na conta
+    disco, = discos
+    assert disco['leituras_s'] == 300.0
+
+
+def test_resumo_aponta_o_dispositivo_mais_lento():
+    discos = [
+        {'dispositivo': 'sda', 'sem_dados': False, 'latencia_ms': 4.0},
+        {'dispositivo': 'sdb', 'sem_dados': False, 'latencia_ms': 12.5},
+        {'dispositivo': 'sdc', 'sem_dados': True, 'latencia_ms': None},
+    ]
+
+    assert resumir_discos(discos) == {'latencia_disco_ms': 12.5, 'latencia_disco_sem_dados': False,
+                                      'disco_mais_lento': 'sdb'}
@@ -0,0 +1,79 @@
+from src.fs_metricas import ColetorSistemaArquivos, _decodificar, _montar_medida, sistema_raiz
+
+MOUNTINFO = (
+    "22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw\n"
+    "23 22 0:5 / /proc rw,nosuid - proc proc rw\n"
+    "24 22 0:21 / /run rw,nosuid shared:5 - tmpfs tmpfs rw,size=802400k\n"
+    "25 22 8:2 / /var/lib/mysql rw,noatime shared:7 master:3 - xfs /dev/sda2 rw\n"
+    "26 22 8:2 /dados /srv/mysql-bind rw,noatime - xfs /dev/sda2 rw\n"
+    "27 22 0:50 / /mnt/nfs rw - nfs4 servidor:/export rw\n"
+    "28 22 8:3 / /mnt/meus\\040dados rw - ext4 /dev/sda3 rw\n"
+)
+
+
+def _coletor(tmp_path, incluir_rede=False):
+    caminho = tmp_path / 'mountinfo'
+    caminho.write_text(MOUNTINFO)
+    coletor = ColetorSistemaArquivos(incluir_rede=incluir_rede, caminho=str(caminho))
+    coletor._medir = lambda ponto: {'uso_percent': 10.0}
+    return coletor
+
+
+def test_montagens_reais_sem_virtuais_rede_nem_bind(tmp_path):
+    coletor = _coletor(tmp_path)
+    try:
+        sistemas = coletor.coletar()
+    finally:
+        coletor.fechar()
+
+    assert [(s['ponto'], s['dispositivo'], s['tipo']) for s in sistemas] == [
+        ('/', '/dev/sda1', 'ext4'),
+        ('/mnt/meus dados', '/dev/sda3', 'ext4'),
+        ('/var/lib/mysql', '/dev/sda2', 'xfs'),
+    ]
+    assert all(s['uso_percent'] == 10.0 for s in sistemas)
+
+
+def test_sistemas_de_rede_quando_pedidos(tmp_path):
+    coletor = _coletor(tmp_path, incluir_rede=True)
+    try:
+        pontos = [s['ponto'] for s in coletor.coletar()]
+    finally:
+        coletor.fechar()
+
+    assert '/mnt/nfs' in pontos
+
+
+def test_montagem_que_falha_no_statvfs_fica_de_fora(tmp_path):
+    coletor = _coletor(tmp_path)
+    coletor._medir = lambda ponto: None if ponto == '/var/lib/mysql' else {'uso_percent': 1.0}
+    try:
+        pontos = [s['ponto'] for s in coletor.coletar()]
+    finally:
+        coletor.fechar()
+
+    assert pontos == ['/', '/mnt/meus dados']
+
+
+def test_escapes_octais_do_mountinfo():
+    assert _decodificar('/mnt/a\\040b\\011c') == '/mnt/a b\tc'
+    assert _decodificar('/m\\303\\251dia') == '/média'
+    assert _decodificar('/simples') == '/simples'
+
+
+def test_percentual_sobre_o_espaco_disponivel_ao_usuario():
+    gb = 1024 ** 3
+    # 100 GB no total, 60 usados, 30 livres ao usuário (10 reservados ao root)
+    medida = _montar_medida(100 * gb, 60 * gb, 30 * gb, 1000, 250)
+
+    assert medida['uso_percent'] == 66.7
+    assert medida['uso_inodes_percent'] == 25.0
+    assert _montar_medida(0, 0, 0, 0, 0)['uso_percent'] == 0.0
+
+
+def test_sistema_raiz():
+    sistemas = [{'ponto': '/boot'}, {'ponto': '/'}]
+
+    assert sistema_raiz(sistemas) == {'ponto': '/'}
+    assert sistema_raiz([{'ponto': '/dados'}]) == {'ponto': '/dados'}
+    assert sistema_raiz([]) is None
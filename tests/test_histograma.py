@@ -0,0 +1,66 @@
+import pytest
+
+from src.histograma import HistogramaLatencia, JanelaLatencia, _indice, _valor_representativo, N_BUCKETS
+
+
+def test_percentis_com_erro_relativo_limitado():
+    histograma = HistogramaLatencia()
+    for valor in range(1, 10001):
+        histograma.registrar(valor * 1000)
+
+    for p in (50, 95, 99):
+        esperado = p * 100 * 1000
+        assert histograma.percentil(p) == pytest.approx(esperado, rel=0.0625)
+
+
+def test_percentil_limitado_ao_maximo_observado():
+    histograma = HistogramaLatencia()
+    histograma.registrar(1_000_001)
+
+    assert histograma.percentil(100) <= 1_000_001
+    assert histograma.percentil(100) == pytest.approx(1_000_001, rel=0.0625)
+
+
+def test_sem_amostras():
+    resumo = HistogramaLatencia().resumo_ms()
+
+    assert HistogramaLatencia().percentil(50) is None
+    assert resumo['p50_ms'] is None
+    assert resumo['amostras'] == 0
+
+
+def test_valores_acima_da_faixa_caem_no_ultimo_bucket():
+    assert _indice(2 ** 40) == N_BUCKETS - 1
+    assert _indice(-5) == 0
+
+
+def test_bucket_contem_o_proprio_valor_representativo():
+    for valor in (0, 15, 16, 17, 1000, 123456, 2 ** 30 + 7):
+        assert _indice(_valor_representativo(_indice(valor))) == _indice(valor)
+
+
+def test_mesclar_soma_contagens():
+    a, b = HistogramaLatencia(), HistogramaLatencia()
+    a.registrar(100)
+    b.registrar(1_000_000)
+    b.registrar(2_000_000)
+
+    a.mesclar(b)
+
+    assert a.total == 3
+    assert a.maximo_ns == 2_000_000
+    assert a.percentil(1) == pytest.approx(100, rel=0.0625)
+    assert a.percentil(100) == pytest.approx(2_000_000, rel=0.0625)
+
+
+def test_janela_descarta_amostras_apos_duas_janelas(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr('src.histograma.time.monotonic', lambda: agora[0])
+    janela = JanelaLatencia(janela=60.0)
+    janela.registrar(5_000_000)
+
+    agora[0] += 61
+    assert janela.resumo_ms()['amostras'] == 1
+
+    agora[0] += 121
+    assert janela.resumo_ms()['amostras'] == 0
@@ -0,0 +1,75 @@
+from src.memoria_metricas import CHAVES_MEMINFO, CHAVES_VMSTAT, ColetorMemoria
+from src.proc_rapido import LeitorProc, ler_chave_valor
+
+MEMINFO = (
+    "MemTotal:       16000000 kB\n"
+    "MemFree:         2000000 kB\n"
+    "MemAvailable:    6000000 kB\n"
+    "Buffers:          500000 kB\n"
+    "SwapCached:        10000 kB\n"
+    "SwapTotal:       4000000 kB\n"
+    "SwapFree:        3000000 kB\n"
+)
+
+
+def test_leitor_rele_do_inicio_a_cada_chamada(tmp_path):
+    caminho = tmp_path / 'stat'
+    caminho.write_text('cpu 1 2 3\n')
+    leitor = LeitorProc(str(caminho))
+    try:
+        assert bytes(leitor.ler()) == b'cpu 1 2 3\n'
+        caminho.write_text('cpu 4 5\n')
+        assert bytes(leitor.ler()) == b'cpu 4 5\n'
+    finally:
+        leitor.fechar()
+
+
+def test_buffer_cresce_quando_o_conteudo_nao_cabe(tmp_path):
+    conteudo = b''.join(b'linha %d\n' % numero for numero in range(100))
+    caminho = tmp_path / 'grande'
+    caminho.write_bytes(conteudo)
+    leitor = LeitorProc(str(caminho), tamanho_inicial=64)
+    try:
+        assert bytes(leitor.ler()) == conteudo
+        assert len(leitor._buffer) > len(conteudo)
+    finally:
+        leitor.fechar()
+
+
+def test_chave_valor_so_das_chaves_pedidas():
+    valores = ler_chave_valor(memoryview(MEMINFO.encode()), CHAVES_MEMINFO)
+
+    # SwapCached não é SwapFree nem SwapTotal: a chave precisa casar inteira
+    assert valores == {b'MemTotal': 16000000, b'MemFree': 2000000, b'MemAvailable': 6000000,
+                       b'SwapTotal': 4000000, b'SwapFree': 3000000}
+
+
+def test_chave_valor_sem_dois_pontos_como_no_vmstat():
+    vmstat = b"nr_free_pages 12345\npswpin 10\npswpout 20\npgmajfault 7\npgmajfault_file 3\n"
+
+    assert ler_chave_valor(memoryview(vmstat), CHAVES_VMSTAT) == {b'pswpin': 10, b'pswpout': 20, b'pgmajfault': 7}
+
+
+def test_memoria_usada_e_total_menos_disponivel(tmp_path):
+    (tmp_path / 'meminfo').write_text(MEMINFO)
+    coletor = ColetorMemoria()
+    coletor._meminfo = LeitorProc(str(tmp_path / 'meminfo'))
+    coletor._vmstat = None
+
+    metricas = coletor.coletar()
+
+    assert metricas['uso_memoria'] == 62.5
+    assert metricas['uso_swap'] == 25.0
+    assert metricas['memoria_usada_gb'] == round(10000000 * 1024 / 1024 ** 3, 2)
+
+
+def test_sem_mem_available_usa_mem_free(tmp_path):
+    (tmp_path / 'meminfo').write_text("MemTotal: 1000 kB\nMemFree: 250 kB\n")
+    coletor = ColetorMemoria()
+    coletor._meminfo = LeitorProc(str(tmp_path / 'meminfo'))
+    coletor._vmstat = None
+
+    metricas = coletor.coletar()
+
+    assert metricas['uso_memoria'] == 75.0
+    assert metricas['uso_swap'] == 0.0
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from src.psi_metricas import ColetorPSI, GatilhoPSI
+
+
+def _pressao(some_avg10, some_total, full_avg10=None, full_total=None):
+    conteudo = f"some avg10={some_avg10:.2f} avg60=1.50 avg300=0.80 total={some_total}\n"
+    if full_total is not None:
+        conteudo += f"full avg10={full_avg10:.2f} avg60=0.50 avg300=0.20 total={full_total}\n"
+    return conteudo
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr('src.psi_metricas.time.monotonic', lambda: agora[0])
+    return agora
+
+
+def test_medias_do_kernel_e_recurso_ausente(tmp_path, relogio):
+    # CPU sem linha "full" (kernels anteriores ao 5.13) e sem arquivo de I/O
+    (tmp_path / 'cpu').write_text(_pressao(2.5, 1000))
+    (tmp_path / 'memory').write_text(_pressao(0.0, 0, 0.0, 0))
+
+    pressao = ColetorPSI(str(tmp_path)).coletar()
+
+    assert set(pressao) == {'cpu', 'memory'}
+    assert pressao['cpu'] == {'some_avg10': 2.5, 'some_avg60': 1.5, 'some_stall_percent': None}
+    assert pressao['memory']['full_avg60'] == 0.5
+
+
+def test_percentual_de_stall_no_intervalo(tmp_path, relogio):
+    (tmp_path / 'io').write_text(_pressao(0.0, 1_000_000, 0.0, 500_000))
+    coletor = ColetorPSI(str(tmp_path))
+    coletor.coletar()
+
+    relogio[0] += 2
+    # 0,5 s de "some" e 0,1 s de "full" em 2 s
+    (tmp_path / 'io').write_text(_pressao(10.0, 1_500_000, 3.0, 600_000))
+    io = coletor.coletar()['io']
+
+    assert io['some_stall_percent'] == 25.0
+    assert io['full_stall_percent'] == 5.0
+
+
+def test_percentual_limitado_entre_zero_e_cem(tmp_path, relogio):
+    (tmp_path / 'memory').write_text(_pressao(0.0, 5_000_000))
+    coletor = ColetorPSI(str(tmp_path))
+    coletor.coletar()
+
+    relogio[0] += 1
+    (tmp_path / 'memory').write_text(_pressao(0.0, 1_000))
+    assert coletor.coletar()['memory']['some_stall_percent'] == 0.0
+
+    relogio[0] += 1
+    (tmp_path / 'memory').write_text(_pressao(0.0, 3_000_000))
+    assert coletor.coletar()['memory']['some_stall_percent'] == 100.0
+
+
+def test_sem_diretorio_de_pressao(tmp_path):
+    coletor = ColetorPSI(str(tmp_path / 'inexistente'))
+
+    assert coletor.disponivel is False
+    assert coletor.coletar() == {}
+
+
+def test_gatilho_registrado_e_despertar_interrompe_a_espera(tmp_path):
+    (tmp_path / 'memory').write_bytes(b'')
+    gatilho = GatilhoPSI(gatilhos={'memory': 'some 150000 2000000'}, diretorio=str(tmp_path))
+    try:
+        assert (tmp_path / 'memory').read_bytes() == b'some 150000 2000000\0'
+
+        gatilho.despertar()
+        inicio = time.monotonic()
+        assert gatilho.aguardar(5.0) == []
+        assert time.monotonic() - inicio < 1.0
+    finally:
+        gatilho.fechar()
@@ -0,0 +1,122 @@
+import io
+
+import pytest
+
+from src import rede_metricas
+from src.rede_metricas import ColetorRede, _calcular_tcp, _ler_tcp
+
+CABECALHO_DEV = (
+    "Inter-|   Receive                                                |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+)
+
+SNMP = (
+    "Ip: Forwarding DefaultTTL InReceives\n"
+    "Ip: 1 64 1000\n"
+    "Tcp: RtoAlgorithm RtoMin RtoMax MaxConn ActiveOpens PassiveOpens AttemptFails EstabResets CurrEstab InSegs OutSegs RetransSegs InErrs OutRsts\n"
+    "Tcp: 1 200 120000 -1 74 56 0 43 2 14673 {enviados} {retransmissoes} 0 14\n"
+)
+
+NETSTAT = (
+    "TcpExt: SyncookiesSent SyncookiesRecv ListenOverflows ListenDrops\n"
+    "TcpExt: 0 0 {overflows} 7\n"
+    "IpExt: InNoRoutes InTruncatedPkts\n"
+    "IpExt: 0 0\n"
+)
+
+
+def _dev(*interfaces):
+    linhas = [f"{nome:>6}:{rx_bytes} {rx_pacotes} {rx_erros} 1 0 0 0 0 {tx_bytes} {tx_pacotes} 0 0 0 0 0 0\n"
+              for nome, rx_bytes, rx_pacotes, rx_erros, tx_bytes, tx_pacotes in interfaces]
+    return CABECALHO_DEV + ''.join(linhas)
+
+
+@pytest.fixture
+def proc(monkeypatch):
+    """Conteúdo dos arquivos do /proc/net lidos pelo módulo"""
+    arquivos = {}
+
+    def _abrir(caminho, *args, **kwargs):
+        if caminho not in arquivos:
+            raise FileNotFoundError(caminho)
+        return io.StringIO(arquivos[caminho])
+
+    monkeypatch.setattr(rede_metricas, 'open', _abrir, raising=False)
+    return arquivos
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr('src.rede_metricas.time.monotonic', lambda: agora[0])
+    return agora
+
+
+def _coletor(velocidades=None):
+    coletor = ColetorRede(intervalo_velocidade=3600)
+    coletor._usar_proc = True
+    coletor._velocidades = velocidades or {}
+    coletor._velocidades_em = 1000.0
+    return coletor
+
+
+def test_leitura_do_net_dev_sem_loopback(proc):
+    proc['/proc/net/dev'] = _dev(('lo', 500, 5, 0, 500, 5), ('eth0', 1000, 10, 2, 3000, 30))
+
+    assert _coletor()._ler_interfaces() == {'eth0': (1000, 10, 2, 1, 3000, 30, 0, 0)}
+
+
+def test_contadores_tcp_de_snmp_e_netstat(proc):
+    proc['/proc/net/snmp'] = SNMP.format(enviados=14673, retransmissoes=12)
+    proc['/proc/net/netstat'] = NETSTAT.format(overflows=3)
+
+    assert _ler_tcp() == {'segmentos_enviados': 14673, 'retransmissoes': 12, 'listen_overflows': 3}
+
+
+def test_arquivo_tcp_ausente_e_ignorado(proc):
+    proc['/proc/net/snmp'] = SNMP.format(enviados=10, retransmissoes=0)
+
+    assert _ler_tcp() == {'segmentos_enviados': 10, 'retransmissoes': 0}
+
+
+def test_taxas_por_interface_e_tcp(proc, relogio):
+    coletor = _coletor(velocidades={'eth0': 100})
+    proc['/proc/net/dev'] = _dev(('eth0', 0, 0, 0, 0, 0))
+    proc['/proc/net/snmp'] = SNMP.format(enviados=1000, retransmissoes=10)
+    proc['/proc/net/netstat'] = NETSTAT.format(overflows=0)
+    assert coletor.coletar() == {}
+
+    relogio[0] += 2
+    proc['/proc/net/dev'] = _dev(('eth0', 2 * 1024 ** 2, 200, 4, 12_500_000, 100))
+    proc['/proc/net/snmp'] = SNMP.format(enviados=3000, retransmissoes=50)
+    proc['/proc/net/netstat'] = NETSTAT.format(overflows=6)
+    resultado = coletor.coletar()
+
+    interface, = resultado['interfaces_rede']
+    assert interface['interface'] == 'eth0'
+    assert interface['rx_mb_s'] == 1.0
+    assert interface['rx_pacotes_s'] == 100.0
+    assert interface['erros_s'] == 2.0
+    # 12,5 MB em 2 s num link de 100 Mbit/s: metade da capacidade
+    assert interface['uso_percent'] == 50.0
+    assert resultado['tcp_retransmissoes_s'] == 20.0
+    assert resultado['tcp_retransmissao_percent'] == 2.0
+    assert resultado['tcp_listen_overflows_s'] == 3.0
+
+
+def test_interface_recriada_fica_fora_do_intervalo(proc, relogio):
+    coletor = _coletor()
+    proc['/proc/net/dev'] = _dev(('eth0', 5000, 50, 0, 5000, 50), ('eth1', 0, 0, 0, 0, 0))
+    coletor.coletar()
+
+    relogio[0] += 1
+    proc['/proc/net/dev'] = _dev(('eth0', 10, 1, 0, 10, 1), ('eth1', 100, 1, 0, 100, 1))
+    resultado = coletor.coletar()
+
+    assert [i['interface'] for i in resultado['interfaces_rede']] == ['eth1']
+    assert resultado['interfaces_rede'][0]['uso_percent'] is None
+
+
+def test_tcp_com_contador_zerado_nao_gera_taxa():
+    assert _calcular_tcp({'retransmissoes': 50}, {'retransmissoes': 2}, 1.0) == {}
+    assert _calcular_tcp({}, {'retransmissoes': 2}, 1.0) == {}